@@ -9,127 +9,61 @@ Created on Fri Jul  3 12:18:52 2020
 #*******************************
 #%% Importing libraries
 
-from ortools.linear_solver import pywraplp
-import pandas as pd
+import os
+import sys
 
-#%% Importing parameters
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import lp, models, results, telemetry
 
-df_cost = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = 'Cost')
-df_hardness = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = 'Hardness')
-df_scalars = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = 'Scalars')
+#%% Importing parameters
 
-scalars = {}
-for index, row in df_scalars.iterrows():
-    scalars[row[0]] = row[1]
+run = telemetry.start('Food Manufacture I')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-months = df_cost.MONTH.unique()
-oils = df_hardness.OIL
+# The Cost, Hardness and Scalars sheets are read with a single open of the workbook and converted into the
+# model parameters (columnar loading of the sheets)
+data = models.read_food('Parameters.xlsx')
 
 #%% Model Formulation
 
-# Instantiate a Glop solver
-solver = pywraplp.Solver('Food Manufacture I', pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
-
-# ------------------------ Declaring objective
-objective = solver.Objective()
-objective.SetMaximization()
-
-# ------------------------ Creating variables
-refine = {}
-buy = {}
-inv = {}
-for index, row in df_cost.iterrows():
-    # Creating <refine> variables
-    var = solver.NumVar(0, solver.infinity(), f'Refine[{row[0]},{row[1]}]')
-    refine[(row[0],row[1])] = var
-    objective.SetCoefficient(var, scalars['PRICE'])
-    # Creating <buy> variables
-    var = solver.NumVar(0, solver.infinity(), f'Buy[{row[0]},{row[1]}]')
-    buy[(row[0],row[1])] = var
-    objective.SetCoefficient(var, row[2])
-    # Creating <inv> variables
-    var = solver.NumVar(0, scalars['STORAGE'], f'Inv[{row[0]},{row[1]}]')
-    inv[(row[0],row[1])] = var
-    objective.SetCoefficient(var, scalars['STORECOST'])
-
-# ------------------------ Creating Constraints
+# Variables: refine, buy and inv (upper bound STORAGE) of every oil in every month
+# Constraints:
 # 1. The inventory at the end of a month depends of the tons of raw oils refined and bought in that month
-for o in oils:
-    # 1.1 Initial inventory: inv[o,'Jan'] + refine[o,'Jan'] - buy[o, 'Jan'] = 500
-    const = solver.Constraint(scalars['INITIAL'], scalars['INITIAL'])
-    const.SetCoefficient(inv[o,months[0]], 1)
-    const.SetCoefficient(refine[o,months[0]], 1)
-    const.SetCoefficient(buy[o,months[0]], -1)
-    # 1.1 Final inventory: inv[o,'May'] - refine[o,'Jun'] + buy[o,'Jun'] = 500
-    const = solver.Constraint(scalars['FINAL'], scalars['FINAL'])
-    const.SetCoefficient(inv[o,months[-2]], 1)
-    const.SetCoefficient(refine[o,months[-1]], -1)
-    const.SetCoefficient(buy[o,months[-1]], 1)
-    
-    for j in range(1, len(months)-1):
-        m = months[j]
-        m1 = months[j-1]
-        # inv[o,m] - inv[o,m-1] + refine[o,m] - buy[o,m] = 0
-        const = solver.Constraint(0,0)
-        const.SetCoefficient(inv[o,m], 1)
-        const.SetCoefficient(inv[o,m1], -1)
-        const.SetCoefficient(refine[o,m], 1)
-        const.SetCoefficient(buy[o,m], -1)
-        
 # 2. There are maximum refining capacities for each type of raw oil each month
-
-for m in months:
-    # sum(o in T) refine[o,m] <= capacity[T]
-    const_v = solver.Constraint(-solver.Infinity(),scalars['CAPACITY_V'])
-    const_n = solver.Constraint(-solver.Infinity(),scalars['CAPACITY_N'])   
-    for index, row in df_hardness.iterrows():
-        o = row[0]
-        typ = row[2]
-        if typ == 'V':
-            const_v.SetCoefficient(refine[o,m], 1)
-        else:
-            const_n.SetCoefficient(refine[o,m], 1)
-     
-# 3. The maximum storage capacity cannot be surpassed
-
-# This constraint is included as an upper bound of the <inv> variables
-
+# 3. The maximum storage capacity cannot be surpassed (upper bound of the <inv> variables)
 # 4. There are hardness bounds for the final product linearly dependent of the individual hardness of each raw oil used
 
-HL = scalars['HL']
-HU = scalars['HU']
-for m in months:
-    # sum(o in oils) (h[o]-HL)*refine[o,m] >= 0, for m in months
-    const_l = solver.Constraint(0,solver.Infinity())
-    # sum(o in oils) (h[o]-HU)*refine[o,m] <= 0, for m in months
-    const_u = solver.Constraint(-solver.Infinity(), 0)
-    for index, row in df_hardness.iterrows():
-        o = row[0]
-        h = row[1]
-        const_l.SetCoefficient(refine[o,m], h-HL)
-        const_u.SetCoefficient(refine[o,m], h-HU)
+# The model is declared in array form and loaded into a Glop solver from an MPModelProto in bulk, instead of one
+# SetCoefficient call per coefficient
+run.phase('build')
+model = models.fm1(data)
+solver = lp.to_pywraplp(model, 'glop')
+objective = solver.Objective()
 
 # ------------------------ Model Execution
+run.phase('optimize')
 status = solver.Solve()
 
 #%% Results report
 
-# Reporting variables values
-price = scalars['PRICE']
-store = scalars['STORECOST']
-for m in months:
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one row per oil and month)
+x = results.solution(solver)    # All the variable values in one solution response
+df_solution = results.block_frame(model, x, {'refine': 'refine', 'buy': 'buy', 'inv': 'inventory'}, ['OIL','MONTH'])
+for m, df_month in df_solution.groupby('MONTH', sort = False):
     print(f'------------------\n{m}\n------------------')
-    for o in oils:
-        val = round(refine[o,m].solution_value(),2)
+    for o, refined, bought, stored in df_month[['OIL','refine','buy','inv']].itertuples(index = False):
+        val = round(refined,2)
         if val > 0:
             print(f'{o}: Refine -> {val}')
             #print(f'{o}: Refine -> {val}, Profit: ${round(val*price,1)}')
-        val = round(buy[o,m].solution_value(),2)
+        val = round(bought,2)
         if val > 0:
             #cost = costs[o,m]
             print(f'{o}: Buy -> {val}')
             #print(f'{o}: Buy -> {val}, Profit: ${round(val*cost,1)}')
-        val = round(inv[o,m].solution_value(),2)
+        val = round(stored,2)
         if val > 0:
             print(f'{o}: Store -> {val}')
             #print(f'{o}: Store -> {val}, Profit: ${round(val*store,1)}')
@@ -141,4 +75,6 @@ print(f'Objective function value: ${round(objective.Value(),1) - 12500}')
 print('$12.500 were deducted of \nstore costs of the last month')
 print('***************************************')
 
+run.finish(solver)
+
 #%% End of file
\ No newline at end of file
@@ -10,36 +10,41 @@ Created on Fri Jul 10 13:47:04 2020
 #%% Importing Gurobi Shell and other libraries
 
 import gurobipy as gb
-import pandas as pd
+import numpy as np
 from datetime import datetime
-        
-#%% Model Data
+import os
+import sys
 
-# Importing data from excel file
-data = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = None)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import cache, params, parametric, results, sensitivity, telemetry
 
-# Creating dictionaries with the data
+#%% Settings
 
-dic_profit = {}
-for index, row in data['profit'].iterrows(): dic_profit[row[0]] = row[1]
-    
-dic_prod = {}
-for index, row in data['production'].iterrows(): dic_prod[row[0],row[1]] = row[2]
+# Sensitivity analysis after the report: 'ask' prompts for it, True prints it and False skips it (batch runs).
+# The reduced costs, duals and ranges are read in bulk (sensitivity module) either way
+SENSITIVITY = 'ask'
 
-dic_mach = {}
-for index, row in data['machinery'].iterrows(): dic_mach[row[0],row[1]] = row[2]
+# Value of the machines: piecewise-linear curves of the objective in the production hours of every machine-month,
+# from no machine up to EXTRA_MACHINES more than planned, walked along the right-hand side ranges of the capacity
+# constraints with one warm re-solve per breakpoint (parametric module). None skips them
+EXTRA_MACHINES = None
+        
+#%% Model Data
+
+run = telemetry.start('Factory Planning I')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-dic_demand = {}
-for index, row in data['demand'].iterrows(): dic_demand[row[0],row[1]] = row[2]
+# Importing data from excel file
+data = cache.read_excel('Parameters.xlsx')
 
-scalars = {}
-for index, row in data['scalars'].iterrows(): scalars[row[0]] = row[1]
+run.phase('parameters')
 
-# Creating model parameters
-products, c = gb.multidict(dic_profit) 
-products_machines, a = gb.multidict(dic_prod)
-machines_months, n = gb.multidict(dic_mach)
-products_months, b = gb.multidict(dic_demand)
+# Creating model parameters (columnar loading of the sheets)
+products, c = params.multidict(data['profit'], 'PRODUCT', 'PROFIT')
+products_machines, a = params.multidict(data['production'], ['PRODUCT','MACHINE'], 'PRODUCTION')
+machines_months, n = params.multidict(data['machinery'], ['MACHINE','MONTH'], 'NUMBER')
+products_months, b = params.multidict(data['demand'], ['PRODUCT','MONTH'], 'DEMAND')
+scalars = params.scalars(data['scalars'])
 
 machines = data['machinery']['MACHINE'].unique()
 months = data['machinery']['MONTH'].unique()
@@ -49,7 +54,7 @@ for k, v in c.items():
     for t in months:
         p[(k,t)] = v
 
-del data, dic_demand, dic_mach, dic_prod, dic_profit, index, row
+del data
 
 #%% Model Formulation
 
@@ -58,6 +63,7 @@ del data, dic_demand, dic_mach, dic_prod, dic_profit, index, row
 model = gb.Model('Factory Planning I')
 
 #-------------- Variables Creation
+run.phase('variables')
 x = model.addVars(products_months, name = 'produce', obj = 0)
 y = model.addVars(products_months, name = 'sell', obj = p, ub = b)
 q = model.addVars(products_months, name = 'store', obj = -scalars['StorageCost'], ub = scalars['StorageCapacity'])
@@ -65,6 +71,7 @@ q = model.addVars(products_months, name = 'store', obj = -scalars['StorageCost']
 model.ModelSense = gb.GRB.MAXIMIZE
 
 #------------- Constraints Creation
+run.phase('constraints')
 
 # 1.	The production policy of a month cannot surpass the production hours availability of any machine
 
@@ -93,29 +100,30 @@ model.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet pri
 # Setting timer
 begin = datetime.now()
 
-model.optimize()
+run.phase('optimize')
+run.optimize(model)
 
 # Stopping timer
 elapsed = datetime.now() - begin
 
 #%% Results Report
 
-# Reporting variables values
-for t in months:
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one row per product and month)
+df_solution = results.frame(model, {'produce': x, 'sell': y, 'store': q}, ['PRODUCT','MONTH'])
+for t, df_month in df_solution.groupby('MONTH', sort = False):
     print(f'---------------------------\n{t}\n---------------------------')
     print('Production:')
-    for p in products:
-        val = x[p,t].x
+    for p, val in df_month[['PRODUCT','produce']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val}')
     print('Sales:')
-    for p in products:
-        val = y[p,t].x
+    for p, val in df_month[['PRODUCT','sell']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val} (£{c[p]} each)')
     print('Inventory:')
-    for p in products:
-        val = q[p,t].x
+    for p, val in df_month[['PRODUCT','store']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val}')        
     
@@ -124,7 +132,7 @@ for t in months:
 # Reporting objective function value
 print('***************************************')
 print(f'Objective function value: £{round(model.objval)}')
-print(f'Time elapsed: {round(elapsed.microseconds/1000000,2)} seconds')
+print(f'Time elapsed: {round(elapsed.total_seconds(),2)} seconds')
 print('***************************************')
 
 
@@ -145,43 +153,54 @@ for t in months:
 #%% Sensitivity Analysis
 
 def SensitivityAnalysis():
+    # Reduced costs, duals and ranges fetched in bulk, one getAttr call per attribute
+    df_sell = sensitivity.variable_frame(model, y, ['PRODUCT','MONTH'])
+    df_capacity = sensitivity.constraint_frame(model, c1, ['MACHINE','MONTH'])
+    bound = lambda value: value if np.isinf(value) else round(value)
+
     # Reduced Costs
     print('\n*******************************************')
     print('Reduced Costs: Recommended price increases')
     print('*******************************************')
+    # Evade the cases where reduced cost is 0 or where the value take the upper bound value (bound shadow price)
+    df_sell['rc'] = df_sell['reduced_cost'].round(1)
+    df_sell = df_sell[(df_sell['rc'] != 0) & (df_sell['value'] != df_sell['ub'])]
     for t in months:
-        for p in products:
-            rc = round(y[p,t].rc,1)
-            # Evade the cases where reduced cost is 0 or where the value take the upper bound value (bound shadow price)
-            if rc != 0 and y[p,t].x != y[p,t].ub:
-                lb = y[p,t].SAObjLow
-                ub = y[p,t].SAObjUp
-                if lb != float('-inf'):
-                    lb = round(lb)
-                if ub != float('inf'):
-                    ub = round(ub)
-                print(f'{"-"*10}\n{t}\n{"-"*10}')
-                print(f'{p}: {rc} \t\tObj range: [{ub}, {lb}]')
+        for p, rc, lb, ub in df_sell.loc[df_sell['MONTH'] == t, ['PRODUCT','rc','obj_low','obj_up']].itertuples(index = False):
+            print(f'{"-"*10}\n{t}\n{"-"*10}')
+            print(f'{p}: {rc} \t\tObj range: [{bound(ub)}, {bound(lb)}]')
             
     # Bound sensitivities of variables
     print('\n*******************************************')
     print('Shadow prices: Value of an extra machine hour')
     print('*******************************************')
+    df_capacity['shadow'] = df_capacity['dual'].round(2)
+    df_capacity = df_capacity[df_capacity['shadow'] != 0]
     for t in months:
-        for m in machines:
-            shadow = round(c1[m,t].pi,2)
-            if shadow != 0:
-                lb = c1[m,t].SARHSLow
-                ub = c1[m,t].SARHSUp
-                if lb != float('-inf'):
-                    lb = round(lb)
-                if ub != float('inf'):
-                    ub = round(ub)
-                print(f'{"-"*10}\n{t}\n{"-"*10}')
-                print(f'{m}: {shadow} ---> range: [{lb}, {ub}]')
-                
-SA = input('Print Sensitivity Analysis? [y/n]\n')
-if SA == 'y':
+        for m, shadow, lb, ub in df_capacity.loc[df_capacity['MONTH'] == t, ['MACHINE','shadow','rhs_low','rhs_up']].itertuples(index = False):
+            print(f'{"-"*10}\n{t}\n{"-"*10}')
+            print(f'{m}: {shadow} ---> range: [{bound(lb)}, {bound(ub)}]')
+
+#%% Value of extra machines
+
+if EXTRA_MACHINES is not None:
+    run.phase('parametric')
+    hours = scalars['ProductiveHours']
+    df_curves, solves = parametric.rhs_curves(model, c1, ['MACHINE','MONTH'], low = 0,
+                                              high = [hours*(n[k] + EXTRA_MACHINES) for k in c1.keys()])
+    print('\n*******************************************')
+    print(f'Value of extra machines ({solves} warm solves)')
+    print('*******************************************')
+    for (m, t), df_curve in df_curves.groupby(['MACHINE','MONTH'], sort = False):
+        gains = parametric.evaluate(df_curve, hours*(n[m,t] + np.arange(1, EXTRA_MACHINES + 1))) - model.objval
+        if np.any(gains > 1e-6):
+            print(f'{m} - {t}: ' + ', '.join(f'+{k} -> £{round(g)}' for k, g in enumerate(gains, 1)))
+
+run.finish(model)    # Before the prompt, which would be timed as reporting
+
+if SENSITIVITY == 'ask':
+    SENSITIVITY = input('Print Sensitivity Analysis? [y/n]\n') == 'y'
+if SENSITIVITY:
     SensitivityAnalysis()
 
 #%% End of file
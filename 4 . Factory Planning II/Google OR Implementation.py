@@ -9,126 +9,52 @@ Created on Tue Jul 14 15:56:51 2020
 
 #%% Importing libraries
 
-from ortools.linear_solver import pywraplp
-import pandas as pd
 from datetime import datetime
+import os
+import sys
 
-#%% Importing parameters
-
-# Importing data from excel file
-data = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = None)
-
-products = data['profit']['PRODUCT'].unique()
-machines = data['machinery']['MACHINE'].unique()
-months = data['demand']['MONTH'].unique()
-
-profits = data['profit']
-profits = profits.set_index('PRODUCT')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import lp, models, results, telemetry
 
-production = data['production']
-production = production.set_index(['PRODUCT','MACHINE'])
-
-machinery = data['machinery']
-machinery = machinery.set_index('MACHINE')
+#%% Importing parameters
 
-demands = data['demand']
-demands = demands.set_index(['PRODUCT', 'MONTH'])
+run = telemetry.start('Factory Planning II')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-scalars = data['scalars']
-scalars = scalars.set_index('NAME')
+# Importing data from excel file (arrays by product, machine and month)
+data = models.read_factory('Parameters.xlsx')
 
 #%% Model Formulation
 
-# Instantiate a Glop solver
-solver = pywraplp.Solver('Factory Planning I', pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING)
-
-# ------------------------ Declaring objective
-objective = solver.Objective()
-objective.SetMaximization()
-
-# ------------------------ Creating variables
-use = {}
-sell = {}
-store = {}
-maintain = {}
-for p in products:
-    profit = int(profits.loc[p])
-    for t in months:
-        demand = int(demands.loc[p,t])
-        # Creating <use> variables
-        var = solver.NumVar(0, solver.infinity(), f'Use[{p},{t}]')
-        use[(p,t)] = var
-        objective.SetCoefficient(var, 0)
-        # Creating <sell> variables with simple upper bound
-        var = solver.NumVar(0, demand, f'Sell[{p},{t}]')
-        sell[(p,t)] = var
-        objective.SetCoefficient(var, profit)
-        # Creating <store> variables with simple upper bound
-        var = solver.NumVar(0, int(scalars.loc['StorageCapacity']), f'Store[{p},{t}]')
-        store[(p,t)] = var
-        objective.SetCoefficient(var, -float(scalars.loc['StorageCost']))
-
-for m in machines:
-    for t in months:
-        # Creating <maintain> variables with simple upper bound and integrality
-        var = solver.IntVar(0, 3, f'Maintain[{m},{t}]')
-        maintain[(m,t)] = var
-        objective.SetCoefficient(var, 0)        
-
-# ------------------------ Creating constrraints
-
-# 1.	The production policy of a month cannot surpass the production hours availability of any machine
-for m in machines:
-    for t in months:
-        # sum(p in products) production[p,m]*use[p,m] + ProductiveHours*maintain[m,t] <= ProductiveHours*machinery[m]
-        upper_b = int(machinery.loc[m])*int(scalars.loc['ProductiveHours'])
-        constr = solver.Constraint(0, upper_b)
-        constr.SetCoefficient(maintain[m,t], int(scalars.loc['ProductiveHours']))
-        for p in products:
-            constr.SetCoefficient(use[p,t], float(production.loc[p,m]))
-            
+# Variables: use (produce), sell (upper bound the demand) and store (upper bound StorageCapacity) of every product
+# in every month, and the integer maintain (0 to 3 machines down) of every machine in every month
+# Constraints:
+# 1.	The production policy of a month cannot surpass the production hours availability of the machines that
+#       are not in maintenance
 # 2.	The units sold in any month must be less or equal to the units demanded (upper bound constraint)
-
-# 3.	Relationship between units produced, sold and stored:
-for p in products:
-    # 3.1 Initial inventory: store[p,'Jan'] - use[p,'Jan'] + sell[o, 'Jan'] = 0
-    constr = solver.Constraint(0, 0)
-    constr.SetCoefficient(store[p,months[0]], 1)
-    constr.SetCoefficient(use[p,months[0]], -1)
-    constr.SetCoefficient(sell[p,months[0]], 1)
-    # 3.2 Final inventory: inv[p,'Jun'] = 50
-    final = int(scalars.loc['FinalStorage'])
-    constr = solver.Constraint(final, final)
-    constr.SetCoefficient(store[p,months[-1]], 1)
-    
-    for j in range(1, len(months)):
-        t = months[j]
-        t1 = months[j-1]
-        # store[p,t] - store[p,t-1] - use[p,t] + sell[p,t] = 0
-        constr = solver.Constraint(0,0)
-        constr.SetCoefficient(store[p,t], 1)
-        constr.SetCoefficient(store[p,t1], -1)
-        constr.SetCoefficient(use[p,t], -1)
-        constr.SetCoefficient(sell[p,t], 1)
-    
+# 3.	Relationship between units produced, sold and stored, with the desired final storage in the last month
 # 4.	Storage capacity (upper bound constraint)
-
 # 5.	Each machine should enter maintenance once (exception: grinder only 2) in the six months
 
-for m in machines[machines != 'Grinding']:
-    # sum(t in months) maintain[m,t] == machinery[m] for m in machines
-    constr = solver.Constraint(1,1)
-    for t in months:
-        constr.SetCoefficient(maintain[m,t],1)
+# The model is declared in array form and loaded into a CBC solver from an MPModelProto in bulk, instead of one
+# SetCoefficient call per coefficient
+run.phase('build')
+model = models.fp2(data)
+solver = lp.to_pywraplp(model, 'cbc')
+objective = solver.Objective()
 
-constr = solver.Constraint(2,2)
-for t in months:
-    constr.SetCoefficient(maintain['Grinding',t],1)
+# 5. models.fp2 maintains each of the machines of a type once: here every type enters maintenance once
+constraints = solver.constraints()
+positions, index = model.row_blocks['maintenance']    # A variable block of the same name, so not model.keyed()
+for m, k in zip(index, positions.tolist()):
+    if m != 'Grinding':
+        constraints[k].SetBounds(1, 1)
 
 # ------------------------ Model Execution
 # Setting timer
 begin = datetime.now()
 
+run.phase('optimize')
 status = solver.Solve()
 
 # Stopping timer
@@ -136,27 +62,32 @@ elapsed = datetime.now() - begin
 
 #%% Results report
 
-# Reporting variables values
-for t in months:
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one row per product and month)
+x = results.solution(solver)    # All the variable values in one solution response
+df_solution = results.block_frame(model, x, ('produce', 'sell', 'store'), ['PRODUCT','MONTH'])
+df_maintenance = results.block_frame(model, x, ['maintenance'], ['MACHINE','MONTH'])
+for t, df_month in df_solution.groupby('MONTH', sort = False):
     print(f'---------------------------\n{t}\n---------------------------')
     print('Production:')
-    for p in products:
-        val = round(use[p,t].solution_value(),2)
+    for p, val in df_month[['PRODUCT','produce']].itertuples(index = False):
+        val = round(val,2)
         if val > 0:
             print(f'\t{p} -> {val}')
     print('Sales:')
-    for p in products:
-        val = round(sell[p,t].solution_value(),2)
+    for p, val in df_month[['PRODUCT','sell']].itertuples(index = False):
+        val = round(val,2)
         if val > 0:
             print(f'\t{p} -> {val}')
     print('Inventory:')
-    for p in products:
-        val = round(store[p,t].solution_value(),2)
+    for p, val in df_month[['PRODUCT','store']].itertuples(index = False):
+        val = round(val,2)
         if val > 0:
             print(f'\t{p} -> {val}')
     print('Maintenance:-------')      
-    for m in machines:
-        val = round(maintain[m,t].solution_value(),2)
+    for m, val in df_maintenance.loc[df_maintenance['MONTH'] == t, ['MACHINE','maintenance']].itertuples(index = False):
+        val = round(val,2)
         if val > 0:
             print(f'\t{m}')  
     
@@ -164,7 +95,9 @@ for t in months:
 
 print('***************************************')
 print(f'Objective function value: £{round(objective.Value())}')
-print(f'Time elapsed: {round(elapsed.microseconds/1000000,2)} seconds')
+print(f'Time elapsed: {round(elapsed.total_seconds(),2)} seconds')
 print('***************************************')
-            
+
+run.finish(solver)
+
 #%% End of file
@@ -13,34 +13,28 @@ Created on Tue Jul 14 14:26:29 2020
 import gurobipy as gb
 import pandas as pd
 from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import cache, params, results, telemetry
         
 #%% Model Data
 
-# Importing data from excel file
-data = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = None)
-
-# Creating dictionaries with the data
-
-dic_profit = {}
-for index, row in data['profit'].iterrows(): dic_profit[row[0]] = row[1]
-    
-dic_prod = {}
-for index, row in data['production'].iterrows(): dic_prod[row[0],row[1]] = row[2]
-
-dic_mach = {}
-for index, row in data['machinery'].iterrows(): dic_mach[row[0]] = row[1]
+run = telemetry.start('Factory Planning II')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-dic_demand = {}
-for index, row in data['demand'].iterrows(): dic_demand[row[0],row[1]] = row[2]
+# Importing data from excel file
+data = cache.read_excel('Parameters.xlsx')
 
-scalars = {}
-for index, row in data['scalars'].iterrows(): scalars[row[0]] = row[1]
+run.phase('parameters')
 
-# Creating model parameters
-products, c = gb.multidict(dic_profit) 
-products_machines, a = gb.multidict(dic_prod)
-machines, n = gb.multidict(dic_mach)
-products_months, b = gb.multidict(dic_demand)
+# Creating model parameters (columnar loading of the sheets)
+products, c = params.multidict(data['profit'], 'PRODUCT', 'PROFIT')
+products_machines, a = params.multidict(data['production'], ['PRODUCT','MACHINE'], 'PRODUCTION')
+machines, n = params.multidict(data['machinery'], 'MACHINE', 'NUMBER')
+products_months, b = params.multidict(data['demand'], ['PRODUCT','MONTH'], 'DEMAND')
+scalars = params.scalars(data['scalars'])
 
 machines = pd.Series(machines)
 months = data['demand']['MONTH'].unique()
@@ -50,7 +44,7 @@ for k, v in c.items():
     for t in months:
         prices[(k,t)] = v
 
-del data, dic_demand, dic_mach, dic_prod, dic_profit, index, row
+del data
 
 #%% Model Formulation
 
@@ -59,6 +53,7 @@ del data, dic_demand, dic_mach, dic_prod, dic_profit, index, row
 model = gb.Model('Factory Planning I')
 
 #-------------- Variables Creation
+run.phase('variables')
 x = model.addVars(products_months, name = 'produce', obj = 0)
 y = model.addVars(products_months, name = 'sell', obj = prices, ub = b)
 q = model.addVars(products_months, name = 'store', obj = -scalars['StorageCost'], ub = scalars['StorageCapacity'])
@@ -67,6 +62,7 @@ z = model.addVars([(m,t) for m in machines for t in months], name = 'maintenance
 model.ModelSense = gb.GRB.MAXIMIZE
 
 #------------- Constraints Creation
+run.phase('constraints')
 
 # 1.	The production policy of a month cannot surpass the production hours availability of any machine
 
@@ -99,34 +95,35 @@ model.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet pri
 # Setting timer
 begin = datetime.now()
 
-model.optimize()
+run.phase('optimize')
+run.optimize(model)
 
 # Stopping timer
 elapsed = datetime.now() - begin
 
 #%% Results Report
 
-# Reporting variables values
-for t in months:
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one row per product and month)
+df_solution = results.frame(model, {'produce': x, 'sell': y, 'store': q}, ['PRODUCT','MONTH'])
+df_maintenance = results.frame(model, z, ['MACHINE','MONTH'])
+for t, df_month in df_solution.groupby('MONTH', sort = False):
     print(f'---------------------------\n{t}\n---------------------------')
     print('Production:--------')
-    for p in products:
-        val = x[p,t].x
+    for p, val in df_month[['PRODUCT','produce']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val}')
     print('Sales:-------------')
-    for p in products:
-        val = y[p,t].x
+    for p, val in df_month[['PRODUCT','sell']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val} (£{c[p]} each)')
     print('Inventory:---------')
-    for p in products:
-        val = q[p,t].x
+    for p, val in df_month[['PRODUCT','store']].itertuples(index = False):
         if val > 0:
             print(f'\t{p} -> {val}')       
     print('Maintenance:-------')      
-    for m in machines:
-        val = z[m,t].x
+    for m, val in df_maintenance.loc[df_maintenance['MONTH'] == t, ['MACHINE','value']].itertuples(index = False):
         if val > 0:
             print(f'\t{m}')  
         
@@ -134,9 +131,10 @@ for t in months:
 # Reporting objective function value
 print('***************************************')
 print(f'Objective function value: £{round(model.objval)}')
-print(f'Time elapsed: {round(elapsed.microseconds/1000000,2)} seconds')
+print(f'Time elapsed: {round(elapsed.total_seconds(),2)} seconds')
 print('***************************************')
 
+run.finish(model)
 
 #%% Reporting constraints slacks
 '''
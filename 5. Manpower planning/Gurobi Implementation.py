@@ -11,24 +11,23 @@ Created on Thu Jul 23 11:27:37 2020
 #%% Importing Gurobi Shell and other libraries
 
 import gurobipy as gb
-import pandas as pd
 from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import cache, params, results, telemetry
 
 
 #%% Model Data
 
+run = telemetry.start('Manpower Planning')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
+
 # Importing data from excel file
-data = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = None)
+data = cache.read_excel('Parameters.xlsx')
 
-# Creating dictionaries with the data
-
-dic_skills = {}
-for index, row in data['skills'].iterrows(): 
-    dic_skills[row[0]] = (row[1], row[2], row[3], row[4], row[5])
-    
-dic_demand = {}
-for index, row in data['demand'].iterrows(): 
-    dic_demand[row[0],row[1]] = row[2]
+run.phase('parameters')
 
 years = list(data['demand'].YEAR.unique())
 retrain_downgrade_years = []
@@ -39,11 +38,11 @@ for i in years:
     retrain_downgrade_years.append(('SK -> US',i))
     retrain_downgrade_years.append(('SS -> US',i))
 
-# Creating model parameters
-skills, initial, A, redCost, ovCost, stCost = gb.multidict(dic_skills) 
-skills_years, B = gb.multidict(dic_demand)
+# Creating model parameters (columnar loading of the sheets)
+skills, initial, A, redCost, ovCost, stCost = params.multidict(data['skills'], 'SKILL')
+skills_years, B = params.multidict(data['demand'], ['SKILL','YEAR'], 'DEMAND')
 
-del data, dic_skills, dic_demand, index, row, i
+del data, i
 
 #%% Model Formulation
 
@@ -52,6 +51,7 @@ del data, dic_skills, dic_demand, index, row, i
 model = gb.Model('Manpower Planning')
 
 #-------------- Variables Creation
+run.phase('variables')
 t = model.addVars(skills_years, obj = 0, vtype = gb.GRB.INTEGER, name='t')
 
 u = model.addVars(skills_years, obj = 0, vtype = gb.GRB.INTEGER, name='u')
@@ -89,6 +89,7 @@ for i in years:
 model.ModelSense = gb.GRB.MINIMIZE
 
 #------------- Constraints Creation
+run.phase('constraints')
 
 # 1.	Continuity: Workers at each time depend on the wastage, recruitment, retraining and redundancy
 SK = 'Skilled'
@@ -132,73 +133,78 @@ model.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet pri
 # Setting timer
 begin = datetime.now()
 
-model.optimize()
+run.phase('optimize')
+run.optimize(model)
 
 # Stopping timer
 elapsed = datetime.now() - begin
 
 #%% Results Report
 
-# Reporting variables values
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one dictionary by key per group of variables)
+labour, recruited, moved, redundant, short, over = (results.by_key(model, group) for group in (t, u, v, w, x, y))
 for i in years:
     print(f'---------------------------\n{i}\n---------------------------')
     print('Labour Force:------------')
     for s in skills:
-        val = t[s,i].x
+        val = labour[s,i]
         if val > 0:
             print(f'{s} -> {val}')
             
     print('\nRecruitment:-------------')
     for s in skills:
-        val = u[s,i].x
+        val = recruited[s,i]
         if val > 0:
             print(f'{s} -> {val}')
             
     print('\nRetraining:--------------')
-    val = v['US -> SS',i].x
+    val = moved['US -> SS',i]
     if val > 0:
         print(f'US -> SS -> {val}')
-    val = v['SS -> SK',i].x
+    val = moved['SS -> SK',i]
     if val > 0:
         print(f'SS -> SK -> {val}')  
         
     print('\nDowngrading:-------------')
-    val = v['SK -> SS',i].x
+    val = moved['SK -> SS',i]
     if val > 0:
         print(f'SK -> SS -> {val}')
-    val = v['SK -> US',i].x
+    val = moved['SK -> US',i]
     if val > 0:
         print(f'SK -> US -> {val}')
-    val = v['SS -> US',i].x
+    val = moved['SS -> US',i]
     if val > 0:
         print(f'SS -> US -> {val}')
     
     print('\nRedundancy:--------------')
     for s in skills:
-        val = w[s,i].x
+        val = redundant[s,i]
         if val > 0:
             print(f'{s} -> {val}')
             
     print('\nShort Time Working:------')
     for s in skills:
-        val = x[s,i].x
+        val = short[s,i]
         if val > 0:
             print(f'{s} -> {val}')
             
     print('\nOvermanning:-------------')
     for s in skills:
-        val = y[s,i].x
+        val = over[s,i]
         if val > 0:
             print(f'{s} -> {val}')
 
 # Reporting objective function value
 print('***************************************')
 print(f'Objective function value: £{round(model.objval)}')
-print(f'Time elapsed: {round(elapsed.microseconds/1000000,2)} seconds')
+print(f'Time elapsed: {round(elapsed.total_seconds(),2)} seconds')
 print('***************************************')
 
 print('\nNOTE: The solution of the book: £498677 is obtained \
 using continuous variables instead of integer variables')
 
+run.finish(model)
 
 #%% End of file
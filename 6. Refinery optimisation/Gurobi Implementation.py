@@ -11,65 +11,36 @@ Created on Mon Aug  3 18:01:47 2020
 #%% Importing Gurobi Shell and other libraries
 
 import gurobipy as gb
-import pandas as pd
 from datetime import datetime
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import cache, params, results, telemetry
 
 
 #%% Model Data
 
-# Importing data from excel file
-data = pd.read_excel('Parameters.xlsx', index_col = None, header = 0, sheet_name = None)
+run = telemetry.start('Refinery Optimisation')    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-# Creating dictionaries with the data
+# Importing data from excel file
+data = cache.read_excel('Parameters.xlsx')
 
-dic_octane = {}
-for index, row in data['octane'].iterrows(): 
-    dic_octane[row[0]] = row[1]
-    
-dic_fractions = {}
-for index, row in data['fractions'].iterrows(): 
-    dic_fractions[row[0],row[1]] = row[2]
-    
-dic_yield_reform = {}
-for index, row in data['yield_reform'].iterrows(): 
-    dic_yield_reform[row[0]] = row[1]
-    
-dic_yield_crack_oil = {}
-for index, row in data['yield_crack_oil'].iterrows(): 
-    dic_yield_crack_oil[row[0]] = row[1]
-    
-dic_yield_crack_gas = {}
-for index, row in data['yield_crack_gas'].iterrows(): 
-    dic_yield_crack_gas[row[0]] = row[1]
+run.phase('parameters')
 
-dic_octane_petrols = {}
-for index, row in data['octane_petrols'].iterrows(): 
-    dic_octane_petrols[row[0]] = row[1]
-    
-dic_vapor_fuel = {}
-for index, row in data['vapor_fuel'].iterrows(): 
-    dic_vapor_fuel[row[0]] = (row[1],row[2])
-    
-dic_availability = {}
-for index, row in data['availability'].iterrows(): 
-    dic_availability[row[0]] = row[1]
-    
-dic_profit = {}
-for index, row in data['profit'].iterrows(): 
-    dic_profit[row[0]] = row[1]
-    
 scalars = data['scalars'].set_index('NAME')
 
-# Creating model parameters
-naphtha_gas, o = gb.multidict(dic_octane) 
-_, f = gb.multidict(dic_fractions)  
-naphthas, r = gb.multidict(dic_yield_reform)  
-standard, co = gb.multidict(dic_yield_crack_oil) 
-standard, cg = gb.multidict(dic_yield_crack_gas) 
-petrols, m = gb.multidict(dic_octane_petrols) 
-oils, s, q = gb.multidict(dic_vapor_fuel) 
-crudes, a = gb.multidict(dic_availability)
-products, profits = gb.multidict(dic_profit)
+# Creating model parameters (columnar loading of the sheets)
+naphtha_gas, o = params.multidict(data['octane'])
+_, f = params.multidict(data['fractions'], ['CRUDE','NAPHTHA_STANDARD'], 'FRACTION')
+naphthas, r = params.multidict(data['yield_reform'])
+standard, co = params.multidict(data['yield_crack_oil'])
+standard, cg = params.multidict(data['yield_crack_gas'])
+petrols, m = params.multidict(data['octane_petrols'])
+oils, s, q = params.multidict(data['vapor_fuel'])
+crudes, a = params.multidict(data['availability'])
+products, profits = params.multidict(data['profit'])
 
 naphtha_gas_petrol = []
 for j in naphtha_gas:
@@ -78,8 +49,7 @@ for j in naphtha_gas:
         
 naphtha_gas_petrol = gb.tuplelist(naphtha_gas_petrol)
 
-del data, dic_octane, dic_fractions, dic_yield_reform, dic_yield_crack_oil, dic_yield_crack_gas, dic_octane_petrols
-del dic_vapor_fuel, dic_availability, dic_profit, index, row
+del data
 
 #%% Model Formulation
 
@@ -88,6 +58,7 @@ del dic_vapor_fuel, dic_availability, dic_profit, index, row
 model = gb.Model('Refinery Optimisation')
 
 #-------------- Variables Creation
+run.phase('variables')
 distille = model.addVars(crudes, name='distille', ub = a)
 reform = model.addVars(naphthas, name='reform')
 crack = model.addVars(standard, name='crack')
@@ -100,6 +71,7 @@ sell['Lube oil'].ub = int(scalars.loc['lu'])
 model.ModelSense = gb.GRB.MAXIMIZE
 
 #------------- Constraints Creation
+run.phase('constraints')
 
 # 1.	The barrels of naphtha available for reforming and blending petrol depend on the fraction of distilled 
 #       crude barrels that produce that naphtha
@@ -162,30 +134,35 @@ model.setParam('OutputFlag',1)    # Turns off the Optimization Details sheet pri
 # Setting timer
 begin = datetime.now()
 
-model.optimize()
+run.phase('optimize')
+run.optimize(model)
 
 # Stopping timer
 elapsed = datetime.now() - begin
 
 #%% Results Report
 
-# Reporting variables values
+run.phase('report')
+
+# Reporting variables values (fetched in bulk, one dictionary by key per group of variables)
+distilled, reformed, cracked, blended_petrol, blended_jet, sold = (results.by_key(model, group) for group in
+    (distille, reform, crack, blendp, blendj, sell))
 
 print('---------------------------\nDistille\n---------------------------')
 for c in crudes:
-    val = distille[c].x
+    val = distilled[c]
     if val > 0:
         print(f'{c} -> {val}')
      
 print('---------------------------\nReform\n---------------------------')
 for n in naphthas:
-    val = reform[n].x
+    val = reformed[n]
     if val > 0:
         print(f'{n} -> {val}')
 
 print('---------------------------\nCrack\n---------------------------')
 for j in standard:
-    val = crack[j].x
+    val = cracked[j]
     if val > 0:
         print(f'{j} -> {val}')
 
@@ -193,25 +170,25 @@ print('---------------------------\nBLend\n---------------------------')
 for p in petrols:
     print(f'\n{p}:')
     for j in naphtha_gas:
-        val = blendp[j,p].x
+        val = blended_petrol[j,p]
         if val > 0:
             print(f'\t{j} -> {val}')
             
 print('\nJet fuel:')
 for j in oils:
-    val = blendj[j].x
+    val = blended_jet[j]
     if val > 0:
         print(f'\t{j} -> {val}')
         
 print('\nFuel oil:')
 for j in oils:
-    val = sell['Fuel oil'].x
+    val = sold['Fuel oil']
     if val > 0:
         print(f'\t{j} -> {val*q[j]}')            
 
 print('---------------------------\nSales\n---------------------------')
 for j in products:
-    val = sell[j].x
+    val = sold[j]
     if val > 0:
         print(f'{j} -> {val}')
     
@@ -219,11 +196,14 @@ for j in products:
 # Reporting objective function value
 print('\n***************************************')
 print(f'Objective function value: £{round(model.objval)}')
-print(f'Time elapsed: {round(elapsed.microseconds/1000000,2)} seconds')
+print(f'Time elapsed: {round(elapsed.total_seconds(),2)} seconds')
 print('***************************************')
 
 
 print('\nDifference with respect to answer in the \nbook (£211.365) is due to the approximations \nused in the book')
+
+run.finish(model)
+
 #%% End of file
 PMF = 6818
 RMF = 17044
@@ -47,60 +47,87 @@ Formulation:
 
 #%% Importing Gurobi Shell and other libraries
 
-import gurobipy as gb
-import pandas as pd
-import openpyxl  # This module is used by pandas.read_excel() for newer versions of Excel
+import numpy as np
 import os
 
-#%% Using directory where the file is located
-abspath = os.path.abspath(__file__)
-dname = os.path.dirname(abspath)
-os.chdir(dname)
+from mathprog import cache, network, params, results, telemetry
 
-#%% Model Data
+#%% Settings
 
-# Importing data from excel file
-df_nodes = pd.read_excel('Parameters NFT.xlsx', index_col = None, header = 0, sheet_name = 'nodes')
-df_edges = pd.read_excel('Parameters NFT.xlsx', index_col = None, header = 0, sheet_name = 'edges')
-
-# Creating dictionaries
-dic_nodes = {row[0]:row[1] for index,row in df_nodes.iterrows()}    
-dic_edges = {(row[0],row[1]):(row[2],row[3],row[4]) for index, row in df_edges.iterrows()}
-    
-    
-# Creating model parameters
-nodes, b = gb.multidict(dic_nodes)
-edges, c, l, u = gb.multidict(dic_edges)
+# Solver: 'gurobi' solves the LP, 'ortools' uses the specialized min cost flow algorithm of OR-tools
+# (SimpleMinCostFlow), which needs integral parameters but no license and is much faster on huge networks
+SOLVER = 'gurobi'
 
+# Matrix form (gurobi solver) builds the balance constraints from the sparse node-arc incidence matrix (linear in the number of
+# arcs), instead of one x.sum(i,'*') - x.sum('*',i) expression per node, which scans every arc for each node
+MATRIX_FORM = True
 
-#%% Model Formulation
+ARRAYS = MATRIX_FORM or SOLVER == 'ortools'
 
-#-------------- Model Creation
+#%% Workbook next to this file (read from any working directory, without changing it)
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Parameters NFT.xlsx')
 
-nf = gb.Model('Network Flow')
+#%% Model Data
 
-#-------------- Variables Creation
+run = telemetry.start('Network Flow Template', solver = SOLVER)    # Phase timers and solver statistics (MATHPROG_TELEMETRY)
+run.phase('read')
 
-x = nf.addVars(edges, name = 'flow', obj = c, vtype = gb.GRB.CONTINUOUS, lb = l, ub = u)
-nf.ModelSense = gb.GRB.MINIMIZE
+# Importing data from excel file
+df_nodes = cache.read_excel(PATH, 'nodes')
+df_edges = cache.read_excel(PATH, 'edges')
 
-#------------- Constraints Creation
+run.phase('parameters')
 
-# Balance Constraints
+# Creating model parameters
+if ARRAYS:
+    # Arrays indexed by node/arc position
+    nodes, b, tails, heads, c, l, u = network.network_arrays(df_nodes, df_edges)
+else:
+    # Dictionaries indexed by node/arc (columnar loading of the sheets)
+    nodes, b = params.multidict(df_nodes, 'NODES', 'B')
+    edges, c, l, u = params.multidict(df_edges, ['NODE I','NODE J'], ['C','L','U'])
 
-nf.addConstrs((x.sum(i,'*') - x.sum('*',i) == b[i] for i in nodes),'balance')
 
-#-------------- Model Execution
+#%% Model Formulation
 
-nf.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet print after the tsp.optimize() call
-nf.optimize()
+# Variables: x_ij flow through the arc (i,j) with bounds l_ij, u_ij and cost c_ij
+# Constraints: balance of each node
+
+if SOLVER == 'ortools':
+    run.phase('optimize')
+    # Solved as a min cost flow problem (the lower bounds are handled with the substitution x = l + y)
+    objval, flow = network.min_cost_flow(b, tails, heads, c, l, u)
+else:
+    run.phase('build')
+    if MATRIX_FORM:
+        nf, x, balance = network.build_matrix_model(b, tails, heads, c, l, u)
+    else:
+        nf, x = network.build_model(nodes, b, edges, c, l, u)
+
+    #-------------- Model Execution
+
+    nf.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet print after the tsp.optimize() call
+    run.phase('optimize')
+    run.optimize(nf)
+    objval = nf.objval
+    if MATRIX_FORM:
+        flow = x.X
 
 #%% Results Report
 
+run.phase('report')
+
 print('---------------------------------\nFlow Variables:\n---------------------------------')
 
-for i,j in edges:
-    if x[i,j].x > 0:
-        print(i,'->',j,':',x[i,j].x,'($'+str(c[i,j]*x[i,j].x)+')')
+if ARRAYS:
+    for k in np.flatnonzero(flow > 0):
+        print(nodes[tails[k]],'->',nodes[heads[k]],':',flow[k],'($'+str(c[k]*flow[k])+')')
+else:
+    # Flows fetched in bulk, arcs with flow only
+    for i, j, value in results.frame(nf, x, ['NODE I','NODE J'], nonzero = True).itertuples(index = False):
+        if value > 0:
+            print(i,'->',j,':',value,'($'+str(c[i,j]*value)+')')
         
-print('---------------------------------\nObjective Funtion Value: $',nf.objval,'\n---------------------------------')    
\ No newline at end of file
+print('---------------------------------\nObjective Funtion Value: $',objval,'\n---------------------------------')    
+
+run.finish(None if SOLVER == 'ortools' else nf, objective = objval)
\ No newline at end of file
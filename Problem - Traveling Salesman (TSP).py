@@ -61,38 +61,84 @@ x_ij = 1: The edge (i,j) is in the tour
 """
 #%% Importing Gurobi Shell and other libraries
 
-from gurobipy import *
-from pandas import *
-from matplotlib.pyplot import *
+import gurobipy as gb
+from mathprog import cache, results, telemetry
+from mathprog import tsp as tsp_utils
+from mathprog import heuristics
+from mathprog.plotting import TourPlot
+
+#%% Settings
+
+# Subtour elimination constraints added as lazy constraints from a callback in a single optimize call,
+# instead of re-optimizing the model from scratch every time subtours are found
+LAZY = True
+
+# Source of the distances: 'matrix' reads the distance sheet, 'euclidean' and 'haversine' compute them from
+# the coordinates sheet (haversine takes X as longitude and Y as latitude), so the n×n sheet is not needed
+DISTANCES = 'matrix'
+
+# Number of nearest neighbours of every city in the sparse candidate graph (0 uses the complete graph). The
+# edges left out are added back when their reduced costs show they could shorten the tour. Needs the distances
+# from the coordinates (DISTANCES = 'euclidean' or 'haversine')
+CANDIDATES = 0
+
+# Tour of the nearest neighbour + 2-opt/Or-opt heuristic handed to the solver as MIP start. With CANDIDATES it is
+# the nearest neighbour tour over the KD-tree of the coordinates (tsp.nearest_tour), without the n×n matrix
+WARM_START = True
+
+# Approximate mode: the heuristic tour is the answer, no model is solved. HEURISTIC_TIME is the time budget of
+# the heuristic in seconds (None runs the improvement moves until none shortens the tour)
+APPROXIMATE = False
+HEURISTIC_TIME = 1.0
+
+# Plot of the solutions: 'window' keeps one figure and refreshes the tour on every iteration, 'file' saves the
+# final tour to PLOT_FILE without opening a window (headless runs) and None disables plotting (batch runs)
+PLOT = 'window'
+PLOT_FILE = 'tsp.png'
         
 #%% Model Data
 
+run = telemetry.start('Traveling Salesman', lazy = LAZY, candidates = CANDIDATES, approximate = APPROXIMATE)    # Phase timers (MATHPROG_TELEMETRY)
+run.phase('read')
+
 # Importing data from excel file
 
-df_distance_matrix = read_excel('Parameters TSP.xlsx', index_col = None, header = 0, sheet_name = 'distance')
-df_coord = read_excel('Parameters TSP.xlsx', index_col = 'CITY', header = 0, sheet_name = 'coordinates')
+df_coord = cache.read_excel('Parameters TSP.xlsx', 'coordinates').set_index('CITY')
 
-# Transforming the distance matrix df_distance into a row-wise distance DataFrame
+# Creating the (i,j) edges, without the (i,i) and the duplicate (j,i) edges, as arrays (upper triangle)
 
-df_distance = melt(df_distance_matrix, id_vars = 'NODE I', var_name = 'NODE J', value_name = 'DISTANCE')
+if CANDIDATES and DISTANCES == 'matrix':
+    raise ValueError("CANDIDATES needs the distances from the coordinates: DISTANCES = 'euclidean' or 'haversine'")
 
-# Eliminating the (i,i) edges and the duplicate (i,j) = (j,i) edges
+if CANDIDATES:
+    vertices = df_coord.index.tolist()    # The candidate edges are chosen by solve_sparse()
+elif DISTANCES == 'matrix':
+    df_distance_matrix = cache.read_excel('Parameters TSP.xlsx', 'distance')
+    vertices, ei, ej, d = tsp_utils.matrix_edges(df_distance_matrix)
+else:
+    vertices, ei, ej, d = tsp_utils.coordinate_edges(df_coord, DISTANCES)
 
-for index, row in df_distance.iterrows():
-    if int(row[0][5:]) >= int(row[1][5:]):    # Filters both, (i,i) and duplicate edges
-        df_distance = df_distance.drop(index)
-        
-# Creating dictionaries with the data
+run.phase('parameters')
 
-dic_distance = {}
+# Creating model parameters
 
-for index, row in df_distance.iterrows():
-    dic_distance[(row[0],row[1])] = row[2]
+if not CANDIDATES:
+    edges, distance = tsp_utils.edge_dicts(vertices, ei, ej, d)
 
-# Creating model parameters
+# Heuristic tour (vertex positions)
 
-vertices = tuplelist(df_distance_matrix.iloc[:,0])
-edges, distance = multidict(dic_distance)
+run.phase('heuristic')
+
+if CANDIDATES and WARM_START and not APPROXIMATE:
+    tour = tsp_utils.nearest_tour(df_coord['X'], df_coord['Y'], CANDIDATES, DISTANCES)    # O(n) memory
+elif WARM_START or APPROXIMATE:
+    if DISTANCES == 'matrix':
+        D = heuristics.square_matrix(len(vertices), ei, ej, d)
+    else:
+        D = tsp_utils.distance_matrix(df_coord, DISTANCES)
+    tour, tour_length = heuristics.heuristic_tour(D, time_limit = HEURISTIC_TIME)
+
+vertices = gb.tuplelist(vertices)
 
 #%% Results Report
 
@@ -100,114 +146,78 @@ def report_results():
     # Reporting variables values    
     print('----------------------------------------\nSelected edges:\n----------------------------------------')
     
-    for i,j in edges:
-        if x[i,j].x > 0:
-            print(i,'->',j,':',x[i,j].obj)
+    keys, values = results.values(tsp, x)    # Values and lengths of the edges fetched in bulk
+    lengths = results.values(tsp, x, 'Obj')[1]
+    for (i,j), value, length in zip(keys, values.tolist(), lengths.tolist()):
+        if value > 0:
+            print(i,'->',j,':',length)
             
     # Reporting objective function value    
     print('****************************************\nThe Total Distance Traveled is: ', round(tsp.objVal),'\n****************************************')
 
 
+def report_tour():
+    # Reporting the edges of the heuristic tour
+    print('----------------------------------------\nHeuristic tour:\n----------------------------------------')
+
+    for a, b in zip(tour, list(tour[1:]) + [tour[0]]):
+        print(vertices[a],'->',vertices[b],':',D[a,b])
+
+    print('****************************************\nThe Total Distance Traveled is: ', round(tour_length),'\n****************************************')
+
+
 #%% Create plot
 '''
 Using <%matplotlib inline> or <%matplotlib qt> is possible 
 to define wheter a plot is shown in the console or a window
 '''
-def create_plot():
-    close()  # Erase previous plot
+tour_plot = TourPlot(df_coord, PLOT, PLOT_FILE)    # Cities and labels are drawn once, the first time
 
-    xlabel("X Coordinate")
-    ylabel("Y Coordinate")
-    title("Travelling Salesman Problem")
-    scatter(df_coord['X'],df_coord['Y'],50,'Blue','o')
-    for index, row in df_coord.iterrows():
-        text(row[0]-5,row[1]+4,index,fontsize = 10)
-    for i,j in edges:
-        if x[i,j].x > 0:
-            plot([df_coord.loc[i,'X'],df_coord.loc[j,'X']], [df_coord.loc[i,'Y'],df_coord.loc[j,'Y']], c = 'red', alpha = 0.8, linestyle = '--',linewidth = 1)
-    show()
+def create_plot():
+    # Replacing the drawn edges by the selected edges of the current solution
+    values = tsp.getAttr('x', list(x.values()))
+    ei, ej = tsp_utils.edge_arrays(vertices, x.keys())
+    selected = [k for k, value in enumerate(values) if value > 0.5]
+    tour_plot.update(ei[selected], ej[selected])
 
 
 #%% Model Formulation
 
-#-------------- Model Creation
-
-tsp = Model('Traveling Salesman Problem')
-
-#-------------- Variables Creation
-
-x = tsp.addVars(edges, name = 'include', obj = distance, vtype = GRB.BINARY)
-tsp.ModelSense = GRB.MINIMIZE
-
-#------------- Constraints Creation
-
-# 1. Each vertex must be visited twice, once entering and one leaving
-
-tsp.addConstrs((x.sum(i,'*') + x.sum('*',i) == 2 for i in vertices), 'visited')
+run.phase('build')
+if not (CANDIDATES or APPROXIMATE):
+    tsp, x = tsp_utils.build_model(vertices, edges, distance)
 
 #-------------- Model Execution
 
-tsp.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet print after the tsp.optimize() call
-tsp.optimize()
+    tsp.setParam('OutputFlag',0)    # Turns off the Optimization Details sheet print after the tsp.optimize() call
+    if WARM_START:
+        tsp_utils.set_start(tsp, x, vertices, tour)
 
 #%% Adding lazy constraints as needed
 
-# This function creates and populates the subtour and checked lists making use of a recursive function call
+# 2. The subtour elimination constraints are added for the subtours found in the solutions, either as lazy
+#    constraints in a single branch and bound tree (LAZY = True), or re-optimizing the model after adding them
 
-def search_next(i):
-    
-    for j in vertices:
-        
-        # The if and elif statementes make sure that the current j vertice exists, isn't checked and takes value
-        
-        if (i,j) in edges and j not in checked:
-            if x[i,j].x > 0:
-                subtour.append(j)
-                checked.append(j)
-                search_next(j)
-                
-        elif (j,i) in edges and j not in checked:
-            if x[j,i].x > 0:
-                subtour.append(j)
-                checked.append(j)
-                search_next(j)
-
-# The while reoptimizes the model such that in each iteration the subtours are identified and the lazy constraints are added
-
-iterate = True
-
-while iterate:
+run.phase('optimize')
+if APPROXIMATE:
+    tour_plot.update_tour(tour)
+    report_tour()
+elif CANDIDATES:
+    tsp, x, stats = tsp_utils.solve_sparse(df_coord, CANDIDATES, DISTANCES, tours = [tour] if WARM_START else ())
     create_plot()
-    
-    subtours = []
-    checked = []
-    
-    for i in vertices:
-        subtour = []
-        
-        if i not in checked:
-            subtour.append(i)
-            checked.append(i)
-            search_next(i)
-            subtours.append(subtour)
-    
-    # This nested fors create the linear expression object that is the sum of the variable in each identified subtour
-    
-    if len(subtours) > 1:
-        for s in subtours:
-            expr = LinExpr()
-            for i in s:
-                for j in s:
-                    if (i,j) in edges:
-                        expr += x[i,j] 
-                        
-            # 2. Lazy Constraints Addition
-            tsp.addConstr(expr <= len(s) - 1,'subtour')
-            
-        # Run the model again
-        tsp.optimize()  
-        
-    # This else end the loop when there is only one subtour in the subtour list, which means, the solution is feasible
-    else:
-        report_results()
-        iterate = False
+elif LAZY:
+    stats = tsp_utils.solve_lazy(tsp, x, vertices)
+    create_plot()
+else:
+    stats = tsp_utils.solve_loop(tsp, x, vertices, on_iteration = create_plot)
+
+run.phase('report')
+if not APPROXIMATE:
+    report_results()
+
+tour_plot.finish()
+
+if APPROXIMATE:
+    run.finish(tour_length = tour_length)
+else:
+    run.finish(tsp, subtours = stats)
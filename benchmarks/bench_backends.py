@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Solver Backends Head to Head
+*************************************
+
+Every model of the repository declared once in array form (models module)
+and solved with each of the lp.BACKENDS:
+
+    declare     seconds to declare the model from the parameters
+    solve       seconds to hand the arrays to the solver and solve (for the
+                TSP, every solve of the subtour elimination loop)
+    objective   optimal objective value, checked against the value of the
+                Gurobi implementation of the problem (within the MIP gap)
+
+Synthetic Food Manufacture I instances (food.synthetic_parameters) of the
+given --sizes compare the backends on larger LPs; their objectives are
+checked against the first backend that solves them.
+
+OR-tools and highspy cannot be imported in the same process (lp module), so
+every backend runs in its own process. GLOP only solves the LPs, and sizes
+beyond a size-limited Gurobi license fail on that backend.
+
+Usage:
+    python benchmarks/bench_backends.py [--backends gurobi glop cbc scip highs]
+                                        [--sizes 20x24 50x48] [--time-limit 60]
+"""
+
+#%% Importing libraries
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import lp, models
+
+EXPECTED = {'fm1': 120342.593, 'fm2': 112778.704, 'fp1': 93715.179, 'fp2': 108855.0, 'manpower': 508700.0,
+            'refinery': 210683.064, 'nft': 100.0, 'tsp': 422.6}
+TOLERANCE = 1e-4
+
+#%% Worker
+
+def _instances(sizes):
+    for problem in models.PROBLEMS:
+        yield problem, problem, lambda problem = problem: models.load(problem)
+    for size in sizes:
+        from mathprog import food
+
+        n_oils, n_months = (int(v) for v in size.split('x'))
+        yield f'fm1 {size}', 'fm1', lambda n_oils = n_oils, n_months = n_months: food.synthetic_parameters(n_oils, n_months)
+
+
+def worker(backend, sizes, time_limit):
+    # Solves every instance with <backend>, one JSON line per instance. The solver library is imported up front
+    # (with SciPy, used to assemble the arrays) so its import time is not charged to the first instance
+    import scipy.sparse
+
+    env = None
+    if backend == 'gurobi':
+        import gurobipy as gb
+        env = gb.Env(params = {'OutputFlag': 0})
+    elif backend == 'highs':
+        import highspy
+    else:
+        from ortools.linear_solver import pywraplp
+
+    for name, problem, reader in _instances(sizes):
+        row = {'instance': name, 'backend': backend}
+        data = reader()
+        begin = time.perf_counter()
+        model = models.PROBLEMS[problem][2](data) if problem != 'tsp' else None
+        row['declare'] = time.perf_counter() - begin
+        begin = time.perf_counter()
+        try:
+            if problem == 'tsp':
+                row['objective'] = models.solve_tsp(data, backend, time_limit, env)[0]
+            else:
+                row['objective'] = lp.solve(model, backend, time_limit, env)[0]
+        except Exception as e:
+            row['error'] = str(e).splitlines()[0]
+        row['solve'] = time.perf_counter() - begin
+        print(json.dumps(row), flush = True)
+
+#%% Benchmark
+
+def main(backends, sizes, time_limit):
+    rows = []
+    for backend in backends:
+        command = [sys.executable, os.path.abspath(__file__), '--worker', backend, '--time-limit', str(time_limit),
+                   '--sizes', *sizes]
+        output = subprocess.run(command, capture_output = True, text = True).stdout
+        rows.extend(json.loads(line) for line in output.splitlines() if line.startswith('{'))
+
+    reference = dict(EXPECTED)
+    print(f'{"instance":>12} {"backend":>8} {"declare [s]":>12} {"solve [s]":>10} {"objective":>14}  check')
+    for row in rows:
+        name = row['instance']
+        if 'error' in row:
+            print(f'{name:>12} {row["backend"]:>8} {row["declare"]:>12.4f} {"":>10} {"":>14}  skipped: {row["error"]}')
+            continue
+        expected = reference.setdefault(name, row['objective'])
+        check = 'ok' if abs(row['objective'] - expected) <= TOLERANCE*max(1, abs(expected)) else f'MISMATCH ({expected})'
+        print(f'{name:>12} {row["backend"]:>8} {row["declare"]:>12.4f} {row["solve"]:>10.4f} {row["objective"]:>14.3f}  {check}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', nargs = '+', default = list(lp.BACKENDS), choices = lp.BACKENDS)
+    parser.add_argument('--sizes', nargs = '*', default = ['20x24', '50x48'], metavar = 'OILSxMONTHS')
+    parser.add_argument('--time-limit', type = float, default = 60)
+    parser.add_argument('--worker', choices = lp.BACKENDS, help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.sizes, args.time_limit)
+    else:
+        main(args.backends, args.sizes, args.time_limit)
+
+#%% End of file
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Workbook Cache
+*************************************
+
+Times the load of every parameters workbook of the repository three ways:
+
+    excel   pd.read_excel(path, sheet_name = None), the original path
+    cold    mathprog.cache.read_excel with an empty cache (parse + store)
+    warm    mathprog.cache.read_excel served from the binary sidecar
+
+The cache used here lives in a temporary directory, so the sidecars of the
+model scripts are left untouched.
+
+Usage:
+    python benchmarks/bench_cache.py [--repeat 5] [workbook.xlsx ...]
+"""
+
+#%% Importing libraries
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import cache
+
+#%% Benchmark
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - begin)
+    return best
+
+
+def main(paths, repeat):
+    print(f'{"workbook":<45} {"excel [ms]":>11} {"cold [ms]":>10} {"warm [ms]":>10} {"speedup":>8}')
+    for path in paths:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            t_excel = best_of(lambda: pd.read_excel(path, index_col = None, header = 0, sheet_name = None), repeat)
+
+            def cold():
+                cache.clear(cache_dir)
+                cache.read_excel(path, cache_dir = cache_dir)
+            t_cold = best_of(cold, repeat)
+
+            t_warm = best_of(lambda: cache.read_excel(path, cache_dir = cache_dir), repeat)
+
+            # The cached sheets must be identical to the parsed ones
+            excel = pd.read_excel(path, index_col = None, header = 0, sheet_name = None)
+            warm = cache.read_excel(path, cache_dir = cache_dir)
+            assert list(excel) == list(warm)
+            for name in excel:
+                pd.testing.assert_frame_equal(excel[name], warm[name])
+
+        name = os.path.relpath(path, ROOT)
+        print(f'{name:<45} {1000*t_excel:>11.1f} {1000*t_cold:>10.1f} {1000*t_warm:>10.1f} {t_excel/t_warm:>7.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs = '*', default = sorted(glob.glob(os.path.join(ROOT, '**', '*.xlsx'), recursive = True)))
+    parser.add_argument('--repeat', type = int, default = 5)
+    args = parser.parse_args()
+    main(args.paths, args.repeat)
+
+#%% End of file
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Food Manufacture I Re-solves
+*************************************
+
+Stream of scenarios of Food Manufacture I that only change the objective
+(random buying costs and selling price around the workbook values):
+
+    rebuild     food.build_fm1 with the scenario parameters and a cold solve
+    warm        one model built once, food.resolve per scenario: batched
+                setAttr('Obj') and re-optimization from the previous basis
+
+Both must return the same objective values. Reported: total and per
+scenario time, and mean simplex iterations.
+
+Usage:
+    python benchmarks/bench_fm1_resolve.py [--scenarios 1000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import gurobipy as gb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food
+
+#%% Scenarios
+
+def random_scenarios(data, n, seed = 0):
+    rng = np.random.default_rng(seed)
+    base = np.array([data['costs'][k] for k in data['oils_months']])
+    prices = data['scalars']['PRICE']*rng.uniform(0.9, 1.1, n)
+    costs = base*rng.uniform(0.8, 1.2, (n, len(base)))
+    return prices, costs
+
+#%% Benchmark
+
+def rebuild(data, prices, costs, env):
+    objvals, iterations = [], []
+    for price, cost in zip(prices, costs):
+        scenario = dict(data, costs = dict(zip(data['oils_months'], cost)), scalars = dict(data['scalars'], PRICE = price))
+        fm1, refine, buy, inv = food.build_fm1(scenario, env = env)
+        fm1.optimize()
+        objvals.append(fm1.ObjVal)
+        iterations.append(fm1.IterCount)
+        fm1.dispose()
+    return np.array(objvals), np.mean(iterations)
+
+
+def warm(data, prices, costs, env):
+    fm1, refine, buy, inv = food.build_fm1(data, env = env)
+    fm1.optimize()
+    objvals, iterations = [], []
+    for price, cost in zip(prices, costs):
+        objvals.append(food.resolve(fm1, refine, buy, price, cost))
+        iterations.append(fm1.IterCount)
+    fm1.dispose()
+    return np.array(objvals), np.mean(iterations)
+
+
+def main(n):
+    env = gb.Env(params = {'OutputFlag': 0})
+    data = food.read_parameters(os.path.join(ROOT, '1. Food Manufacture I', 'Parameters.xlsx'))
+    prices, costs = random_scenarios(data, n)
+
+    print(f'{"method":>8} {"total [s]":>10} {"ms/scenario":>12} {"iterations":>11}')
+    times = {}
+    for name, method in (('rebuild', rebuild), ('warm', warm)):
+        begin = time.perf_counter()
+        objvals, iterations = method(data, prices, costs, env)
+        times[name] = time.perf_counter() - begin
+        if name == 'rebuild':
+            reference = objvals
+        assert np.allclose(objvals, reference)
+        print(f'{name:>8} {times[name]:>10.2f} {1000*times[name]/n:>12.3f} {iterations:>11.1f}')
+    print(f'Speedup: {times["rebuild"]/times["warm"]:.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', type = int, default = 1_000)
+    args = parser.parse_args()
+    main(args.scenarios)
+
+#%% End of file
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Food Manufacture II Linking Constraints
+*************************************
+
+Formulations of the delta/refine linking constraints of Food Manufacture II
+(food.build_fm2 linking = 'bigM', 'type', 'indicator') on the workbook and on
+synthetic instances (food.synthetic_parameters) of growing size:
+
+    LP bound    objective of the LP relaxation (lower is tighter, the model
+                maximizes; indicators are dropped by the relaxation)
+    nodes       branch and bound nodes explored
+    time        solve time, within --time-limit seconds
+    gap         final MIP gap (%)
+
+Sizes beyond a size-limited license are skipped.
+
+Usage:
+    python benchmarks/bench_fm2_linking.py [--sizes 5x6 10x12 20x24 50x24] [--time-limit 60]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+
+import gurobipy as gb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food
+
+#%% Benchmark
+
+def solve(data, linking, env, time_limit):
+    fm2 = food.build_fm2(data, env = env, linking = linking)[0]
+    try:
+        fm2.update()
+        lp = fm2.relax()
+        lp.optimize()
+        bound = lp.ObjVal
+        lp.dispose()
+        fm2.Params.TimeLimit = time_limit
+        fm2.optimize()
+        return bound, fm2.ObjVal, fm2.NodeCount, fm2.Runtime, 100*fm2.MIPGap
+    finally:
+        fm2.dispose()
+
+
+def main(sizes, time_limit):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"instance":>10} {"linking":>10} {"LP bound":>11} {"objective":>11} {"nodes":>8} {"time [s]":>9} {"gap %":>6}')
+    instances = [('workbook', food.read_parameters(os.path.join(ROOT, '2. Food Manufacture II', 'Parameters.xlsx')))]
+    for size in sizes:
+        n_oils, n_months = (int(v) for v in size.split('x'))
+        instances.append((size, food.synthetic_parameters(n_oils, n_months)))
+
+    for name, data in instances:
+        for linking in food.LINKINGS:
+            try:
+                bound, objval, nodes, runtime, gap = solve(data, linking, env, time_limit)
+            except gb.GurobiError as e:
+                print(f'{name:>10} {linking:>10} skipped: {e}')
+                break
+            print(f'{name:>10} {linking:>10} {bound:>11.1f} {objval:>11.1f} {nodes:>8.0f} {runtime:>9.2f} {gap:>6.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs = '+', default = ['5x6', '10x12', '20x24', '50x24'], metavar = 'OILSxMONTHS')
+    parser.add_argument('--time-limit', type = float, default = 60)
+    args = parser.parse_args()
+    main(args.sizes, args.time_limit)
+
+#%% End of file
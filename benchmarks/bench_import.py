@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Check: Cold-Start Import Time
+*************************************
+
+Imports every module of --modules in a new interpreter with
+python -X importtime, --runs times, and reports the cumulative import time of
+the module (median and best run, in ms) and the heavy dependencies it pulled
+in. A module fails the check when the median exceeds its budget or when it
+imports any of HEAVY: the importable API (mathprog, mathprog.api) only needs
+NumPy, the rest is imported by the functions that use it.
+
+Exits with status 1 if any module fails, so it can gate a CI job.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 7] [--budget 200] [--modules mathprog mathprog.api mathprog.models]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('pandas', 'scipy', 'gurobipy', 'ortools', 'highspy', 'openpyxl', 'matplotlib')
+
+#%% Measurement
+
+def import_time(module):
+    '''
+    Cumulative import time of <module> in a new interpreter (ms) and the
+    top-level packages of HEAVY imported with it.
+    '''
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd = ROOT,
+                             capture_output = True, text = True, check = True)
+    total, heavy = None, set()
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (field.strip() for field in line[len('import time:'):].split('|'))
+        if name.split('.')[0] in HEAVY:
+            heavy.add(name.split('.')[0])
+        if name == module:
+            total = int(cumulative)/1000
+    return total, heavy
+
+#%% Check
+
+def main(modules, runs, budget):
+    print(f'{"module":>16} {"median [ms]":>12} {"best [ms]":>10} {"budget [ms]":>12}  check')
+    failed = False
+    for module in modules:
+        times, heavy = [], set()
+        for _ in range(runs):
+            total, loaded = import_time(module)
+            times.append(total)
+            heavy |= loaded
+        median = float(np.median(times))
+        problems = ['over budget'] if median > budget else []
+        if heavy:
+            problems.append(f'imports {", ".join(sorted(heavy))}')
+        failed |= bool(problems)
+        print(f'{module:>16} {median:>12.1f} {min(times):>10.1f} {budget:>12.1f}  {"; ".join(problems) or "ok"}')
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type = int, default = 7)
+    parser.add_argument('--budget', type = float, default = 200.0, help = 'median import time budget in ms')
+    parser.add_argument('--modules', nargs = '+', default = ['mathprog', 'mathprog.api', 'mathprog.models'])
+    args = parser.parse_args()
+    sys.exit(1 if main(args.modules, args.runs, args.budget) else 0)
+
+#%% End of file
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Network Flow Backends
+*************************************
+
+Solves random feasible network flow instances with both backends of
+mathprog.network.solve ('gurobi' LP and 'ortools' min cost flow) and reports
+whether they reach the same objective value. The instances have lower bounds
+on a part of the arcs, so the lower bound transformation of the min cost
+flow backend is exercised too. The cross-check of both backends (flows and
+objective values, exit status 1 on a mismatch) is check_mcf.py.
+
+When Gurobi cannot solve an instance (e.g. size-limited license) only the
+OR-tools time is reported.
+
+Usage:
+    python benchmarks/bench_mcf.py [--arcs 1000 10000 100000 500000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import network
+
+#%% Synthetic data
+
+def random_instance(n_arcs, arcs_per_node = 10, seed = 0):
+    '''
+    Random network whose supplies are those of a random flow within the arc
+    bounds, so every instance is feasible.
+    '''
+    rng = np.random.default_rng(seed)
+    n_nodes = max(2, n_arcs // arcs_per_node)
+    tails = rng.integers(0, n_nodes, n_arcs)
+    heads = (tails + rng.integers(1, n_nodes, n_arcs)) % n_nodes
+    c = rng.integers(1, 100, n_arcs).astype(float)
+    l = np.where(rng.random(n_arcs) < 0.1, rng.integers(1, 5, n_arcs), 0).astype(float)
+    u = l + rng.integers(5, 50, n_arcs)
+    flow = rng.integers(l, u + 1)
+    b = network.incidence_matrix(tails, heads, n_nodes) @ flow
+    return b, tails, heads, c, l, u
+
+#%% Benchmark
+
+def timed(backend, data, env):
+    begin = time.perf_counter()
+    objval, _ = network.solve(*data, backend = backend, env = env)
+    return objval, time.perf_counter() - begin
+
+
+def main(sizes):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"arcs":>9} {"ortools [s]":>12} {"gurobi [s]":>11} {"objective":>14} {"match":>6}')
+    for n_arcs in sizes:
+        data = random_instance(n_arcs)
+        obj_mcf, t_mcf = timed('ortools', data, env)
+        try:
+            obj_lp, t_lp = timed('gurobi', data, env)
+            match = 'yes' if abs(obj_lp - obj_mcf) <= 1e-6*max(1, abs(obj_lp)) else 'NO'
+            t_lp = f'{t_lp:.3f}'
+        except gb.GurobiError as e:
+            match, t_lp = '-', 'skipped'
+            print(f'Gurobi skipped for {n_arcs} arcs: {e}')
+        print(f'{n_arcs:>9} {t_mcf:>12.3f} {t_lp:>11} {obj_mcf:>14.1f} {match:>6}')
+    env.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--arcs', type = int, nargs = '+', default = [1_000, 10_000, 100_000, 500_000])
+    args = parser.parse_args()
+    main(args.arcs)
+
+#%% End of file
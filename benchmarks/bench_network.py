@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Network Flow Construction
+*************************************
+
+Model build time of the Network Flow Template with the tupledict formulation
+(network.build_model, O(|N|·|A|)) and the CSR matrix formulation
+(network.build_matrix_model, O(|A|)) on random networks with 10 arcs per
+node. The tupledict formulation is only timed up to --max-loop-arcs.
+
+Only the construction is timed (up to model.update()), so the benchmark runs
+with a size-limited Gurobi license too.
+
+Usage:
+    python benchmarks/bench_network.py [--arcs 10000 50000 100000 500000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import scipy.sparse    # Imported up front so the first matrix build is not charged for it
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import network
+
+#%% Synthetic data
+
+def random_network(n_arcs, arcs_per_node = 10, seed = 0):
+    rng = np.random.default_rng(seed)
+    n_nodes = max(2, n_arcs // arcs_per_node)
+    tails = rng.integers(0, n_nodes, n_arcs)
+    heads = (tails + rng.integers(1, n_nodes, n_arcs)) % n_nodes    # No self loops
+    # Parallel arcs are dropped, the template keys the arcs by their end points
+    _, first = np.unique(tails*n_nodes + heads, return_index = True)
+    tails, heads = tails[np.sort(first)], heads[np.sort(first)]
+    n_arcs = len(tails)
+    c = rng.integers(1, 100, n_arcs).astype(float)
+    l = np.zeros(n_arcs)
+    u = np.full(n_arcs, 100.0)
+    b = np.zeros(n_nodes)
+    return b, tails, heads, c, l, u
+
+#%% Benchmark
+
+def build_loop(env, b, tails, heads, c, l, u):
+    nodes = list(range(len(b)))
+    edges = gb.tuplelist(zip(tails.tolist(), heads.tolist()))
+    model, _ = network.build_model(nodes, dict(enumerate(b.tolist())), edges,
+                                   dict(zip(edges, c.tolist())), dict(zip(edges, l.tolist())),
+                                   dict(zip(edges, u.tolist())), env = env)
+    model.update()
+    return model
+
+
+def build_matrix(env, b, tails, heads, c, l, u):
+    model, _, _ = network.build_matrix_model(b, tails, heads, c, l, u, env = env)
+    model.update()
+    return model
+
+
+def timed(func, *args):
+    begin = time.perf_counter()
+    model = func(*args)
+    elapsed = time.perf_counter() - begin
+    assert model.NumVars == len(args[2]) and model.NumConstrs == len(args[1])
+    model.dispose()
+    return elapsed
+
+
+def main(sizes, max_loop_arcs):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"arcs":>9} {"nodes":>8} {"tupledict [s]":>14} {"matrix [s]":>11} {"matrix [us/arc]":>16}')
+    for n_arcs in sizes:
+        data = random_network(n_arcs)
+        t_loop = timed(build_loop, env, *data) if n_arcs <= max_loop_arcs else float('nan')
+        t_matrix = timed(build_matrix, env, *data)
+        print(f'{n_arcs:>9} {len(data[0]):>8} {t_loop:>14.3f} {t_matrix:>11.3f} {1e6*t_matrix/n_arcs:>16.2f}')
+    env.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--arcs', type = int, nargs = '+', default = [10_000, 50_000, 100_000, 500_000])
+    parser.add_argument('--max-loop-arcs', type = int, default = 50_000)
+    args = parser.parse_args()
+    main(args.arcs, args.max_loop_arcs)
+
+#%% End of file
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: OR-tools Model Building
+*************************************
+
+Build time of the Food Manufacture models for the OR-tools solvers on
+synthetic instances (food.synthetic_parameters) of growing size:
+
+    coefficients    the original builder of the 'Google OR Implementation.py'
+                    scripts: one NumVar/IntVar and SetCoefficient call per
+                    variable and coefficient, scanning the hardness sheet with
+                    iterrows() every month
+    bulk            the model declared in array form (models.fm1 / fm2) and
+                    loaded into the solver from an MPModelProto
+                    (lp.to_pywraplp), split into the declaration and the
+                    proto export plus load
+
+Both builds of Food Manufacture I are solved with GLOP up to --verify cells
+(oils × months) and must reach the same objective value.
+
+Usage:
+    python benchmarks/bench_ortools_build.py [--sizes 5x6 20x24 100x60 300x120] [--verify 2000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food, lp, models
+
+#%% Builders
+
+def build_coefficients(data, mip = False):
+    # Builder of the Google OR scripts, one call per coefficient (constraints 1-4, plus 5-8 for Food Manufacture II)
+    from ortools.linear_solver import pywraplp
+
+    scalars, months, oils = data['scalars'], data['months'], data['oils']
+    df_cost = pd.DataFrame([(o, m, data['costs'][o, m]) for o, m in data['oils_months']], columns = ['OIL','MONTH','COST'])
+    type_of = {o: t for t, members in data['types'].items() for o in members}
+    df_hardness = pd.DataFrame([(o, data['hardness'][o], type_of[o]) for o in oils], columns = ['OIL','HARDNESS','TYPE'])
+
+    solver = pywraplp.Solver.CreateSolver('CBC' if mip else 'GLOP')
+    objective = solver.Objective()
+    objective.SetMaximization()
+    refine, buy, inv, delta = {}, {}, {}, {}
+    for index, row in df_cost.iterrows():
+        key = (row['OIL'], row['MONTH'])
+        refine[key] = var = solver.NumVar(0, solver.infinity(), f'Refine[{key}]')
+        objective.SetCoefficient(var, scalars['PRICE'])
+        buy[key] = var = solver.NumVar(0, solver.infinity(), f'Buy[{key}]')
+        objective.SetCoefficient(var, row['COST'])
+        inv[key] = var = solver.NumVar(0, scalars['STORAGE'], f'Inv[{key}]')
+        objective.SetCoefficient(var, scalars['STORECOST'])
+        if mip:
+            delta[key] = var = solver.IntVar(0, 1, f'Delta[{key}]')
+            objective.SetCoefficient(var, 0)
+
+    for o in oils:
+        const = solver.Constraint(scalars['INITIAL'], scalars['INITIAL'])
+        const.SetCoefficient(inv[o,months[0]], 1)
+        const.SetCoefficient(refine[o,months[0]], 1)
+        const.SetCoefficient(buy[o,months[0]], -1)
+        const = solver.Constraint(scalars['FINAL'], scalars['FINAL'])
+        const.SetCoefficient(inv[o,months[-2]], 1)
+        const.SetCoefficient(refine[o,months[-1]], -1)
+        const.SetCoefficient(buy[o,months[-1]], 1)
+        for j in range(1, len(months)-1):
+            m, m1 = months[j], months[j-1]
+            const = solver.Constraint(0, 0)
+            const.SetCoefficient(inv[o,m], 1)
+            const.SetCoefficient(inv[o,m1], -1)
+            const.SetCoefficient(refine[o,m], 1)
+            const.SetCoefficient(buy[o,m], -1)
+
+    for m in months:
+        const_v = solver.Constraint(-solver.Infinity(), scalars['CAPACITY_V'])
+        const_n = solver.Constraint(-solver.Infinity(), scalars['CAPACITY_N'])
+        for index, row in df_hardness.iterrows():
+            (const_v if row['TYPE'] == 'V' else const_n).SetCoefficient(refine[row['OIL'],m], 1)
+
+    for m in months:
+        const_l = solver.Constraint(0, solver.Infinity())
+        const_u = solver.Constraint(-solver.Infinity(), 0)
+        for index, row in df_hardness.iterrows():
+            const_l.SetCoefficient(refine[row['OIL'],m], row['HARDNESS'] - scalars['HL'])
+            const_u.SetCoefficient(refine[row['OIL'],m], row['HARDNESS'] - scalars['HU'])
+
+    if mip:
+        capacity = max(scalars['CAPACITY_N'], scalars['CAPACITY_V'])
+        for o in oils:
+            for m in months:
+                const = solver.Constraint(-solver.Infinity(), 0)
+                const.SetCoefficient(refine[o,m], 1)
+                const.SetCoefficient(delta[o,m], -capacity)
+        for m in months:
+            const = solver.Constraint(-solver.Infinity(), 3)
+            for o in oils:
+                const.SetCoefficient(delta[o,m], 1)
+        for o in oils:
+            for m in months:
+                const = solver.Constraint(0, solver.Infinity())
+                const.SetCoefficient(refine[o,m], 1)
+                const.SetCoefficient(delta[o,m], -20)
+        for m in months:
+            for veg in ('VEG 1', 'VEG 2'):
+                const = solver.Constraint(-solver.Infinity(), 0)
+                const.SetCoefficient(delta[veg,m], 1)
+                const.SetCoefficient(delta['OIL 3',m], -1)
+    return solver
+
+
+def build_bulk(data, mip = False):
+    # Declaration and load, timed apart
+    begin = time.perf_counter()
+    model = models.fm2(data, linking = 'bigM') if mip else models.fm1(data)
+    declared = time.perf_counter()
+    solver = lp.to_pywraplp(model, 'cbc' if mip else 'glop')
+    return solver, model, declared - begin, time.perf_counter() - declared
+
+#%% Benchmark
+
+def main(sizes, verify):
+    print(f'{"size":>8} {"model":>5} {"vars":>8} {"nonzeros":>9} {"coefficients [s]":>17} {"declare [s]":>12} '
+          f'{"load [s]":>9} {"speedup":>8}  check')
+    build_bulk(food.synthetic_parameters())    # Imports of the bulk path (SciPy, model builder) left out of the timings
+    for size in sizes:
+        n_oils, n_months = (int(v) for v in size.split('x'))
+        data = food.synthetic_parameters(n_oils, n_months)
+        for name, mip in (('fm1', False), ('fm2', True)):
+            begin = time.perf_counter()
+            legacy = build_coefficients(data, mip)
+            coefficients = time.perf_counter() - begin
+            bulk, model, declare, load = build_bulk(data, mip)
+            nonzeros = model.arrays()[4].nnz
+
+            check = ''
+            if not mip and len(data['oils'])*n_months <= verify:
+                objectives = [s.Objective().Value() if s.Solve() == 0 else None for s in (legacy, bulk)]
+                same = None not in objectives and abs(objectives[0] - objectives[1]) <= 1e-6*max(1, abs(objectives[0]))
+                check = f'{"same" if same else "DIFFERENT"} objective ({objectives[1]:.1f})'
+            print(f'{size:>8} {name:>5} {bulk.NumVariables():>8} {nonzeros:>9} {coefficients:>17.3f} {declare:>12.3f} '
+                  f'{load:>9.3f} {coefficients/(declare + load):>7.1f}x  {check}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs = '+', default = ['5x6', '20x24', '100x60', '300x120'], metavar = 'OILSxMONTHS')
+    parser.add_argument('--verify', type = int, default = 2000, help = 'largest number of cells solved to compare the builds')
+    args = parser.parse_args()
+    main(args.sizes, args.verify)
+
+#%% End of file
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Parametric Capacity Analysis
+*************************************
+
+Value of the production capacity of every machine-month of Factory Planning I
+(constraints 'prod_capacity' of models.fp1), from no machine to the planned
+number plus --extra, computed in three ways:
+
+    parametric      parametric.rhs_curves: the piecewise-linear curves from
+                    the right-hand side ranges, one warm solve per breakpoint
+    brute           the model re-solved from scratch (model.reset()) at
+                    --points right-hand sides of every curve
+    warm            the same right-hand sides re-solved in place, warm from
+                    the previous basis
+
+The brute force objective values must lie on the parametric curves
+(parametric.evaluate), and rhs_curves must leave the model as it was: same
+basis, duals and right-hand side ranges. The speedups are given against both
+the cold and the warm grid.
+
+Usage:
+    python benchmarks/bench_parametric.py [--extra 1] [--points 25]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import lp, models, parametric
+
+#%% Brute force
+
+def grid_solves(model, constrs, grids, cold):
+    # Objective values at every right-hand side of the grids, re-solved cold or warm
+    objectives = []
+    for constr, grid in zip(constrs, grids):
+        rhs = constr.RHS
+        values = []
+        for b in grid:
+            constr.RHS = b
+            if cold:
+                model.reset()
+            model.optimize()
+            values.append(model.ObjVal)
+        constr.RHS = rhs
+        objectives.append(np.array(values))
+    model.optimize()
+    return objectives
+
+def state(model):
+    # Basis, solution, duals and ranges of the solved model
+    variables, constrs = model.getVars(), model.getConstrs()
+    return {attr: np.array(model.getAttr(attr, items))
+            for items, attrs in ((variables, ('VBasis', 'X', 'RC', 'SAObjLow', 'SAObjUp')),
+                                 (constrs, ('CBasis', 'Pi', 'Slack') + parametric.RANGES[1:]))
+            for attr in attrs}
+
+#%% Benchmark
+
+def main(extra, points):
+    import gurobipy as gb
+
+    env = gb.Env(params = {'OutputFlag': 0})
+    data = models.load('fp1')
+    declared = models.fp1(data)
+    m, x = lp.to_gurobi(declared, env)
+    m.optimize()
+    capacity = lp.gurobi_blocks(declared, m)[1]['prod_capacity']
+    constrs = list(capacity.values())
+    hours = data['scalars']['ProductiveHours']
+    high = hours*(data['number'].ravel() + extra)
+    grids = [np.linspace(0.0, h, points) for h in high]
+
+    before = state(m)
+    begin = time.perf_counter()
+    df, solves = parametric.rhs_curves(m, capacity, ['MACHINE','MONTH'], low = 0.0, high = high)
+    parametric_time = time.perf_counter() - begin
+    changed = [attr for attr, values in state(m).items() if not np.array_equal(values, before[attr])]
+    times = {}
+    for name, cold in (('brute', True), ('warm', False)):
+        begin = time.perf_counter()
+        objectives = grid_solves(m, constrs, grids, cold)
+        times[name] = time.perf_counter() - begin
+
+    curves = [df_curve for _, df_curve in df.groupby(['MACHINE','MONTH'], sort = False)]
+    error = max(np.max(np.abs(parametric.evaluate(curve, grid) - values))
+                for curve, grid, values in zip(curves, grids, objectives))
+    n_grid = points*len(constrs)
+    print(f'{len(constrs)} machine-months, from 0 to {extra} machine(s) beyond the plan')
+    print(f'{"method":>11} {"solves":>7} {"time [s]":>9} {"vs brute":>9} {"vs warm":>8}')
+    for name, n, seconds in (('parametric', solves, parametric_time), ('brute', n_grid, times['brute']),
+                             ('warm', n_grid, times['warm'])):
+        print(f'{name:>11} {n:>7} {seconds:>9.4f} {times["brute"]/seconds:>8.1f}x {times["warm"]/seconds:>7.1f}x' +
+              (f'  ({len(df)} breakpoints)' if name == 'parametric' else ''))
+    print(f'Model after rhs_curves: ' + (f'CHANGED {", ".join(changed)}' if changed else
+                                         'same basis, solution, duals and ranges'))
+    print(f'Largest difference of the curves from the brute force values: {error:.2e} '
+          f'({"same" if error <= 1e-6*abs(m.ObjVal) else "DIFFERENT"})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--extra', type = int, default = 1)
+    parser.add_argument('--points', type = int, default = 25, help = 'right-hand sides of every brute force curve')
+    args = parser.parse_args()
+    main(args.extra, args.points)
+
+#%% End of file
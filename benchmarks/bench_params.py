@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Parameter Loading
+*************************************
+
+Compares the row by row dictionary building used originally by the model
+scripts:
+
+    for index, row in df.iterrows():
+        dic[row[0],row[1]] = row[2]
+    keys, values = gb.multidict(dic)
+
+against the columnar loader mathprog.params.multidict on synthetic cost
+sheets (OIL, MONTH, COST) of increasing size.
+
+Usage:
+    python benchmarks/bench_params.py [--sizes 10000 100000 1000000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import params
+
+#%% Synthetic data
+
+def cost_sheet(rows, seed = 0):
+    rng = np.random.default_rng(seed)
+    months = 12
+    oils = -(-rows // months)
+    df = pd.DataFrame({
+        'OIL': np.repeat([f'OIL {i}' for i in range(oils)], months)[:rows],
+        'MONTH': np.tile([f'Month {t}' for t in range(months)], oils)[:rows],
+        'COST': rng.integers(-150, -90, rows),
+    })
+    return df
+
+#%% Loaders
+
+def load_iterrows(df):
+    dic = {}
+    for index, row in df.iterrows():
+        dic[row.iloc[0],row.iloc[1]] = row.iloc[2]
+    return gb.multidict(dic)
+
+
+def load_columnar(df):
+    return params.multidict(df, ['OIL','MONTH'], 'COST')
+
+#%% Benchmark
+
+def timeit(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - begin)
+    return best, result
+
+
+def main(sizes, repeat):
+    print(f'{"rows":>10} {"iterrows [s]":>14} {"columnar [s]":>14} {"speedup":>9}')
+    for rows in sizes:
+        df = cost_sheet(rows)
+        t_rows, (k1, v1) = timeit(load_iterrows, df, repeat)
+        t_cols, (k2, v2) = timeit(load_columnar, df, repeat)
+        # Both paths must produce the same parameters
+        assert list(k1) == list(k2) and dict(v1) == dict(v2)
+        print(f'{rows:>10} {t_rows:>14.3f} {t_cols:>14.3f} {t_rows/t_cols:>8.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type = int, default = 1)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
+
+#%% End of file
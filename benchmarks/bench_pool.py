@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Load Test: Environment and Template Pools
+*************************************
+
+Stream of Factory Planning I and Refinery Optimisation requests (random
+perturbations of the workbook parameters: demand, machines and profits, or
+profits and crude availability) answered in four ways:
+
+    cold        what a script does per request: a new Gurobi environment,
+                the model declared and built, solved, disposed
+    env         pre-started environments (pool.EnvPool), the model declared,
+                built and solved per request
+    patch       pool.TemplatePool: the template model patched with the
+                parameters of the request and re-solved in place
+    copy        pool.TemplatePool with copy = True: patched, copied and the
+                copy solved
+
+<clients> threads send the requests; the pools hold one environment or
+template per client. Reported per problem and mode: latency percentiles
+(p50, p95, p99) in milliseconds, throughput, and whether the objective values
+match those of the cold solves.
+
+Usage:
+    python benchmarks/bench_pool.py [--requests 300] [--clients 1] [--problems fp1 refinery]
+                                    [--modes cold env patch copy]
+"""
+
+#%% Importing libraries
+
+import argparse
+import copy
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import lp, models, pool
+
+PARAMS = {'Threads': 1}    # One thread per solve, the clients share the cores
+
+#%% Requests
+
+def perturb(problem, data, rng):
+    # Parameters of one request: the workbook parameters with random changes
+    data = copy.deepcopy(data)
+    if problem in ('fp1', 'fp2'):
+        data['demand'] = np.round(data['demand']*rng.uniform(0.8, 1.2, data['demand'].shape))
+        data['profit'] = data['profit']*rng.uniform(0.9, 1.1, data['profit'].shape)
+        if problem == 'fp1':
+            data['number'] = np.maximum(data['number'] + rng.integers(-1, 2, data['number'].shape), 0)
+    elif problem == 'refinery':
+        data['profit'] = {k: v*rng.uniform(0.9, 1.1) for k, v in data['profit'].items()}
+        data['available'] = {k: v*rng.uniform(0.8, 1.2) for k, v in data['available'].items()}
+    else:
+        raise ValueError(f'No requests for {problem}')
+    return data
+
+#%% Modes
+
+def cold(problem):
+    declare = models.PROBLEMS[problem][2]
+
+    def solve(data):
+        env = pool.start_env(PARAMS)
+        try:
+            m, x = lp.to_gurobi(declare(data), env)
+            m.optimize()
+            objective = m.ObjVal if m.SolCount else np.nan
+            m.dispose()
+            return objective
+        finally:
+            env.dispose()
+    return solve, lambda: None
+
+
+def env(problem, clients):
+    declare = models.PROBLEMS[problem][2]
+    envs = pool.EnvPool(clients, PARAMS)
+
+    def solve(data):
+        with envs.acquire() as e:
+            m, x = lp.to_gurobi(declare(data), e)
+            m.optimize()
+            objective = m.ObjVal if m.SolCount else np.nan
+            m.dispose()
+            return objective
+    return solve, envs.close
+
+
+def templates(problem, clients, copy):
+    templates = pool.TemplatePool(problem, clients, params = PARAMS)
+    return lambda data: templates.solve(data, copy = copy)['objective'], templates.close
+
+#%% Load test
+
+def run(solve, requests, clients):
+    def timed(data):
+        begin = time.perf_counter()
+        objective = solve(data)
+        return objective, time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        answers = list(executor.map(timed, requests))
+    wall = time.perf_counter() - begin
+    objectives, latencies = (np.array(v) for v in zip(*answers))
+    return objectives, latencies*1000, len(requests)/wall
+
+
+def main(problems, modes, n_requests, clients, seed):
+    print(f'{"problem":>9} {"mode":>6} {"p50 [ms]":>9} {"p95 [ms]":>9} {"p99 [ms]":>9} {"req/s":>8}  check')
+    for problem in problems:
+        rng = np.random.default_rng(seed)
+        base = models.load(problem)
+        requests = [perturb(problem, base, rng) for _ in range(n_requests)]
+        reference = None
+        for mode in modes:
+            if mode == 'cold':
+                solve, close = cold(problem)
+            elif mode == 'env':
+                solve, close = env(problem, clients)
+            else:
+                solve, close = templates(problem, clients, mode == 'copy')
+            solve(base)    # Warm-up (imports, first solve)
+            try:
+                objectives, latencies, throughput = run(solve, requests, clients)
+            finally:
+                close()
+            if reference is None:
+                reference = objectives
+            same = np.allclose(objectives, reference, rtol = 1e-4, equal_nan = True)    # Within the default MIPGap
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            print(f'{problem:>9} {mode:>6} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f} {throughput:>8.1f}  '
+                  f'{"same" if same else "DIFFERENT"} objectives')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type = int, default = 300)
+    parser.add_argument('--clients', type = int, default = 1)
+    parser.add_argument('--problems', nargs = '+', default = ['fp1', 'refinery'], choices = ['fp1', 'fp2', 'refinery'])
+    parser.add_argument('--modes', nargs = '+', default = ['cold', 'env', 'patch', 'copy'],
+                        choices = ['cold', 'env', 'patch', 'copy'])
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+    main(args.problems, args.modes, args.requests, args.clients, args.seed)
+
+#%% End of file
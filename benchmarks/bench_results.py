@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Solution Extraction
+*************************************
+
+Time to read the solution of Food Manufacture I on synthetic instances
+(food.synthetic_parameters) into the report structure, one value per
+(oil, month) and variable group (refine, buy, inventory):
+
+    per variable    the loops of the report sections: refine[o,m].x with
+                    Gurobi, refine[o,m].solution_value() with OR-tools
+    bulk            results.frame with Gurobi: one getAttr('X') call per
+                    group; results.block_frame with OR-tools: one solution
+                    response, picked by the positions of the model blocks
+    nonzeros        the same with nonzero = True (rows with some value)
+
+Both extractions must return the same values. Sizes beyond a size-limited
+Gurobi license are skipped on that solver.
+
+Usage:
+    python benchmarks/bench_results.py [--sizes 20x24 100x60 300x120] [--solvers gurobi glop]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food, lp, models, results
+
+GROUPS = ('refine', 'buy', 'inventory')
+
+#%% Solvers
+
+# Every solver returns the variable groups, the value of a variable and the bulk extraction
+
+def solve_gurobi(data, env):
+    fm1, refine, buy, inv = food.build_fm1(data, env = env)
+    fm1.optimize()
+    groups = dict(zip(GROUPS, (refine, buy, inv)))
+    return groups, lambda var: var.x, lambda nonzero: results.frame(fm1, groups, ['OIL','MONTH'], nonzero = nonzero)
+
+
+def solve_glop(data, env):
+    model = models.fm1(data)
+    solver = lp.to_pywraplp(model, 'glop')
+    solver.Solve()
+    variables = solver.variables()
+    groups = {name: model.keyed(name, variables) for name in GROUPS}
+    bulk = lambda nonzero: results.block_frame(model, results.solution(solver), GROUPS, ['OIL','MONTH'], nonzero = nonzero)
+    return groups, lambda var: var.solution_value(), bulk
+
+#%% Benchmark
+
+def per_variable(groups, value):
+    # Report loops: one attribute access per variable
+    return {name: np.array([value(var) for var in group.values()]) for name, group in groups.items()}
+
+
+def main(sizes, solvers):
+    import gurobipy as gb
+
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"size":>8} {"solver":>7} {"vars":>8} {"per variable [s]":>17} {"bulk [s]":>9} {"nonzeros [s]":>13} '
+          f'{"rows":>7} {"speedup":>8}  check')
+    for size in sizes:
+        n_oils, n_months = (int(v) for v in size.split('x'))
+        data = food.synthetic_parameters(n_oils, n_months)
+        for name in solvers:
+            try:
+                groups, value, bulk = (solve_gurobi if name == 'gurobi' else solve_glop)(data, env)
+            except gb.GurobiError as e:
+                print(f'{size:>8} {name:>7}  skipped: {e}')
+                continue
+            begin = time.perf_counter()
+            loops = per_variable(groups, value)
+            loop_time = time.perf_counter() - begin
+            begin = time.perf_counter()
+            df = bulk(False)
+            bulk_time = time.perf_counter() - begin
+            begin = time.perf_counter()
+            df_nonzero = bulk(True)
+            nonzero_time = time.perf_counter() - begin
+
+            same = all(np.array_equal(loops[group], df[group].to_numpy()) for group in GROUPS)
+            n_vars = sum(len(group) for group in groups.values())
+            print(f'{size:>8} {name:>7} {n_vars:>8} {loop_time:>17.4f} {bulk_time:>9.4f} {nonzero_time:>13.4f} '
+                  f'{len(df_nonzero):>7} {loop_time/bulk_time:>7.1f}x  {"same" if same else "DIFFERENT"} values')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs = '+', default = ['20x24', '100x60', '300x120'], metavar = 'OILSxMONTHS')
+    parser.add_argument('--solvers', nargs = '+', default = ['gurobi', 'glop'], choices = ['gurobi', 'glop'])
+    args = parser.parse_args()
+    main(args.sizes, args.solvers)
+
+#%% End of file
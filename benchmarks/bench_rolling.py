@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Rolling Horizon Food Manufacture
+*************************************
+
+Monolithic model against horizon.solve_rolling on synthetic instances
+(food.synthetic_parameters) of growing horizon length:
+
+    monolithic  one model over every month, within --time-limit seconds
+                (its MIP gap is reported)
+    rolling     windows of --window months fixing --step months each, every
+                window within --time-limit seconds
+
+The gap of the rolling plan is measured against the best bound of the
+monolithic model. Sizes beyond a size-limited license are skipped.
+
+Usage:
+    python benchmarks/bench_rolling.py [--model fm2] [--oils 8] [--months 12 24 36 60]
+                                       [--window 12] [--step 6] [--time-limit 60]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import food, horizon
+
+#%% Benchmark
+
+def monolithic(model, data, env, time_limit):
+    m = horizon.MODELS[model](data, env = env)[0]
+    try:
+        m.Params.TimeLimit = time_limit
+        begin = time.perf_counter()
+        m.optimize()
+        wall = time.perf_counter() - begin
+        return m.ObjVal, m.ObjBound, 100*m.MIPGap if m.IsMIP else 0.0, wall
+    finally:
+        m.dispose()
+
+
+def main(model, n_oils, horizons, window, step, time_limit):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"months":>7} {"monolithic":>11} {"gap %":>6} {"time [s]":>9} | {"rolling":>11} {"windows":>8} {"gap %":>6} {"time [s]":>9}')
+    for n_months in horizons:
+        data = food.synthetic_parameters(n_oils, n_months)
+        try:
+            objval, bound, mip_gap, t_mono = monolithic(model, data, env, time_limit)
+        except gb.GurobiError as e:
+            print(f'{n_months:>7} skipped: {e}')
+            continue
+        plan, stats = horizon.solve_rolling(model, data, window, step, env = env, time_limit = time_limit)
+        gap = 100*(bound - stats['objective'])/abs(bound)
+        print(f'{n_months:>7} {objval:>11.1f} {mip_gap:>6.2f} {t_mono:>9.2f} | {stats["objective"]:>11.1f} '
+              f'{stats["windows"]:>8} {gap:>6.2f} {stats["wall"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', choices = sorted(horizon.MODELS), default = 'fm2')
+    parser.add_argument('--oils', type = int, default = 8)
+    parser.add_argument('--months', type = int, nargs = '+', default = [12, 24, 36, 60])
+    parser.add_argument('--window', type = int, default = 12)
+    parser.add_argument('--step', type = int, default = 6)
+    parser.add_argument('--time-limit', type = float, default = 60)
+    args = parser.parse_args()
+    main(args.model, args.oils, args.months, args.window, args.step, args.time_limit)
+
+#%% End of file
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Sensitivity Analysis Export
+*************************************
+
+Time to read the sensitivity analysis of Food Manufacture I on synthetic
+instances (food.synthetic_parameters): values, reduced costs, objective
+ranges and bounds of every variable, and right-hand sides, slacks, duals and
+right-hand side ranges of every constraint:
+
+    per element     the loops of SensitivityAnalysis() in Factory Planning I:
+                    one attribute access per variable or constraint and
+                    attribute (v.RC, v.SAObjLow, c.Pi, ...)
+    bulk            sensitivity.variable_frame and constraint_frame: one
+                    model.getAttr call per attribute, into DataFrames
+    arrow           bulk plus the conversion to pyarrow Tables
+                    (sensitivity.to_arrow)
+
+Both readings must return the same values. Sizes beyond a size-limited
+Gurobi license are skipped.
+
+Usage:
+    python benchmarks/bench_sensitivity.py [--sizes 5x24 10x24 20x30] [--repeat 5]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food, sensitivity
+
+#%% Readings
+
+def per_element(model):
+    # Attribute access per element, as the report loops do
+    variables, constrs = model.getVars(), model.getConstrs()
+    columns = {c: np.array([getattr(v, a) for v in variables]) for c, a in sensitivity.VARIABLE_ATTRS.items()}
+    rows = {c: np.array([getattr(r, a) for r in constrs]) for c, a in sensitivity.CONSTRAINT_ATTRS.items()}
+    return columns, rows
+
+
+def bulk(model):
+    return sensitivity.variable_frame(model), sensitivity.constraint_frame(model)
+
+
+def timed(function, model, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = function(model)
+        best = min(best, time.perf_counter() - begin)
+    return result, best
+
+#%% Benchmark
+
+def main(sizes, repeat):
+    import gurobipy as gb
+
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"size":>8} {"vars":>6} {"constrs":>8} {"per element [s]":>16} {"bulk [s]":>9} {"arrow [s]":>10} '
+          f'{"speedup":>8}  check')
+    for size in sizes:
+        n_oils, n_months = (int(v) for v in size.split('x'))
+        try:
+            model = food.build_fm1(food.synthetic_parameters(n_oils, n_months), env = env)[0]
+            model.optimize()
+        except gb.GurobiError as e:
+            print(f'{size:>8}  skipped: {e}')
+            continue
+        (columns, rows), loop_time = timed(per_element, model, repeat)
+        (df_vars, df_constrs), bulk_time = timed(bulk, model, repeat)
+        _, arrow_time = timed(lambda m: sensitivity.to_arrow({'variables': df_vars, 'constraints': df_constrs}),
+                              model, repeat)
+
+        same = (all(np.array_equal(columns[c], df_vars[c].to_numpy()) for c in columns) and
+                all(np.array_equal(rows[c], df_constrs[c].to_numpy()) for c in rows))
+        print(f'{size:>8} {model.NumVars:>6} {model.NumConstrs:>8} {loop_time:>16.4f} {bulk_time:>9.4f} '
+              f'{bulk_time + arrow_time:>10.4f} {loop_time/bulk_time:>7.1f}x  {"same" if same else "DIFFERENT"} values')
+        model.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs = '+', default = ['5x24', '10x24', '20x30'], metavar = 'OILSxMONTHS')
+    parser.add_argument('--repeat', type = int, default = 5)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
+
+#%% End of file
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Load Test: Solve Service
+*************************************
+
+Starts the solve service (mathprog.service) on localhost and sends it
+--requests solve requests of the repository problems (round robin) from
+--clients concurrent clients:
+
+    latency     p50, p95 and p99 of the request round trips, in ms, and the
+                throughput, by problem and overall
+    check       objective values against the Gurobi implementations
+
+Then checks the control paths with random 60 city TSPs sent as parameter
+payloads (long enough to be caught running): a request beyond the queue
+capacity rejected, a queued request cancelled before it runs (its place in
+the queue taken by a new one), a running request cancelled (its worker replaced), and a time limit too short to solve
+reported as a failure.
+
+Usage:
+    python benchmarks/bench_service.py [--requests 200] [--clients 4] [--workers 2] [--backend gurobi]
+                                       [--problems fm1 fp1 refinery nft]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import service
+
+EXPECTED = {'fm1': 120342.593, 'fm2': 112778.704, 'fp1': 93715.179, 'fp2': 108855.0, 'manpower': 508700.0,
+            'refinery': 210683.064, 'nft': 100.0, 'tsp': 422.6}
+TOLERANCE = 1e-4
+
+#%% Service process
+
+def start(port, workers, queue):
+    command = [sys.executable, '-m', 'mathprog.service', '--port', str(port), '--workers', str(workers),
+               '--queue', str(queue)]
+    process = subprocess.Popen(command, cwd = ROOT, stdout = subprocess.PIPE, text = True)
+    process.stdout.readline()    # Serving ... once listening
+    return process
+
+#%% Benchmark
+
+def load_test(url, problems, backend, n_requests, clients):
+    def request(problem):
+        begin = time.perf_counter()
+        try:
+            objective = service.call('solve', {'problem': problem, 'backend': backend}, url)['objective']
+        except RuntimeError as e:
+            objective = str(e)
+        return problem, objective, (time.perf_counter() - begin)*1000
+
+    begin = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        answers = list(executor.map(request, [problems[k % len(problems)] for k in range(n_requests)]))
+    wall = time.perf_counter() - begin
+
+    print(f'{"problem":>9} {"requests":>9} {"p50 [ms]":>9} {"p95 [ms]":>9} {"p99 [ms]":>9}  check')
+    for problem in problems + ['all']:
+        rows = [a for a in answers if problem in ('all', a[0])]
+        latencies = np.array([a[2] for a in rows])
+        wrong = [a for a in rows if isinstance(a[1], str) or abs(a[1] - EXPECTED[a[0]]) > TOLERANCE*max(1, EXPECTED[a[0]])]
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f'{problem:>9} {len(rows):>9} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}  '
+              f'{"ok" if not wrong else f"{len(wrong)} WRONG, e.g. {wrong[0][1]}"}')
+    print(f'Throughput: {n_requests/wall:.1f} requests/s with {clients} clients')
+
+
+def random_tsp(n, seed = 0):
+    # Parameter payload of a TSP of <n> random cities (fields of service.FIELDS['tsp'])
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 100, (n, 2))
+    ei, ej = np.triu_indices(n, 1)
+    d = np.round(np.hypot(*(points[ei] - points[ej]).T), 1)
+    return {'vertices': [f'City {k}' for k in range(n)], 'ei': ei.tolist(), 'ej': ej.tolist(), 'd': d.tolist()}
+
+
+def control_paths(url, workers, queue):
+    def check(name, passed):
+        print(f'{name:<42} {"ok" if passed else "FAILED"}')
+
+    # Occupy every worker and fill the queue with TSP solves
+    request = {'problem': 'tsp', 'parameters': random_tsp(60)}
+    jobs = [service.call('submit', request, url)['job'] for _ in range(workers + queue)]
+    try:
+        service.call('submit', request, url)
+        check('request beyond the queue rejected', False)
+    except RuntimeError as e:
+        check('request beyond the queue rejected', 'Queue full' in str(e))
+    dropped = jobs[-1]
+    check('queued request cancelled', service.call('cancel', {'job': dropped}, url) and
+          service.call('status', {'job': dropped}, url) == 'cancelled')
+    try:
+        jobs.append(service.call('submit', request, url)['job'])
+        check('place of the cancelled request freed', True)
+    except RuntimeError:
+        check('place of the cancelled request freed', False)
+    running = next((j for j in jobs if service.call('status', {'job': j}, url) == 'running'), None)
+    cancelled = running is not None and service.call('cancel', {'job': running}, url)
+    try:
+        service.call('result', {'job': running}, url)
+        cancelled = False
+    except RuntimeError as e:
+        cancelled = cancelled and 'Cancelled' in str(e)
+    check('running request cancelled', cancelled)
+    finished = [service.call('result', {'job': j}, url)['objective'] for j in jobs if j not in (running, dropped)]
+    check('other requests unaffected', len(finished) == len(jobs) - 2 and np.ptp(finished) <= TOLERANCE*finished[0])
+    try:
+        service.call('solve', {'problem': 'manpower', 'time_limit': 1e-6}, url)
+        check('time limit reported as a failure', False)
+    except RuntimeError as e:
+        check('time limit reported as a failure', 'status' in str(e))
+
+
+def main(n_requests, clients, workers, backend, problems, port):
+    queue = 2*workers
+    process = start(port, workers, queue)
+    url = f'http://127.0.0.1:{port}'
+    try:
+        for problem in problems:    # Warm-up: workbooks read by the workers
+            for _ in range(workers):
+                service.call('solve', {'problem': problem, 'backend': backend}, url)
+        load_test(url, problems, backend, n_requests, clients)
+        print()
+        control_paths(url, workers, queue)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type = int, default = 200)
+    parser.add_argument('--clients', type = int, default = 4)
+    parser.add_argument('--workers', type = int, default = 2)
+    parser.add_argument('--backend', default = 'gurobi', choices = ['gurobi', 'glop', 'cbc', 'scip'])
+    parser.add_argument('--problems', nargs = '+', default = ['fm1', 'fp1', 'refinery', 'nft'], choices = list(EXPECTED))
+    parser.add_argument('--port', type = int, default = 8765)
+    args = parser.parse_args()
+    main(args.requests, args.clients, args.workers, args.backend, args.problems, args.port)
+
+#%% End of file
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: TSP Subtour Detection
+*************************************
+
+Time to find the subtours of a solution with the recursive search the TSP
+script used (search_next: a scan of every vertex per visited vertex, with
+membership tests on the tuplelist of edges and the list of checked vertices)
+and with mathprog.tsp.subtour_cuts (connected components of the selected
+edges over NumPy arrays).
+
+The solutions are random sets of 10 cycles over a sparse graph of about 10
+edges per city. The recursive search is only run up to --max-recursive
+cities; beyond ~1000 cities it also hits the recursion limit.
+
+Usage:
+    python benchmarks/bench_subtours.py [--cities 100 200 1000 10000 100000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import scipy.sparse.csgraph    # Imported up front so the first detection is not charged for it
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import tsp
+
+#%% Synthetic data
+
+def random_solution(n, n_cycles = 10, extra = 10, seed = 0):
+    rng = np.random.default_rng(seed)
+    perm = rng.permutation(n)
+    ei, ej = [], []
+    for cycle in np.array_split(perm, n_cycles):
+        ei.append(cycle)
+        ej.append(np.roll(cycle, -1))
+    tour_i, tour_j = np.concatenate(ei), np.concatenate(ej)
+    other_i = rng.integers(0, n, extra*n)
+    other_j = (other_i + rng.integers(1, n, extra*n)) % n
+    ei = np.concatenate((tour_i, other_i))
+    ej = np.concatenate((tour_j, other_j))
+    # Edges stored as (min, max) without duplicates, the selected ones first
+    ei, ej = np.minimum(ei, ej), np.maximum(ei, ej)
+    _, first = np.unique(ei*n + ej, return_index = True)
+    first = np.sort(first)
+    values = (first < n).astype(float)
+    return ei[first], ej[first], values
+
+#%% Recursive search of the original script
+
+def recursive_subtours(vertices, edges, value):
+    def search_next(i):
+        for j in vertices:
+            if (i,j) in edges and j not in checked:
+                if value[i,j] > 0:
+                    subtour.append(j)
+                    checked.append(j)
+                    search_next(j)
+            elif (j,i) in edges and j not in checked:
+                if value[j,i] > 0:
+                    subtour.append(j)
+                    checked.append(j)
+                    search_next(j)
+
+    subtours = []
+    checked = []
+    for i in vertices:
+        subtour = []
+        if i not in checked:
+            subtour.append(i)
+            checked.append(i)
+            search_next(i)
+            subtours.append(subtour)
+    return subtours
+
+#%% Benchmark
+
+def main(sizes, max_recursive):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"cities":>8} {"edges":>9} {"recursive [ms]":>15} {"arrays [ms]":>12} {"subtours":>9}')
+    for n in sizes:
+        ei, ej, values = random_solution(n)
+
+        # Placeholder variables, subtour_cuts only reads them to build the expressions
+        model = gb.Model(env = env)
+        variables = model.addMVar(len(ei)).tolist()
+        model.update()
+
+        begin = time.perf_counter()
+        cuts = tsp.subtour_cuts(variables, ei, ej, n, values)
+        t_arrays = time.perf_counter() - begin
+        model.dispose()
+
+        t_rec = float('nan')
+        if n <= max_recursive:
+            edges = gb.tuplelist(zip(ei.tolist(), ej.tolist()))
+            value = dict(zip(edges, values.tolist()))
+            begin = time.perf_counter()
+            found = recursive_subtours(list(range(n)), edges, value)
+            t_rec = time.perf_counter() - begin
+            assert len(found) == len(cuts)
+        print(f'{n:>8} {len(ei):>9} {1000*t_rec:>15.1f} {1000*t_arrays:>12.1f} {len(cuts):>9}')
+    env.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [100, 200, 1_000, 10_000, 100_000])
+    parser.add_argument('--max-recursive', type = int, default = 200)
+    args = parser.parse_args()
+    main(args.cities, args.max_recursive)
+
+#%% End of file
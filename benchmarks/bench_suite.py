@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark Suite
+*************************************
+
+Regression benchmark of every model of the repository (models module): the
+Food Manufacture, Factory Planning, Manpower Planning and Refinery problems,
+the Network Flow Template and the TSP. Every problem is measured at several
+scales, 1 being the workbook of the repository and the others synthetic
+workbooks with the same sheets and about <scale> times its size:
+
+    fm1, fm2    oils × months grown by √scale each (food.synthetic_parameters)
+    fp1, fp2    products × months grown by √scale each
+    manpower    years × scale
+    refinery    crudes added until the variables grow about scale times
+                (the other sets are fixed by the model; same rows, same
+                total availability)
+    nft         scale copies of the network linked by random transfer arcs
+    tsp         cities × √scale (random coordinates, distance matrix sheet)
+
+Every case runs --repeat times, each in a new process with a cold parameter
+cache, and the fastest time of every phase is kept. A run records:
+
+    load        seconds to read the workbook into the parameters (cold cache)
+    declare     seconds to declare the model in array form
+    build       seconds to hand the arrays to the solver (Gurobi model, OR-tools
+                solver, HiGHS instance)
+    solve       seconds of the optimization
+                (build and solve of the TSP are summed over the solves of its
+                subtour elimination loop)
+    peak_rss    peak resident memory of the process (MB), and base_rss, the
+                resident memory after the imports
+
+The results are written to a JSON file with the commit and the machine, so
+two runs can be compared (--compare): the ratios of the times and memory of
+the current run to the previous one are printed, above --threshold flagged
+as regressions.
+
+Cases that fail (a size-limited Gurobi license, GLOP with a MIP) are recorded
+with their error.
+
+Usage:
+    python benchmarks/bench_suite.py [--problems fm1 tsp ...] [--scales 1 10 100]
+                                     [--backend gurobi|glop|cbc|scip|highs] [--time-limit 60]
+                                     [--repeat 3] [--output bench.json] [--compare previous.json]
+"""
+
+#%% Importing libraries
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import cache, lp, models
+
+PHASES = ('load', 'declare', 'build', 'solve')
+
+#%% Synthetic workbooks
+
+def _food(sheets, scale, rng):
+    from mathprog import food
+
+    f = np.sqrt(scale)
+    data = food.synthetic_parameters(round(5*f), round(6*f), seed = int(rng.integers(2**31)))
+    type_of = {o: t for t, members in data['types'].items() for o in members}
+    return {'Cost': pd.DataFrame([(o, m, data['costs'][o, m]) for o, m in data['oils_months']], columns = ['OIL','MONTH','COST']),
+            'Hardness': pd.DataFrame([(o, data['hardness'][o], type_of[o]) for o in data['oils']], columns = ['OIL','HARDNESS','TYPE']),
+            'Scalars': sheets['Scalars']}
+
+
+def _factory(sheets, scale, rng):
+    f = np.sqrt(scale)
+    base_products = sheets['profit']['PRODUCT'].tolist()
+    n_products, n_months = round(len(base_products)*f), round(sheets['demand']['MONTH'].nunique()*f)
+    products = [f'PROD {k + 1}' for k in range(n_products)]
+    months = [f'Month {k + 1}' for k in range(n_months)]
+    source = [base_products[k % len(base_products)] for k in range(n_products)]    # Product each one is copied from
+
+    profit = sheets['profit'].set_index('PRODUCT')['PROFIT']
+    production = sheets['production'].set_index('PRODUCT')
+    machines = production['MACHINE'].unique().tolist()
+    demand = sheets['demand']['DEMAND'].to_numpy()
+    machinery = sheets['machinery']
+    out = {'profit': pd.DataFrame({'PRODUCT': products, 'PROFIT': np.round(profit[source].to_numpy()*rng.uniform(0.8, 1.2, n_products), 1)}),
+           'production': pd.DataFrame([(p, m, h) for p, s in zip(products, source)
+                                       for m, h in production.loc[s, ['MACHINE','PRODUCTION']].itertuples(index = False)],
+                                      columns = ['PRODUCT','MACHINE','PRODUCTION']),
+           'demand': pd.DataFrame([(p, t, rng.choice(demand)) for p in products for t in months], columns = ['PRODUCT','MONTH','DEMAND']),
+           'scalars': sheets['scalars']}
+    if 'MONTH' in machinery.columns:
+        number = machinery.pivot(index = 'MACHINE', columns = 'MONTH', values = 'NUMBER')
+        out['machinery'] = pd.DataFrame([(m, t, number.loc[m].iloc[k % number.shape[1]]) for m in machines
+                                         for k, t in enumerate(months)], columns = ['MACHINE','MONTH','NUMBER'])
+    else:
+        out['machinery'] = machinery
+    return out
+
+
+def _manpower(sheets, scale, rng):
+    demand = sheets['demand'].pivot(index = 'SKILL', columns = 'YEAR', values = 'DEMAND')
+    n_years = demand.shape[1]*scale
+    years = [f'Year {k + 1}' for k in range(n_years)]
+    rows = []
+    for skill, values in demand.iterrows():
+        # The workbook years, then a random walk of ±100 workers a year from the last one
+        walk = values.iloc[-1] + np.cumsum(rng.integers(-100, 101, n_years - len(values)))
+        series = np.concatenate((values.to_numpy(), np.maximum(walk, 0)))
+        rows.extend((skill, year, int(d)) for year, d in zip(years, series))
+    return {'skills': sheets['skills'], 'demand': pd.DataFrame(rows, columns = ['SKILL','YEAR','DEMAND'])}
+
+
+def _refinery(sheets, scale, rng):
+    fractions = sheets['fractions']
+    availability = sheets['availability'].set_index('CRUDE')['AVAILABLE']
+    base = availability.index.tolist()
+    # Only the crudes are free in models.refinery: one variable and a column of fractions each, so the crudes
+    # are grown by (scale - 1) times the variables of the workbook model
+    n_vars = (len(base) + len(sheets['yield_reform']) + len(sheets['yield_crack_oil']) +
+              len(sheets['octane'])*len(sheets['octane_petrols']) + len(sheets['vapor_fuel']) + len(sheets['profit']))
+    crudes = [f'Crude {k + 1}' for k in range(len(base) + (scale - 1)*n_vars)]
+    rows, available = [], []
+    for k, crude in enumerate(crudes):
+        source = fractions[fractions['CRUDE'] == base[k % len(base)]]
+        values = source['FRACTION'].to_numpy()*rng.uniform(0.9, 1.1, len(source))
+        values *= source['FRACTION'].sum()/values.sum()
+        rows.extend((crude, n, round(v, 3)) for n, v in zip(source['NAPHTHA_STANDARD'], values))
+        available.append(round(availability[base[k % len(base)]]*rng.uniform(0.8, 1.2)*len(base)/len(crudes)))
+    return dict(sheets, fractions = pd.DataFrame(rows, columns = ['CRUDE','NAPHTHA_STANDARD','FRACTION']),
+                availability = pd.DataFrame({'CRUDE': crudes, 'AVAILABLE': available}))
+
+
+def _nft(sheets, scale, rng):
+    df_nodes, df_edges = sheets['nodes'], sheets['edges']
+    name = lambda node, k: f'{node} #{k + 1}'
+    nodes = pd.DataFrame([(name(n, k), b) for k in range(scale) for n, b in df_nodes.itertuples(index = False)],
+                         columns = df_nodes.columns)
+    edges = [(name(i, k), name(j, k), c, l, u) for k in range(scale) for i, j, c, l, u in df_edges.itertuples(index = False)]
+    # Transfer arcs between consecutive copies, so the copies are not solved apart
+    transfer = df_nodes.iloc[:, 0][df_nodes.iloc[:, 1] == 0].tolist()
+    for k in range(scale):
+        for i, j in zip(rng.choice(transfer, 3), rng.choice(transfer, 3)):
+            edges.append((name(i, k), name(j, (k + 1) % scale), int(rng.integers(1, 6)), 0, 99))
+    return {'nodes': nodes, 'edges': pd.DataFrame(edges, columns = df_edges.columns)}
+
+
+def _tsp(sheets, scale, rng):
+    n = round(len(sheets['coordinates'])*np.sqrt(scale))
+    cities = [f'City {k + 1}' for k in range(n)]
+    X, Y = rng.integers(0, 101, n), rng.integers(0, 101, n)
+    distance = np.round(np.hypot(X[:, None] - X[None, :], Y[:, None] - Y[None, :]), 1)
+    matrix = pd.DataFrame(distance, columns = cities)
+    matrix.insert(0, 'NODE I', cities)
+    return {'distance': matrix, 'coordinates': pd.DataFrame({'CITY': cities, 'X': X, 'Y': Y})}
+
+
+SYNTHETIC = {'fm1': _food, 'fm2': _food, 'fp1': _factory, 'fp2': _factory, 'manpower': _manpower,
+             'refinery': _refinery, 'nft': _nft, 'tsp': _tsp}
+
+
+def workbook(problem, scale, directory, seed = 0):
+    '''
+    Path of the workbook of <problem> at <scale> in <directory>: a copy of the
+    workbook of the repository at scale 1, a synthetic one otherwise.
+    '''
+    source = os.path.join(ROOT, models.PROBLEMS[problem][0])
+    path = os.path.join(directory, f'{problem}_{scale}.xlsx')
+    if scale == 1:
+        shutil.copyfile(source, path)
+        return path
+    sheets = cache.read_excel(source)
+    sheets = SYNTHETIC[problem](sheets, scale, np.random.default_rng(seed))
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name = name, index = False)
+    return path
+
+#%% Worker
+
+def _rss():
+    # Peak resident memory of this process so far, MB (ru_maxrss is in KB on Linux and bytes on macOS)
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak/2**20 if sys.platform == 'darwin' else peak/2**10
+
+
+def _optimize(model, backend, time_limit, env):
+    # Builds and solves the model with the backend, timing both apart.
+    # Returns the build and solve seconds, the objective value and the variable values (None without a solution)
+    begin = time.perf_counter()
+    if backend == 'gurobi':
+        m, x = lp.to_gurobi(model, env)
+        m.update()
+        built = time.perf_counter()
+        if time_limit is not None:
+            m.Params.TimeLimit = time_limit
+        m.optimize()
+        solution = (m.ObjVal, x.X) if m.SolCount else (None, None)
+        m.dispose()
+    elif backend == 'highs':
+        h = lp.to_highs(model)
+        built = time.perf_counter()
+        if time_limit is not None:
+            h.setOptionValue('time_limit', float(time_limit))
+        h.run()
+        solved = h.getInfo().primal_solution_status == 2    # Feasible solution
+        solution = (h.getInfo().objective_function_value, np.array(h.getSolution().col_value)) if solved else (None, None)
+    else:
+        if backend == 'glop' and model.is_mip:
+            raise ValueError(f'{model.name} has integer variables, GLOP only solves LPs')
+        solver = lp.to_pywraplp(model, backend)
+        built = time.perf_counter()
+        if time_limit is not None:
+            solver.SetTimeLimit(int(1000*time_limit))
+        if solver.Solve() in (solver.OPTIMAL, solver.FEASIBLE):
+            solution = (solver.Objective().Value(), np.array([v.solution_value() for v in solver.variables()]))
+        else:
+            solution = (None, None)
+    return (built - begin, time.perf_counter() - built) + solution
+
+
+def _solve_tsp(data, backend, time_limit, env):
+    # Subtour elimination loop of models.solve_tsp, with the build and solve times summed over the solves
+    model = models.tsp(data)
+    build = solve = 0.0
+    solves = 0
+    while True:
+        b, s, objective, values = _optimize(model, backend, time_limit, env)
+        build, solve, solves = build + b, solve + s, solves + 1
+        if values is None or models.subtour_cuts(model, data, values) == 1:
+            return build, solve, objective, solves
+
+
+def worker(problem, path, backend, time_limit):
+    # Measures one case in this process and prints its row as JSON. The libraries are imported before the timings
+    env = None
+    if backend == 'gurobi':
+        import gurobipy as gb
+        env = gb.Env(params = {'OutputFlag': 0})
+    elif backend == 'highs':
+        import highspy
+    else:
+        from ortools.linear_solver import pywraplp
+    import openpyxl
+    import scipy.sparse
+
+    _, reader, declare = models.PROBLEMS[problem]
+    row = {'base_rss': _rss()}
+    try:
+        begin = time.perf_counter()
+        data = reader(path)
+        row['load'] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        model = declare(data)
+        row['declare'] = time.perf_counter() - begin
+        row['variables'], row['constraints'] = model.n_vars, model.n_rows
+        row['nonzeros'] = model.arrays()[4].nnz
+
+        if problem == 'tsp':
+            row['build'], row['solve'], row['objective'], row['solves'] = _solve_tsp(data, backend, time_limit, env)
+        else:
+            row['build'], row['solve'], row['objective'], _ = _optimize(model, backend, time_limit, env)
+    except Exception as e:
+        row['error'] = str(e).splitlines()[0]
+    row['peak_rss'] = _rss()
+    print(json.dumps(row), flush = True)
+
+#%% Suite
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd = ROOT, capture_output = True,
+                              text = True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _case(problem, path, backend, time_limit):
+    # One run of a case in a new process, with a cold parameter cache
+    shutil.rmtree(cache.cache_dir_for(path), ignore_errors = True)
+    command = [sys.executable, os.path.abspath(__file__), '--worker', problem, path, '--backend', backend]
+    if time_limit is not None:
+        command += ['--time-limit', str(time_limit)]
+    result = subprocess.run(command, capture_output = True, text = True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+    return json.loads(lines[-1]) if lines else {'error': (result.stderr.strip().splitlines() or ['no output'])[-1]}
+
+
+def run(problems, scales, backend, time_limit, repeat = 3, seed = 0):
+    '''
+    Runs every problem at every scale <repeat> times, one process per run, and
+    keeps the fastest time of every phase and the lowest peak memory. Returns
+    the results document (commit, machine, settings and one row per case).
+    '''
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for problem in problems:
+            for scale in scales:
+                path = workbook(problem, scale, directory, seed)
+                runs = [_case(problem, path, backend, time_limit) for _ in range(repeat)]
+                row = dict(problem = problem, scale = scale, **runs[-1])
+                for key in PHASES + ('peak_rss',):
+                    values = [r[key] for r in runs if key in r]
+                    if values:
+                        row[key] = min(values)
+                rows.append(row)
+                _print_row(row)
+    return {'commit': _commit(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'backend': backend,
+            'time_limit': time_limit, 'repeat': repeat, 'python': platform.python_version(),
+            'machine': platform.machine(), 'processor': platform.processor(), 'cpus': os.cpu_count(), 'results': rows}
+
+
+def _print_row(row):
+    if 'variables' not in row:
+        print(f'{row["problem"]:>9} {row["scale"]:>6}  failed: {row.get("error")}')
+        return
+    times = ' '.join(f'{row[p]:>9.4f}' if p in row else f'{"-":>9}' for p in PHASES)
+    objective = f'{row["objective"]:>14.2f}' if row.get('objective') is not None else f'{"-":>14}'
+    print(f'{row["problem"]:>9} {row["scale"]:>6} {row["variables"]:>9} {times} {row["peak_rss"]:>9.1f} {objective}'
+          + (f'  {row["error"]}' if 'error' in row else ''))
+
+
+def compare(current, previous, threshold):
+    '''
+    Prints the ratios of the times and peak memory of the <current> results to
+    the <previous> ones, flagging the ratios above <threshold>.
+    '''
+    before = {(r['problem'], r['scale']): r for r in previous['results']}
+    print(f'\nCompared with {previous.get("commit")} ({previous.get("time")}), ratio current/previous:')
+    print(f'{"problem":>9} {"scale":>6} ' + ' '.join(f'{p:>9}' for p in PHASES + ('peak_rss',)))
+    for row in current['results']:
+        old = before.get((row['problem'], row['scale']))
+        if old is None:
+            continue
+        ratios = []
+        for key in PHASES + ('peak_rss',):
+            if key in row and key in old and old[key] > 0:
+                ratio = row[key]/old[key]
+                ratios.append(f'{ratio:>8.2f}' + ('!' if ratio > threshold else ' '))
+            else:
+                ratios.append(f'{"-":>9}')
+        print(f'{row["problem"]:>9} {row["scale"]:>6} ' + ' '.join(ratios))
+
+
+def main(problems, scales, backend, time_limit, repeat, output, previous, threshold):
+    print(f'{"problem":>9} {"scale":>6} {"vars":>9} ' + ' '.join(f'{p + " [s]":>9}' for p in PHASES)
+          + f' {"RSS [MB]":>9} {"objective":>14}')
+    results = run(problems, scales, backend, time_limit, repeat)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent = 1)
+        print(f'Results written to {output}')
+    if previous:
+        with open(previous) as f:
+            compare(results, json.load(f), threshold)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--problems', nargs = '+', default = list(models.PROBLEMS), choices = list(models.PROBLEMS))
+    parser.add_argument('--scales', nargs = '+', type = int, default = [1, 10, 100])
+    parser.add_argument('--backend', default = 'gurobi', choices = lp.BACKENDS)
+    parser.add_argument('--time-limit', type = float, default = 60)
+    parser.add_argument('--repeat', type = int, default = 3, help = 'runs of every case, the fastest is kept')
+    parser.add_argument('--output', default = 'bench.json')
+    parser.add_argument('--compare', metavar = 'PREVIOUS', help = 'results of a previous run')
+    parser.add_argument('--threshold', type = float, default = 1.2, help = 'ratio flagged as a regression')
+    parser.add_argument('--worker', nargs = 2, metavar = ('PROBLEM', 'WORKBOOK'), help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(*args.worker, args.backend, args.time_limit)
+    else:
+        main(args.problems, args.scales, args.backend, args.time_limit, args.repeat, args.output, args.compare,
+             args.threshold)
+
+#%% End of file
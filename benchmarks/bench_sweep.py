@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Food Manufacture Scenario Sweep
+*************************************
+
+Throughput (scenarios per second) of sweep.run over a PRICE × COST_SCALE
+grid of the Food Manufacture workbooks for an increasing number of worker
+processes, all sharing the same number of Gurobi threads. The objective
+values of every run must match the single process run.
+
+Usage:
+    python benchmarks/bench_sweep.py [--model fm1] [--scenarios 200] [--workers 1 2 4]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import sweep
+
+WORKBOOKS = {'fm1': '1. Food Manufacture I/Parameters.xlsx', 'fm2': '2. Food Manufacture II/Parameters.xlsx'}
+
+#%% Benchmark
+
+def main(model, n_scenarios, workers, threads):
+    side = int(np.ceil(np.sqrt(n_scenarios)))
+    scenarios = sweep.scenario_grid(os.path.join(ROOT, WORKBOOKS[model]),
+                                    PRICE = np.linspace(120, 180, side).tolist(),
+                                    COST_SCALE = np.linspace(0.8, 1.2, side).tolist())[:n_scenarios]
+
+    print(f'{"workers":>8} {"threads/worker":>15} {"wall [s]":>9} {"scenarios/s":>12}')
+    reference = None
+    for w in workers:
+        results, stats = sweep.run(model, scenarios, workers = w, threads = threads)
+        objval = results.sort_values('name')['objval'].to_numpy()
+        if reference is None:
+            reference = objval
+        assert np.allclose(objval, reference)
+        print(f'{w:>8} {max(1, threads//w):>15} {stats["wall"]:>9.2f} {stats["throughput"]:>12.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', choices = sorted(WORKBOOKS), default = 'fm1')
+    parser.add_argument('--scenarios', type = int, default = 200)
+    parser.add_argument('--workers', type = int, nargs = '+', default = [1, 2, 4])
+    parser.add_argument('--threads', type = int, default = os.cpu_count())
+    args = parser.parse_args()
+    main(args.model, args.scenarios, args.workers, args.threads)
+
+#%% End of file
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: TSP Distance Ingestion
+*************************************
+
+Time to turn the TSP parameters into the edge list with distances:
+
+    melt        The original path: melt the matrix sheet, drop the (i,i) and
+                duplicate edges row by row and build the dictionary with
+                iterrows() (only up to --max-melt cities, it is quadratic in
+                the number of rows)
+    matrix      tsp.matrix_edges on the matrix sheet (NumPy upper triangle)
+    euclidean   tsp.coordinate_edges on the coordinates sheet
+    haversine   tsp.coordinate_edges with great-circle distances
+
+Usage:
+    python benchmarks/bench_tsp_data.py [--cities 50 100 1000 5000]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import tsp
+
+#%% Synthetic data
+
+def random_sheets(n, seed = 0):
+    rng = np.random.default_rng(seed)
+    names = [f'City {k + 1}' for k in range(n)]
+    df_coord = pd.DataFrame({'X': rng.uniform(-80, 80, n), 'Y': rng.uniform(-60, 60, n)}, index = pd.Index(names, name = 'CITY'))
+    X, Y = df_coord['X'].to_numpy(), df_coord['Y'].to_numpy()
+    matrix = np.round(np.hypot(X[:, None] - X[None, :], Y[:, None] - Y[None, :]), 1)
+    df_matrix = pd.DataFrame(matrix, columns = names)
+    df_matrix.insert(0, 'NODE I', names)
+    return df_matrix, df_coord
+
+#%% Loaders
+
+def melt_path(df_matrix):
+    df_distance = pd.melt(df_matrix, id_vars = 'NODE I', var_name = 'NODE J', value_name = 'DISTANCE')
+    for index, row in df_distance.iterrows():
+        if int(row.iloc[0][5:]) >= int(row.iloc[1][5:]):
+            df_distance = df_distance.drop(index)
+    dic_distance = {}
+    for index, row in df_distance.iterrows():
+        dic_distance[(row.iloc[0],row.iloc[1])] = row.iloc[2]
+    return dic_distance
+
+#%% Benchmark
+
+def timed(func, *args):
+    begin = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - begin, result
+
+
+def main(sizes, max_melt):
+    print(f'{"cities":>7} {"edges":>10} {"melt [s]":>9} {"matrix [s]":>11} {"euclidean [s]":>14} {"haversine [s]":>14}')
+    for n in sizes:
+        df_matrix, df_coord = random_sheets(n)
+        t_matrix, (vertices, ei, ej, d) = timed(tsp.matrix_edges, df_matrix)
+        t_euclid, (_, _, _, d_euclid) = timed(tsp.coordinate_edges, df_coord)
+        t_haver, _ = timed(tsp.coordinate_edges, df_coord, 'haversine')
+        assert np.allclose(d, d_euclid, atol = 0.05)
+
+        t_melt = float('nan')
+        if n <= max_melt:
+            t_melt, dic = timed(melt_path, df_matrix)
+            edges = list(zip(np.asarray(vertices)[ei], np.asarray(vertices)[ej]))
+            assert list(dic) == edges and list(dic.values()) == d.tolist()
+        print(f'{n:>7} {len(d):>10} {t_melt:>9.3f} {t_matrix:>11.3f} {t_euclid:>14.3f} {t_haver:>14.3f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [50, 100, 1_000, 5_000])
+    parser.add_argument('--max-melt', type = int, default = 100)
+    args = parser.parse_args()
+    main(args.cities, args.max_melt)
+
+#%% End of file
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: TSP Heuristic Warm Start
+*************************************
+
+Nearest neighbour / greedy edge construction followed by 2-opt and Or-opt
+(heuristics.heuristic_tour) on random instances:
+
+    heuristic   tour length and time of each construction, with and without
+                the improvement moves (within --time-limit seconds)
+    exact       for up to --max-exact cities, time of tsp.solve_sparse
+                without and with the heuristic tour as MIP start, and the gap
+                of the heuristic tour to the optimum
+
+Usage:
+    python benchmarks/bench_tsp_heuristic.py [--cities 50 100 1000 2000] [--time-limit 1.0]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import heuristics, tsp
+
+#%% Synthetic data
+
+def random_coordinates(n, seed = 0):
+    rng = np.random.default_rng(seed)
+    names = [f'City {k + 1}' for k in range(n)]
+    return pd.DataFrame({'X': rng.uniform(-80, 80, n), 'Y': rng.uniform(-60, 60, n)}, index = pd.Index(names, name = 'CITY'))
+
+#%% Benchmark
+
+def timed(func, *args, **kwargs):
+    begin = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - begin, result
+
+
+def exact(df_coord, tours, env):
+    t, (model, _, stats) = timed(tsp.solve_sparse, df_coord, 5, tours = tours, env = env)
+    objval = model.ObjVal
+    model.dispose()
+    return t, objval
+
+
+def main(sizes, time_limit, max_exact):
+    print(f'{"cities":>7} {"method":>8} {"built":>9} {"[s]":>6} {"improved":>9} {"[s]":>6} {"gap %":>6} {"cold [s]":>9} {"warm [s]":>9}')
+    env = None
+    for n in sizes:
+        df_coord = random_coordinates(n)
+        D = tsp.distance_matrix(df_coord)
+        t_cold = t_warm = optimum = float('nan')
+        for method in ('nearest', 'greedy'):
+            construct = heuristics.nearest_neighbour if method == 'nearest' else heuristics.greedy_edge
+            t_built, built = timed(construct, D)
+            t_tour, (tour, length) = timed(heuristics.heuristic_tour, D, method, time_limit)
+
+            if n <= max_exact:
+                import gurobipy as gb
+
+                env = env or gb.Env(params = {'OutputFlag': 0})
+                try:
+                    if method == 'nearest':
+                        t_cold, optimum = exact(df_coord, (), env)
+                    t_warm, objval = exact(df_coord, [tour], env)
+                    assert abs(objval - optimum) <= 1e-4*optimum
+                except gb.GurobiError:
+                    pass
+            gap = 100*(length - optimum)/optimum
+            print(f'{n:>7} {method:>8} {heuristics.tour_length(D, built):>9.1f} {t_built:>6.3f} {length:>9.1f} {t_tour:>6.3f} '
+                  f'{gap:>6.2f} {t_cold:>9.2f} {t_warm:>9.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [50, 100, 1_000, 2_000])
+    parser.add_argument('--time-limit', type = float, default = 1.0)
+    parser.add_argument('--max-exact', type = int, default = 100)
+    args = parser.parse_args()
+    main(args.cities, args.time_limit, args.max_exact)
+
+#%% End of file
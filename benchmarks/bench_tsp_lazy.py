@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: TSP Subtour Elimination
+*************************************
+
+Solves random Euclidean TSP instances with the two procedures of mathprog.tsp:
+
+    loop    Re-optimization from scratch after adding the subtour constraints
+    lazy    Lazy constraints added from a MIPSOL callback, single optimization
+
+and reports iterations, cuts, Gurobi runtime, explored nodes and wall time.
+Both must reach the same tour length.
+
+Note: a size-limited Gurobi license allows up to 2000 variables, i.e. about
+60 cities with the complete graph.
+
+Usage:
+    python benchmarks/bench_tsp_lazy.py [--cities 20 40 60 200]
+"""
+
+#%% Importing libraries
+
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import tsp
+
+#%% Synthetic data
+
+def random_instance(n, seed = 0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 100, (n, 2))
+    vertices = list(range(n))
+    edges = gb.tuplelist(itertools.combinations(vertices, 2))
+    distance = {(i,j): float(np.hypot(*(xy[i] - xy[j]))) for i, j in edges}
+    return vertices, edges, distance
+
+#%% Benchmark
+
+def run(procedure, env, vertices, edges, distance):
+    model, x = tsp.build_model(vertices, edges, distance, env = env)
+    if procedure == 'lazy':
+        stats = tsp.solve_lazy(model, x, vertices)
+    else:
+        stats = tsp.solve_loop(model, x, vertices)
+    stats['objective'] = model.ObjVal
+    model.dispose()
+    return stats
+
+
+def main(sizes, seed):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"cities":>6} {"mode":>5} {"iterations":>10} {"cuts":>6} {"runtime [s]":>12} {"nodes":>8} {"wall [s]":>9} {"length":>9}')
+    for n in sizes:
+        data = random_instance(n, seed)
+        results = {}
+        for procedure in ('loop', 'lazy'):
+            s = results[procedure] = run(procedure, env, *data)
+            print(f'{n:>6} {procedure:>5} {s["iterations"]:>10} {s["cuts"]:>6} {s["runtime"]:>12.3f} '
+                  f'{s["nodes"]:>8.0f} {s["wall"]:>9.3f} {s["objective"]:>9.1f}')
+        assert abs(results['loop']['objective'] - results['lazy']['objective']) < 1e-6*results['loop']['objective']
+    env.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [20, 40, 60])
+    parser.add_argument('--seed', type = int, default = 0)
+    args = parser.parse_args()
+    main(args.cities, args.seed)
+
+#%% End of file
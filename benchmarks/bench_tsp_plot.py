@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: TSP Plot Refresh
+*************************************
+
+Cost of refreshing the TSP plot once per iteration of the subtour loop, on
+random tours rendered with the Agg backend:
+
+    redraw      The original create_plot(): close the figure, scatter the
+                cities, add every label with iterrows() and one plot() call
+                per selected edge
+    collection  plotting.TourPlot: cities and labels drawn once, the edges
+                replaced in a single LineCollection and blitted over the
+                cached background
+
+Usage:
+    python benchmarks/bench_tsp_plot.py [--cities 20 200 2000] [--iterations 5]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog.plotting import TourPlot
+
+#%% Synthetic data
+
+def random_coordinates(n, seed = 0):
+    rng = np.random.default_rng(seed)
+    names = [f'City {k + 1}' for k in range(n)]
+    return pd.DataFrame({'X': rng.uniform(-80, 80, n), 'Y': rng.uniform(-60, 60, n)}, index = pd.Index(names, name = 'CITY'))
+
+#%% Plots
+
+def redraw(df_coord, tour):
+    plt.close()
+    plt.xlabel("X Coordinate")
+    plt.ylabel("Y Coordinate")
+    plt.title("Travelling Salesman Problem")
+    plt.scatter(df_coord['X'], df_coord['Y'], 50, 'Blue', marker = 'o')
+    for index, row in df_coord.iterrows():
+        plt.text(row.iloc[0]-5, row.iloc[1]+4, index, fontsize = 10)
+    names = df_coord.index
+    for a, b in zip(tour, np.roll(tour, -1)):
+        i, j = names[a], names[b]
+        plt.plot([df_coord.loc[i,'X'],df_coord.loc[j,'X']], [df_coord.loc[i,'Y'],df_coord.loc[j,'Y']], c = 'red', alpha = 0.8, linestyle = '--', linewidth = 1)
+    plt.gcf().canvas.draw()
+
+
+#%% Benchmark
+
+def main(sizes, iterations):
+    print(f'{"cities":>7} {"redraw [s/it]":>14} {"collection [s/it]":>18} {"speedup":>8}')
+    rng = np.random.default_rng(1)
+    for n in sizes:
+        df_coord = random_coordinates(n)
+        tours = [rng.permutation(n) for _ in range(iterations)]
+
+        begin = time.perf_counter()
+        for tour in tours:
+            redraw(df_coord, tour)
+        t_redraw = (time.perf_counter() - begin)/iterations
+        plt.close('all')
+
+        begin = time.perf_counter()
+        tour_plot = TourPlot(df_coord, 'window')
+        for tour in tours:
+            tour_plot.update_tour(tour)
+        t_collection = (time.perf_counter() - begin)/iterations
+        plt.close('all')
+        print(f'{n:>7} {t_redraw:>14.4f} {t_collection:>18.4f} {t_redraw/t_collection:>8.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [20, 200, 2_000])
+    parser.add_argument('--iterations', type = int, default = 5)
+    args = parser.parse_args()
+    main(args.cities, args.iterations)
+
+#%% End of file
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Sparse Candidate-Edge TSP
+*************************************
+
+Complete graph against the k-nearest-neighbour candidate graph of
+tsp.solve_sparse on random instances:
+
+    complete    tsp.coordinate_edges + solve_lazy over the n(n-1)/2 edges
+                (only up to --max-complete cities)
+    sparse      tsp.solve_sparse, candidate edges priced in by reduced costs
+
+For each size it reports the number of edge variables, the memory of the
+edge arrays, the tour length and the wall time. Both tours must agree within
+the MIPGap of Gurobi (1e-4 by default).
+
+Usage:
+    python benchmarks/bench_tsp_sparse.py [--cities 50 60 100 150] [--k 5]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import gurobipy as gb
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import tsp
+
+#%% Synthetic data
+
+def random_coordinates(n, seed = 0):
+    rng = np.random.default_rng(seed)
+    names = [f'City {k + 1}' for k in range(n)]
+    return pd.DataFrame({'X': rng.uniform(-80, 80, n), 'Y': rng.uniform(-60, 60, n)}, index = pd.Index(names, name = 'CITY'))
+
+#%% Benchmark
+
+def complete(df_coord, env):
+    vertices, ei, ej, d = tsp.coordinate_edges(df_coord)
+    edges, distance = tsp.edge_dicts(vertices, ei, ej, d)
+    model, x = tsp.build_model(vertices, edges, distance, env = env)
+    tsp.solve_lazy(model, x, vertices)
+    objval = model.ObjVal
+    model.dispose()
+    return len(d), ei.nbytes + ej.nbytes + d.nbytes, objval
+
+
+def sparse(df_coord, k, env):
+    model, x, stats = tsp.solve_sparse(df_coord, k, env = env)
+    objval = model.ObjVal
+    model.dispose()
+    return stats, objval
+
+
+def main(sizes, k, max_complete):
+    env = gb.Env(params = {'OutputFlag': 0})
+    print(f'{"cities":>7} {"edges":>9} {"MB":>7} {"tour":>9} {"time [s]":>9} | {"edges":>7} {"added":>6} {"rounds":>6} {"MB":>7} {"tour":>9} {"time [s]":>9}')
+    for n in sizes:
+        df_coord = random_coordinates(n)
+        begin = time.perf_counter()
+        try:
+            stats, objval = sparse(df_coord, k, env)
+        except gb.GurobiError as e:
+            print(f'{n:>7} skipped: {e}')
+            continue
+        t_sparse = time.perf_counter() - begin
+        mb_sparse = stats['edges']*3*8/1024**2    # ei, ej and distance arrays
+
+        line = f'{"-":>9} {"-":>7} {"-":>9} {"-":>9}'
+        if n <= max_complete:
+            begin = time.perf_counter()
+            try:
+                n_edges, nbytes, objval_complete = complete(df_coord, env)
+                line = f'{n_edges:>9} {nbytes/1024**2:>7.2f} {objval_complete:>9.1f} {time.perf_counter() - begin:>9.2f}'
+                assert abs(objval - objval_complete) <= 1e-4*objval_complete
+            except gb.GurobiError:
+                pass
+        print(f'{n:>7} {line} | {stats["edges"]:>7} {stats["added"]:>6} {stats["rounds"]:>6} {mb_sparse:>7.2f} {objval:>9.1f} {t_sparse:>9.2f}')
+        assert stats['proven']
+    env.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cities', type = int, nargs = '+', default = [50, 60, 100, 150])
+    parser.add_argument('--k', type = int, default = 5)
+    parser.add_argument('--max-complete', type = int, default = 60)
+    args = parser.parse_args()
+    main(args.cities, args.k, args.max_complete)
+
+#%% End of file
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Benchmark: Workbook Reading
+*************************************
+
+Single workbook: the three pd.read_excel calls the Food Manufacture scripts
+used (Cost, Hardness, Scalars) against one read-only open of the workbook
+with mathprog.params.read_workbook.
+
+Scenario sweep: <n> copies of the Food Manufacture I workbook loaded one by
+one, with the thread pool and with the process pool of read_workbooks, then
+through the binary cache (cached = True) with both pools: cold (every copy
+stored concurrently in the shared cache directory) and warm. The cached
+frames must equal the parsed ones.
+
+Usage:
+    python benchmarks/bench_workbooks.py [--scenarios 200] [--workers 8]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import cache, params
+
+WORKBOOK = os.path.join(ROOT, '1. Food Manufacture I', 'Parameters.xlsx')
+SHEETS = ['Cost','Hardness','Scalars']
+
+#%% Loaders
+
+def three_opens(path):
+    return {name: pd.read_excel(path, index_col = None, header = 0, sheet_name = name) for name in SHEETS}
+
+
+def one_open(path):
+    return params.read_workbook(path, SHEETS)
+
+#%% Benchmark
+
+def timed(func, *args, **kwargs):
+    begin = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - begin, result
+
+
+def main(scenarios, workers):
+    t3, a = timed(three_opens, WORKBOOK)
+    t1, b = timed(one_open, WORKBOOK)
+    for name in SHEETS:
+        pd.testing.assert_frame_equal(a[name], b[name])
+    print(f'Single workbook: three opens {1000*t3:.1f} ms, one open {1000*t1:.1f} ms')
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = []
+        for i in range(scenarios):
+            paths.append(os.path.join(folder, f'scenario_{i}.xlsx'))
+            shutil.copy(WORKBOOK, paths[-1])
+
+        t_seq, _ = timed(lambda: [three_opens(p) for p in paths])
+        print(f'{scenarios} scenarios, three opens each:   {t_seq:.2f} s ({scenarios/t_seq:.0f} workbooks/s)')
+        t_seq, _ = timed(lambda: [one_open(p) for p in paths])
+        print(f'{scenarios} scenarios, one open each:      {t_seq:.2f} s ({scenarios/t_seq:.0f} workbooks/s)')
+        t_thr, _ = timed(params.read_workbooks, paths, SHEETS, max_workers = workers)
+        print(f'{scenarios} scenarios, thread pool ({workers}):   {t_thr:.2f} s ({scenarios/t_thr:.0f} workbooks/s)')
+        t_prc, _ = timed(params.read_workbooks, paths, SHEETS, max_workers = workers, processes = True)
+        print(f'{scenarios} scenarios, process pool ({workers}):  {t_prc:.2f} s ({scenarios/t_prc:.0f} workbooks/s)')
+
+        for processes, pool in ((False, 'thread'), (True, 'process')):
+            cache.clear(cache.cache_dir_for(paths[0]))
+            for state in ('cold', 'warm'):
+                t, sheets = timed(params.read_workbooks, paths, SHEETS, max_workers = workers, processes = processes,
+                                  cached = True)
+                for name in SHEETS:
+                    pd.testing.assert_frame_equal(sheets[paths[-1]][name], b[name])
+                label = f'cached {pool} pool, {state}:'
+                print(f'{scenarios} scenarios, {label:<27} {t:.2f} s ({scenarios/t:.0f} workbooks/s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', type = int, default = 200)
+    parser.add_argument('--workers', type = int, default = os.cpu_count())
+    args = parser.parse_args()
+    main(args.scenarios, args.workers)
+
+#%% End of file
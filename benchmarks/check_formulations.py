@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Check: Gurobi Formulations against the Declarations
+*************************************
+
+Every problem is written twice: with addVars / addConstrs in its Gurobi
+implementation (and in the food module builders) and in array form in the
+models module, which drives the OR-tools and HiGHS backends. This check
+keeps them from drifting apart. For every problem it builds both models,
+puts them in a canonical form and compares them:
+
+    variables   name (block[key]), objective coefficient, bounds and type
+                (a binary variable is an integer one in [0, 1])
+    rows        coefficients by variable name, sense and right-hand side,
+                with >= rows turned into <= rows and = rows scaled to a
+                positive first coefficient, so the order of the rows and of
+                the terms does not matter
+    objective   optimal value of both models
+
+The Factory Planning I/II, Manpower Planning and Refinery Optimisation
+models are those left by running the Gurobi implementations (output hidden,
+no sensitivity analysis). The Food Manufacture models are those of
+food.build_fm1 and food.build_fm2 ('bigM' and 'type' linking; the
+'indicator' linking has no array form), on the workbooks and on a synthetic
+instance (food.synthetic_parameters).
+
+The repository has no test suite: this script stands in for one. It exits
+with status 1 if any model differs.
+
+Usage:
+    python benchmarks/check_formulations.py [--problems fm1 fm2 fp1 fp2 manpower refinery]
+"""
+
+#%% Importing libraries
+
+import argparse
+import builtins
+import contextlib
+import os
+import runpy
+import sys
+import warnings
+from collections import Counter
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)    # Repository root
+from mathprog import food, lp, models
+
+SCRIPTS = {'fp1': '3. Factory Planning I', 'fp2': '4 . Factory Planning II', 'manpower': '5. Manpower planning',
+           'refinery': '6. Refinery optimisation'}
+DIGITS = 9    # Significant digits of the compared coefficients
+
+#%% Models
+
+@contextlib.contextmanager
+def _quiet(folder):
+    # Runs in <folder> with the standard output (Python and Gurobi logs) and the warnings discarded, and every
+    # prompt answered 'n'
+    cwd, ask, saved = os.getcwd(), builtins.input, os.dup(1)
+    sys.stdout.flush()
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            os.chdir(folder)
+            builtins.input = lambda *args: 'n'
+            with contextlib.redirect_stdout(devnull), warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                yield
+        finally:
+            builtins.input = ask
+            os.chdir(cwd)
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def script_model(problem):
+    # Gurobi model left by the Gurobi implementation of <problem>
+    folder = os.path.join(ROOT, SCRIPTS[problem])
+    with _quiet(folder):
+        return runpy.run_path(os.path.join(folder, 'Gurobi Implementation.py'), run_name = 'check')['model']
+
+
+def declared_model(declared, env):
+    # Gurobi model of the declaration, with the variables named as addVars names them: block[key]
+    m, x = lp.to_gurobi(declared, env)
+    names = np.empty(declared.n_vars, dtype = object)
+    for block, (positions, index) in declared.blocks.items():
+        names[positions] = [f'{block}[{",".join(map(str, key)) if isinstance(key, tuple) else key}]' for key in index]
+    x.VarName = names.tolist()
+    return m
+
+
+def cases(problems, env):
+    # (case, Gurobi formulation, declared model) of every problem
+    for problem in problems:
+        if problem in SCRIPTS:
+            yield problem, script_model(problem), declared_model(models.PROBLEMS[problem][2](models.load(problem)), env)
+            continue
+        path = os.path.join(ROOT, models.PROBLEMS[problem][0])
+        for source, data, declared_data in (('workbook', food.read_parameters(path), models.load(problem)),
+                                            ('10x12', *(food.synthetic_parameters(10, 12),)*2)):
+            if problem == 'fm1':
+                yield f'fm1 {source}', food.build_fm1(data, env)[0], declared_model(models.fm1(declared_data), env)
+            else:
+                for linking in ('bigM', 'type'):
+                    yield (f'fm2 {source} {linking}', food.build_fm2(data, env, linking)[0],
+                           declared_model(models.fm2(declared_data, linking), env))
+
+#%% Canonical form
+
+def _round(values):
+    values = np.asarray(values, dtype = float)
+    return np.array([float(f'{v:.{DIGITS}g}') for v in values.tolist()])
+
+
+def canonical(m):
+    # Variables and multiset of the rows of <m>, independent of the order of both
+    m.update()
+    variables = m.getVars()
+    names = m.getAttr('VarName', variables)
+    columns = zip(names, _round(m.getAttr('Obj', variables)), _round(m.getAttr('LB', variables)),
+                  _round(m.getAttr('UB', variables)), [t.replace('B', 'I') for t in m.getAttr('VType', variables)])
+    constrs = m.getConstrs()
+    A = m.getA().tocsr()
+    senses, rhs = m.getAttr('Sense', constrs), m.getAttr('RHS', constrs)
+    rows = Counter()
+    for k in range(A.shape[0]):
+        start, end = A.indptr[k], A.indptr[k + 1]
+        terms = sorted((names[j], v) for j, v in zip(A.indices[start:end].tolist(), A.data[start:end].tolist()) if v)
+        sign = -1.0 if senses[k] == '>' or (senses[k] == '=' and terms and terms[0][1] < 0) else 1.0
+        coefficients = _round([sign*v for _, v in terms])
+        rows[('=' if senses[k] == '=' else '<', _round([sign*rhs[k]])[0],
+              tuple(zip((name for name, _ in terms), coefficients.tolist())))] += 1
+    return {column[0]: column[1:] for column in columns}, rows, int(m.ModelSense)
+
+
+def compare(formulation, declared):
+    # Differences between the two models, empty when they are the same
+    (columns, rows, sense), (columns_d, rows_d, sense_d) = canonical(formulation), canonical(declared)
+    differences = []
+    if sense != sense_d:
+        differences.append('objective sense')
+    missing, extra = set(columns_d) - set(columns), set(columns) - set(columns_d)
+    if missing or extra:
+        differences.append(f'{len(missing)} variables only declared, {len(extra)} only in the formulation '
+                           f'(e.g. {sorted(missing | extra)[0]})')
+    changed = [name for name in set(columns) & set(columns_d) if columns[name] != columns_d[name]]
+    if changed:
+        differences.append(f'{len(changed)} variables with other costs, bounds or types (e.g. {sorted(changed)[0]})')
+    only, only_d = rows - rows_d, rows_d - rows
+    if only or only_d:
+        differences.append(f'{sum(only_d.values())} rows only declared, {sum(only.values())} only in the formulation')
+    return differences
+
+#%% Check
+
+def main(problems):
+    import gurobipy as gb
+
+    env = gb.Env(params = {'OutputFlag': 0})
+    failed = 0
+    print(f'{"case":>22} {"vars":>6} {"constrs":>8} {"objective":>14} {"declared":>14}  check')
+    for case, formulation, declared in cases(problems, env):
+        formulation.Params.OutputFlag = 0
+        for m in (formulation, declared):
+            if m.Status == gb.GRB.LOADED:    # The scripts leave their model solved
+                m.optimize()
+        differences = compare(formulation, declared)
+        if abs(formulation.ObjVal - declared.ObjVal) > 1e-6*max(1.0, abs(declared.ObjVal)):
+            differences.append('objective value')
+        failed += bool(differences)
+        print(f'{case:>22} {formulation.NumVars:>6} {formulation.NumConstrs:>8} {formulation.ObjVal:>14.3f} '
+              f'{declared.ObjVal:>14.3f}  {"same" if not differences else "DIFFERENT: " + "; ".join(differences)}')
+        formulation.dispose()
+        declared.dispose()
+    print(f'{failed} model(s) differ' if failed else 'Every formulation matches its declaration')
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--problems', nargs = '+', default = ['fm1', 'fm2', 'fp1', 'fp2', 'manpower', 'refinery'],
+                        choices = ['fm1', 'fm2'] + list(SCRIPTS))
+    args = parser.parse_args()
+    sys.exit(1 if main(args.problems) else 0)
+
+#%% End of file
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Check: Min Cost Flow Backend against Gurobi
+*************************************
+
+Solves network flow instances with both backends of mathprog.network.solve
+('gurobi' LP and 'ortools' min cost flow) and checks, for every instance:
+
+    flows       both flows within the arc bounds and meeting the supplies of
+                the original (untransformed) problem, integral for the min
+                cost flow backend
+    objective   the same optimal value with both backends, and equal to the
+                cost of the returned flows
+
+The instances are the network of the Network Flow Template workbook, random
+feasible networks (bench_mcf.random_instance) with lower bounds on a part of
+the arcs, the same with infinite upper bounds on a part of them, and an
+unbalanced network, which both backends must reject. The random instances
+stay within a size-limited Gurobi license.
+
+The repository has no test suite: this script stands in for one. It exits
+with status 1 if any check fails.
+
+Usage:
+    python benchmarks/check_mcf.py [--arcs 200 1000 1900] [--seeds 5]
+"""
+
+#%% Importing libraries
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))    # Repository root
+from mathprog import models, network
+from bench_mcf import random_instance
+
+#%% Instances
+
+def instances(sizes, seeds):
+    # (name, b, tails, heads, c, l, u) of every feasible instance
+    nodes, b, tails, heads, c, l, u = models.load('nft')
+    yield ('NFT workbook', b, tails, heads, c, l, u)
+    for n_arcs in sizes:
+        for seed in range(seeds):
+            yield (f'{n_arcs} arcs #{seed}',) + random_instance(n_arcs, seed = seed)
+    b, tails, heads, c, l, u = random_instance(sizes[0], seed = seeds)
+    unbounded = np.random.default_rng(seeds).random(len(u)) < 0.2
+    yield (f'{sizes[0]} arcs, u = inf', b, tails, heads, c, l, np.where(unbounded, np.inf, u))
+
+#%% Checks
+
+def check_flow(flow, b, tails, heads, c, l, u, integral):
+    # Reasons the flow is not a feasible flow of the instance
+    problems = []
+    if np.any(flow < l - 1e-6) or np.any(flow > u + 1e-6):
+        problems.append('flow out of its bounds')
+    if not np.allclose(network.incidence_matrix(tails, heads, len(b)) @ flow, b, atol = 1e-6):
+        problems.append('supplies not met')
+    if integral and not np.array_equal(flow, np.round(flow)):
+        problems.append('fractional flow')
+    return problems
+
+
+def check(data, env):
+    # Failed checks of a feasible instance, and the objective value
+    solutions = {backend: network.solve(*data, backend = backend, env = env) for backend in ('ortools', 'gurobi')}
+    b, tails, heads, c, l, u = data
+    failed = []
+    for backend, (objval, flow) in solutions.items():
+        failed += [f'{backend}: {p}' for p in check_flow(flow, *data, integral = backend == 'ortools')]
+        if abs(c @ flow - objval) > 1e-6*max(1.0, abs(objval)):
+            failed.append(f'{backend}: objective is not the cost of the flow')
+    (obj_mcf, _), (obj_lp, _) = solutions['ortools'], solutions['gurobi']
+    if abs(obj_mcf - obj_lp) > 1e-6*max(1.0, abs(obj_lp)):
+        failed.append(f'objective {obj_mcf} (ortools) != {obj_lp} (gurobi)')
+    return failed, obj_lp
+
+
+def check_infeasible(n_arcs, env):
+    # Failed checks of an unbalanced instance: both backends must raise RuntimeError
+    b, tails, heads, c, l, u = random_instance(n_arcs)
+    b = b.copy()
+    b[0] += 1
+    failed = []
+    for backend in ('ortools', 'gurobi'):
+        try:
+            network.solve(b, tails, heads, c, l, u, backend = backend, env = env)
+            failed.append(f'{backend}: unbalanced supplies accepted')
+        except RuntimeError:
+            pass
+    return failed
+
+
+def main(sizes, seeds):
+    import gurobipy as gb
+
+    env = gb.Env(params = {'OutputFlag': 0})
+    n_failed = 0
+    print(f'{"instance":>22} {"objective":>14}  check')
+    for name, *data in instances(sizes, seeds):
+        failed, objval = check(data, env)
+        n_failed += bool(failed)
+        print(f'{name:>22} {objval:>14.1f}  {"ok" if not failed else "FAILED: " + "; ".join(failed)}')
+    failed = check_infeasible(sizes[0], env)
+    n_failed += bool(failed)
+    print(f'{"unbalanced supplies":>22} {"-":>14}  {"ok" if not failed else "FAILED: " + "; ".join(failed)}')
+    env.dispose()
+    print(f'{n_failed} instance(s) failed' if n_failed else 'Both backends agree on every instance')
+    return n_failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--arcs', type = int, nargs = '+', default = [200, 1_000, 1_900])
+    parser.add_argument('--seeds', type = int, default = 5, help = 'random instances of every size')
+    args = parser.parse_args()
+    sys.exit(1 if main(args.arcs, args.seeds) else 0)
+
+#%% End of file
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Mathematical Programming Utilities
+*************************************
+
+Shared helpers used by the model scripts of this repository. The submodules
+are imported on demand so that a script only pays for what it uses:
+
+    params      Columnar Excel-to-parameter loading (dicts, multidicts and
+                single-open / bulk workbook reading)
+    cache       Binary sidecar cache of the parameter workbooks
+    network     Network Flow Template builders (tupledict and CSR matrix form)
+                and solvers (Gurobi LP, OR-tools min cost flow)
+    tsp         Traveling Salesman model and subtour elimination procedures
+    heuristics  TSP construction (nearest neighbour, greedy edge) and
+                improvement (2-opt, Or-opt) heuristics
+    plotting    Incremental TSP tour plot (one figure, blitted LineCollection)
+    food        Food Manufacture I / II parameters and model builders
+    sweep       Parallel scenario sweeps of the Food Manufacture models
+    horizon     Rolling horizon solution of long Food Manufacture horizons
+    lp          Solver independent array form models (Gurobi, OR-tools, HiGHS)
+    models      The models of the repository declared once in array form
+    telemetry   Phase timers and solver statistics of the scripts (JSON lines)
+    results     Bulk solution extraction into arrays and DataFrames
+    pool        Pre-started Gurobi environments and model templates for repeated
+                solves
+    service     Local JSON-RPC solve service (queue, worker processes, cancel)
+    api         read / build / solve / report of every model, without side
+                effects; build, solve and report are also attributes of the
+                package, imported on first access
+    sensitivity Reduced costs, duals and ranging of LPs in bulk (DataFrames,
+                pyarrow Tables)
+    parametric  Piecewise-linear objective curves in a right-hand side, walked
+                along the ranging breakpoints with warm re-solves
+"""
+
+
+def __getattr__(name):
+    # Functions of the api module as attributes of the package (PEP 562), imported on first access
+    if name in ('read', 'build', 'solve', 'report'):
+        from mathprog import api
+
+        return getattr(api, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
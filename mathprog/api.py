@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Model API
+*************************************
+
+The models of the repository (models.PROBLEMS) as functions without side
+effects: importing this module reads no workbook, solves nothing and prints
+nothing, and it only imports NumPy. pandas and openpyxl are imported when a
+workbook is read or a report is made, and every solver when it is used:
+
+    read(problem)                       parameters of the workbook of the
+                                        repository (or of <path>)
+    build(problem, params)              Model: the problem declared in array
+                                        form (lp.LinearModel)
+    solve(model, backend)               Result: objective value and variable
+                                        values, with any of the lp.BACKENDS
+    report(result)                      DataFrames of the variable values, by
+                                        variable block
+
+    from mathprog import api
+
+    model = api.build('fp1')            # Parameters of the workbook when None
+    result = api.solve(model, 'glop')
+    tables = api.report(result)         # {'produce': DataFrame, 'sell': ..., ...}
+
+The same functions are attributes of the package (mathprog.build, ...),
+imported on first access. The scripts of the repository remain the annotated
+implementations of every problem.
+
+Usage:
+    python -m mathprog.api fp1 [--backend glop] [--all]
+"""
+
+#%% Importing libraries
+
+import os
+import time
+
+from mathprog import lp, models
+
+#%% Model and result
+
+class Model:
+    '''
+    Problem <problem> declared with the parameters <params>: <linear> is the
+    lp.LinearModel of models.PROBLEMS.
+    '''
+
+    def __init__(self, problem, params, linear):
+        self.problem = problem
+        self.params = params
+        self.linear = linear
+
+    def __repr__(self):
+        return f'Model({self.problem!r}, {self.linear.n_vars} variables, {self.linear.n_rows} constraints)'
+
+
+class Result:
+    '''
+    Solution of a Model: objective value, variable values (array in the order
+    of the declared model), backend, solve time and number of solves (more
+    than one for the TSP, re-solved with its subtour elimination constraints).
+    '''
+
+    def __init__(self, model, backend, objective, x, runtime, solves = 1):
+        self.model = model
+        self.backend = backend
+        self.objective = objective
+        self.x = x
+        self.runtime = runtime
+        self.solves = solves
+
+    def __repr__(self):
+        return f'Result({self.model.problem!r}, {self.backend!r}, objective = {self.objective:.6g})'
+
+#%% Functions
+
+def read(problem, path = None):
+    '''
+    Parameters of <problem> (see models.PROBLEMS) read from the workbook
+    <path>, by default the workbook of the repository.
+    '''
+    if path is None:
+        return models.load(problem)
+    return models.PROBLEMS[problem][1](os.path.abspath(path))
+
+
+def build(problem, params = None, **options):
+    '''
+    Model of <problem> with the parameters <params> (as returned by read(), by
+    default those of the workbook of the repository). <options> go to the
+    declaration function (e.g. linking = 'type' for 'fm2').
+    '''
+    if problem not in models.PROBLEMS:
+        raise ValueError(f'Unknown problem: {problem}')
+    if params is None:
+        params = read(problem)
+    return Model(problem, params, models.PROBLEMS[problem][2](params, **options))
+
+
+def solve(model, backend = 'gurobi', time_limit = None, env = None):
+    '''
+    Solves the Model with one of the lp.BACKENDS ('glop' for LPs only). <env>
+    is the Gurobi environment of the 'gurobi' backend. Raises RuntimeError if
+    the solver does not end with an optimal solution.
+    '''
+    begin = time.perf_counter()
+    if model.problem == 'tsp':
+        objective, x, solves = models.solve_tsp(model.params, backend, time_limit, env)
+    else:
+        (objective, x), solves = lp.solve(model.linear, backend, time_limit, env), 1
+    return Result(model, backend, objective, x, time.perf_counter() - begin, solves)
+
+
+def report(result, nonzero = True, tol = 1e-9):
+    '''
+    DataFrames of the variable values of the Result, one per variable block
+    of the declared model (dictionary by block name), with the elements of the
+    keys in the first columns and the values in the column 'value'. With
+    <nonzero> only the variables with a value beyond <tol> are kept.
+    '''
+    from mathprog import results
+
+    linear = result.model.linear
+    return {name: results.block_frame(linear, result.x, {'value': name}, nonzero = nonzero, tol = tol)
+            for name in linear.blocks}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('problem', choices = list(models.PROBLEMS))
+    parser.add_argument('--backend', default = 'gurobi', choices = lp.BACKENDS)
+    parser.add_argument('--all', action = 'store_true', help = 'report the variables at zero too')
+    args = parser.parse_args()
+    result = solve(build(args.problem), args.backend)
+    for name, df in report(result, nonzero = not args.all).items():
+        print(f'----------------------------------------\n{name}:\n----------------------------------------')
+        print(df.to_string(index = False))
+    print(f'****************************************\nObjective: {result.objective:.6g} ({result.runtime:.3f} s)')
+
+#%% End of file
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Parameter Workbook Cache
+*************************************
+
+Parsing 'Parameters.xlsx' with openpyxl is usually the slowest step of a
+re-solve. read_excel() parses a workbook once, stores every sheet in a binary
+columnar sidecar (Parquet when pyarrow is installed, pickle otherwise) and
+serves the following reads from it:
+
+    __paramcache__/
+        index.json                  workbook path -> [mtime, size, digest, format]
+        index.lock                  lock file of the index updates
+        <digest>/manifest.json      sheet names, file names and formats
+        <digest>/sheet_0.parquet
+        ...
+
+Entries are keyed by the SHA-256 digest of the workbook content and of the
+FORMAT of the cached frames (bumped when params.read_workbook changes what it
+returns, so older sidecars are not served). The mtime
+and size recorded in the index let an unchanged workbook skip the hashing;
+editing the workbook changes its digest, so a new entry is built and the
+stale one is dropped. The cache directory is kept under <max_bytes> by
+evicting the least recently used entries.
+
+Concurrent readers (threads of read_workbooks, processes of a sweep) are
+safe: entries are written to a unique temporary directory and renamed into
+place, and the index is updated under a lock (threading.Lock within the
+process, a lock on index.lock between processes).
+"""
+
+#%% Importing libraries
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from mathprog import params
+
+DEFAULT_DIR = '__paramcache__'
+DEFAULT_MAX_BYTES = 512*1024**2
+TMP_SUFFIX = '.tmp'
+FORMAT = 2    # 2: duplicate headers renamed and empty cells as NaN, as pd.read_excel
+
+_index_lock = threading.Lock()
+
+#%% Paths and keys
+
+def cache_dir_for(path):
+    '''
+    Default cache directory: a sidecar folder next to the workbook.
+    '''
+    return os.path.join(os.path.dirname(os.path.abspath(path)), DEFAULT_DIR)
+
+
+def _digest(path):
+    h = hashlib.sha256(f'format {FORMAT}'.encode())
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, 'index.json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir, index):
+    tmp = os.path.join(cache_dir, f'index.json.{uuid.uuid4().hex}{TMP_SUFFIX}')    # Unique per call
+    with open(tmp, 'w') as file:
+        json.dump(index, file)
+    os.replace(tmp, os.path.join(cache_dir, 'index.json'))
+
+
+@contextmanager
+def _locked_index(cache_dir):
+    # Exclusive access to the index: the threads of this process, then the other processes (lock file)
+    with _index_lock, open(os.path.join(cache_dir, 'index.lock'), 'a+b') as file:
+        if os.name == 'nt':
+            import msvcrt
+
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def workbook_key(path, cache_dir):
+    '''
+    Returns the content digest of the workbook, re-hashing it only when its
+    mtime or size differ from the ones recorded in the cache index.
+    '''
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    index = _load_index(cache_dir)
+    entry = index.get(path)
+    if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size and entry[3:] == [FORMAT]:
+        return entry[2]
+
+    digest = _digest(path)
+    with _locked_index(cache_dir):
+        index = _load_index(cache_dir)    # Read again under the lock, other writers may have updated it
+        entry = index.get(path)
+        if entry is not None and entry[2] != digest:
+            # The workbook changed: drop its old entry unless another workbook shares it
+            if all(e[2] != entry[2] for p, e in index.items() if p != path):
+                shutil.rmtree(os.path.join(cache_dir, entry[2]), ignore_errors = True)
+        index[path] = [stat.st_mtime_ns, stat.st_size, digest, FORMAT]
+        _save_index(cache_dir, index)
+    return digest
+
+#%% Sheet serialization
+
+def _write_sheet(df, base):
+    try:
+        df.to_parquet(base + '.parquet')
+        return 'parquet'
+    except Exception:
+        # pyarrow missing or a sheet Parquet cannot represent (mixed object columns, numeric headers)
+        if os.path.exists(base + '.parquet'):
+            os.remove(base + '.parquet')
+        with open(base + '.pkl', 'wb') as file:
+            pickle.dump(df, file, protocol = pickle.HIGHEST_PROTOCOL)
+        return 'pickle'
+
+
+def _read_sheet(base, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(base + '.parquet')
+    with open(base + '.pkl', 'rb') as file:
+        return pickle.load(file)
+
+
+def _store(entry_dir, sheets):
+    # Unique temporary directory per call: threads and processes storing the same workbook never share one
+    tmp_dir = tempfile.mkdtemp(prefix = os.path.basename(entry_dir) + '.', suffix = TMP_SUFFIX,
+                               dir = os.path.dirname(entry_dir))
+    manifest = []
+    for i, (name, df) in enumerate(sheets.items()):
+        fmt = _write_sheet(df, os.path.join(tmp_dir, f'sheet_{i}'))
+        manifest.append([name, f'sheet_{i}', fmt])
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file)
+    # Publishing the entry atomically, concurrent writers of the same workbook produce the same files
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors = True)
+
+
+def _load(entry_dir, sheet_names):
+    manifest_path = os.path.join(entry_dir, 'manifest.json')
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+    os.utime(manifest_path)    # Marks the entry as recently used
+    wanted = set(sheet_names) if sheet_names is not None else None
+    return {name: _read_sheet(os.path.join(entry_dir, base), fmt)
+            for name, base, fmt in manifest if wanted is None or name in wanted}
+
+#%% Size control
+
+def _entry_size(entry_dir):
+    return sum(e.stat().st_size for e in os.scandir(entry_dir) if e.is_file())
+
+
+def evict(cache_dir, max_bytes = DEFAULT_MAX_BYTES, keep = None):
+    '''
+    Removes least recently used entries until the cache fits in <max_bytes>.
+    The entry named <keep> (usually the one just written) is never removed.
+    '''
+    entries = []
+    for e in os.scandir(cache_dir):
+        manifest = os.path.join(e.path, 'manifest.json')
+        if e.is_dir() and not e.name.endswith(TMP_SUFFIX) and os.path.exists(manifest):    # Not entries being written
+            entries.append((os.stat(manifest).st_mtime, e.name, _entry_size(e.path)))
+    total = sum(size for _, _, size in entries)
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir, name), ignore_errors = True)
+        total -= size
+
+
+def clear(cache_dir):
+    '''
+    Deletes the whole cache directory.
+    '''
+    shutil.rmtree(cache_dir, ignore_errors = True)
+
+#%% Cached reading
+
+def read_excel(path, sheet_name = None, cache_dir = None, max_bytes = DEFAULT_MAX_BYTES):
+    '''
+    Drop-in replacement of pd.read_excel(path, index_col = None, header = 0,
+    sheet_name = sheet_name) backed by the binary cache: the same columns
+    (duplicate headers renamed 'A.1', ..., 'Unnamed: i' for empty ones),
+    values and NaN for the empty cells.
+
+    sheet_name: None for every sheet (dict of DataFrames), a list of sheet
+                names (dict of DataFrames) or a single sheet name (DataFrame).
+    '''
+    cache_dir = cache_dir or cache_dir_for(path)
+    os.makedirs(cache_dir, exist_ok = True)
+    digest = workbook_key(path, cache_dir)
+    entry_dir = os.path.join(cache_dir, digest)
+
+    single = isinstance(sheet_name, str)
+    names = [sheet_name] if single else sheet_name
+
+    if not os.path.exists(os.path.join(entry_dir, 'manifest.json')):
+        # Cold load: the whole workbook is parsed once so any later sheet request is warm
+        sheets = params.read_workbook(path)
+        _store(entry_dir, sheets)
+        evict(cache_dir, max_bytes, keep = digest)
+    else:
+        sheets = _load(entry_dir, names)
+
+    if names is not None:
+        missing = [name for name in names if name not in sheets]
+        if missing:
+            raise ValueError(f'Worksheet(s) {missing} not found in {path}')
+        sheets = {name: sheets[name] for name in names}
+    return sheets[sheet_name] if single else sheets
+
+#%% End of file
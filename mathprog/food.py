@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Food Manufacture Models
+*************************************
+
+Parameters and builders of the Food Manufacture I (fm1, LP) and Food
+Manufacture II (fm2, MIP) models of the '1. Food Manufacture I' and
+'2. Food Manufacture II' Gurobi implementations, so they can be built many
+times from parameter sets other than the workbook next to the scripts
+(scenario sweeps). When a scenario only changes the objective (buying costs,
+selling price), resolve() updates the coefficients of the built model in
+place and re-optimizes from the previous basis instead of rebuilding it.
+
+The parameters are a dictionary:
+
+    'oils_months'   tuplelist of the (oil, month) pairs of the Cost sheet
+    'costs'         cost of buying a ton of oil, by (oil, month) (negative)
+    'oils'          list of oils
+    'hardness'      hardness of every oil
+    'types'         oils of every type ('V' vegetable, 'N' non vegetable)
+    'months'        array of months, in planning order
+    'scalars'       PRICE, CAPACITY_V, CAPACITY_N, STORAGE, STORECOST, HL, HU,
+                    INITIAL and FINAL
+    'initial'       optional, inventory of every oil at the start of the first
+                    month, instead of INITIAL for all (rolling horizons)
+"""
+
+#%% Importing libraries
+
+import collections
+
+import gurobipy as gb
+
+from mathprog import cache, params
+
+#%% Parameters
+
+def read_parameters(path = 'Parameters.xlsx'):
+    '''
+    Parameters of the models from the Cost, Hardness and Scalars sheets of a
+    workbook (single open of the workbook, cached).
+    '''
+    data = cache.read_excel(path, ['Cost','Hardness','Scalars'])
+    df_cost, df_hardness, df_scalars = data['Cost'], data['Hardness'], data['Scalars']
+
+    oils_months, costs = params.multidict(df_cost, ['OIL','MONTH'], 'COST')
+    oils, hardness, types_ = params.multidict(df_hardness, 'OIL', ['HARDNESS','TYPE'])
+
+    types = collections.defaultdict(list)
+    for k, v in types_.items():
+        types[v].append(k)
+
+    return {'oils_months': oils_months, 'costs': costs, 'oils': oils, 'hardness': hardness,
+            'types': dict(types), 'months': df_cost.MONTH.unique(), 'scalars': params.scalars(df_scalars)}
+
+def synthetic_parameters(n_oils = 5, n_months = 6, seed = 0):
+    '''
+    Random instance with the structure of the workbook: about 40% vegetable
+    oils ('VEG k', at least 2) harder than the product bounds and the rest
+    non vegetable ('OIL k', at least 3) softer than them, buying costs
+    following a random walk around 115 per ton, and the scalars of the
+    workbook.
+    '''
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n_veg = max(2, round(0.4*n_oils))
+    oils = [f'VEG {k + 1}' for k in range(n_veg)] + [f'OIL {k + 1}' for k in range(max(3, n_oils - n_veg))]
+    months = np.array([f'Month {k + 1}' for k in range(n_months)], dtype = object)
+    hardness = dict(zip(oils, np.round(np.concatenate((rng.uniform(6, 9, n_veg), rng.uniform(2, 5.5, len(oils) - n_veg))), 1)))
+
+    walk = 115 + np.cumsum(rng.normal(0, 8, (len(oils), n_months)), axis = 1)
+    walk = np.clip(np.round(walk/5)*5, 60, 170)
+    oils_months = gb.tuplelist((o, m) for o in oils for m in months)
+    costs = dict(zip(oils_months, (-walk).ravel().tolist()))
+    types = {'V': oils[:n_veg], 'N': oils[n_veg:]}
+    scalars = {'PRICE': 150, 'CAPACITY_V': 200, 'CAPACITY_N': 250, 'STORAGE': 1000, 'STORECOST': -5,
+               'HL': 3, 'HU': 6, 'INITIAL': 500, 'FINAL': 500}
+    return {'oils_months': oils_months, 'costs': costs, 'oils': oils, 'hardness': hardness,
+            'types': types, 'months': months, 'scalars': scalars}
+
+#%% Model builders
+
+def _build_lp(name, data, env):
+    # Variables and constraints shared by both models
+    oils_months, costs, oils, hardness, types, months, scalars = (data[k] for k in
+        ('oils_months', 'costs', 'oils', 'hardness', 'types', 'months', 'scalars'))
+
+    model = gb.Model(name, env = env)
+
+    refine = model.addVars(oils_months, name = 'refine', obj = scalars['PRICE'])
+    buy = model.addVars(oils_months, name = 'buy', obj = costs)
+    inv = model.addVars(oils_months, name = 'inventory', obj = scalars['STORECOST'], ub = scalars['STORAGE'])
+
+    model.ModelSense = gb.GRB.MAXIMIZE
+    initial = data.get('initial') or dict.fromkeys(oils, scalars['INITIAL'])
+
+    # 1. The inventory at the end of a month depends of the tons of raw oils refined and bought in that month
+    for o in oils:
+        model.addConstr(inv[o,months[0]] == initial[o] - refine[o,months[0]] + buy[o,months[0]])
+        model.addConstr(scalars['FINAL'] == inv[o,months[-2]] - refine[o,months[-1]] + buy[o,months[-1]])
+        for j in range(1, len(months)-1):
+            m = months[j]
+            m1 = months[j-1]
+            model.addConstr(inv[o,m] == inv[o,m1] - refine[o,m] + buy[o,m])
+
+    # 2. There are maximum refining capacities for each type of raw oil each month
+    for key, t in types.items():
+        capacity = scalars['CAPACITY_V'] if key == 'V' else scalars['CAPACITY_N']
+        model.addConstrs((gb.quicksum([refine[o,m] for o in t]) <= capacity for m in months))
+
+    # 3. The maximum storage capacity is the upper bound of the <inv> variables
+
+    # 4. There are hardness bounds for the final product linearly dependent of the individual hardness of each raw oil used
+    model.addConstrs((gb.quicksum((hardness[o] - scalars['HL'])*refine[o,m] for o in oils) >= 0 for m in months))
+    model.addConstrs((gb.quicksum((hardness[o] - scalars['HU'])*refine[o,m] for o in oils) <= 0 for m in months))
+    return model, refine, buy, inv
+
+
+def build_fm1(data, env = None):
+    '''
+    Food Manufacture I (LP).
+
+    Returns the model and the <refine>, <buy> and <inv> tupledicts.
+    '''
+    return _build_lp('Food Manufacture I', data, env)
+
+
+LINKINGS = ('bigM', 'type', 'indicator')
+
+
+def build_fm2(data, env = None, linking = 'bigM'):
+    '''
+    Food Manufacture II: Food Manufacture I plus the logical conditions on the
+    oils used each month, modelled with the binary <delta> variables (MIP).
+
+    linking: formulation of constraints 5 (delta = 0 -> no refining) and 7
+             (delta = 1 -> at least 20 tons)
+        'bigM'      refine <= M*delta with the largest capacity of both types
+                    as M, as in the original script
+        'type'      refine <= M*delta with the capacity of the type of the
+                    oil as M, a tighter LP relaxation
+        'indicator' indicator constraints delta = 0 -> refine <= 0 and
+                    delta = 1 -> refine >= 20, no M at all
+
+    Returns the model and the <refine>, <buy>, <inv> and <delta> tupledicts.
+    '''
+    if linking not in LINKINGS:
+        raise ValueError(f'Unknown linking formulation: {linking}')
+    oils_months, types, months, scalars = data['oils_months'], data['types'], data['months'], data['scalars']
+    fm2, refine, buy, inv = _build_lp('Food Manufacture II', data, env)
+    delta = fm2.addVars(oils_months, name = 'delta', obj = 0, vtype = gb.GRB.BINARY)
+
+    # 5. Associating binary variables to refine variables
+    if linking == 'bigM':
+        M = dict.fromkeys(data['oils'], max(scalars['CAPACITY_N'],scalars['CAPACITY_V']))
+    else:
+        M = {o: scalars['CAPACITY_V'] if key == 'V' else scalars['CAPACITY_N'] for key, t in types.items() for o in t}
+    if linking == 'indicator':
+        fm2.addConstrs(((delta[o,m] == 0) >> (refine[o,m] <= 0) for o, m in oils_months))
+    else:
+        fm2.addConstrs((refine[o,m] <= delta[o,m]*M[o] for o, m in oils_months))
+
+    # 6. The food may be never made up of more than three oils in any month
+    fm2.addConstrs((delta.sum('*',m) <= 3 for m in months))
+
+    # 7. If an oil is used in any month, at least 20 tons must be used
+    if linking == 'indicator':
+        fm2.addConstrs(((delta[j] == 1) >> (refine[j] >= 20) for j in oils_months))
+    else:
+        fm2.addConstrs((refine[j] >= delta[j]*20 for j in oils_months))
+
+    # 8. If either VEG 1 or VEG 2 are used in a month then OIL 3 must also be used
+    fm2.addConstrs((delta['VEG 1',m] <= delta['OIL 3',m] for m in months))
+    fm2.addConstrs((delta['VEG 2',m] <= delta['OIL 3',m] for m in months))
+    return fm2, refine, buy, inv, delta
+
+#%% Re-solves
+
+def set_objective(model, refine = None, buy = None, price = None, costs = None):
+    '''
+    Updates the objective coefficients of a built model in place, one batched
+    setAttr call per group of variables:
+
+        price   selling price of a refined ton (obj of every <refine> variable)
+        costs   cost of buying a ton, a dictionary by (oil, month) or an array
+                in the order of the <buy> keys (obj of the <buy> variables)
+
+    The constraint matrix is untouched, so the next optimize() of an LP starts
+    from the previous simplex basis.
+    '''
+    if price is not None:
+        variables = list(refine.values())
+        model.setAttr('Obj', variables, [price]*len(variables))
+    if costs is not None:
+        if isinstance(costs, dict):
+            costs = [costs[k] for k in buy.keys()]
+        model.setAttr('Obj', list(buy.values()), list(costs))
+
+
+def resolve(model, refine = None, buy = None, price = None, costs = None):
+    '''
+    set_objective() and re-optimization of the model. Returns the objective
+    value (None when no solution was found).
+    '''
+    set_objective(model, refine, buy, price, costs)
+    model.optimize()
+    return model.ObjVal if model.SolCount else None
+
+#%% End of file
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ TSP Construction and Improvement Heuristics
+*************************************
+
+Fast approximate tours for the TSP over a symmetric distance matrix D (NumPy
+array, vertices by position). Tours are arrays with the vertex positions in
+visiting order, the edge back to the first vertex being implicit.
+
+    Construction    nearest_neighbour()     O(n²)
+                    greedy_edge()           O(n² log n)
+    Improvement     two_opt()               reverses a segment when it shortens the tour
+                    or_opt()                moves a segment of 1 to 3 vertices elsewhere
+
+The improvement moves evaluate every candidate position for a given segment
+at once with NumPy, O(n) per segment. heuristic_tour() chains a construction
+with both improvements until no move shortens the tour or the time budget is
+over, either to be used as the answer of a fast approximate mode or as the
+MIP start of the exact model (tsp.set_start).
+"""
+
+#%% Importing libraries
+
+import time
+
+import numpy as np
+
+EPS = 1e-9
+
+#%% Distances
+
+def square_matrix(n, ei, ej, d):
+    '''
+    Symmetric n×n distance matrix from the edge arrays of tsp.matrix_edges()
+    or tsp.coordinate_edges().
+    '''
+    D = np.zeros((n, n))
+    D[ei, ej] = d
+    D[ej, ei] = d
+    return D
+
+
+def tour_length(D, tour):
+    tour = np.asarray(tour)
+    return float(D[tour, np.roll(tour, -1)].sum())
+
+#%% Construction
+
+def nearest_neighbour(D, start = 0):
+    '''
+    Tour that always moves to the closest vertex not yet visited.
+    '''
+    n = len(D)
+    tour = np.empty(n, dtype = np.int64)
+    visited = np.zeros(n, dtype = bool)
+    tour[0] = start
+    visited[start] = True
+    for k in range(1, n):
+        row = np.where(visited, np.inf, D[tour[k - 1]])
+        tour[k] = np.argmin(row)
+        visited[tour[k]] = True
+    return tour
+
+
+def greedy_edge(D):
+    '''
+    Tour made of the shortest edges: the edges are scanned by increasing
+    distance and taken when both end points have degree below 2 and they do not
+    close a cycle (union-find), until a single path remains, then closed.
+    '''
+    n = len(D)
+    if n < 3:
+        return np.arange(n)
+    ei, ej = np.triu_indices(n, 1)
+    order = np.argsort(D[ei, ej], kind = 'stable')
+    degree = np.zeros(n, dtype = np.int64)
+    parent = np.arange(n)
+    adjacent = [[] for _ in range(n)]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    taken = 0
+    for e in order:
+        i, j = ei[e], ej[e]
+        if degree[i] == 2 or degree[j] == 2:
+            continue
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            continue
+        parent[ri] = rj
+        degree[i] += 1
+        degree[j] += 1
+        adjacent[i].append(j)
+        adjacent[j].append(i)
+        taken += 1
+        if taken == n - 1:
+            break
+
+    # Walking the Hamiltonian path from one of its end points
+    tour = np.empty(n, dtype = np.int64)
+    tour[0] = np.flatnonzero(degree < 2)[0]
+    previous = -1
+    for k in range(1, n):
+        current = tour[k - 1]
+        following = [v for v in adjacent[current] if v != previous]
+        previous, tour[k] = current, following[0]
+    return tour
+
+#%% Improvement
+
+def two_opt(D, tour, deadline = None):
+    '''
+    2-opt local search: the edges (a,b) and (c,d) are replaced by (a,c) and
+    (b,d), reversing the path b..c, whenever it shortens the tour. For every
+    position i all the positions j are evaluated at once and the best move is
+    applied. Returns the improved tour and whether any move was applied.
+    '''
+    tour = np.array(tour)
+    n = len(tour)
+    improved = False
+    for i in range(n - 2):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        j = np.arange(i + 2, n if i > 0 else n - 1)
+        if len(j) == 0:
+            continue
+        a, b = tour[i], tour[i + 1]
+        c, d = tour[j], tour[(j + 1) % n]
+        delta = D[a, c] + D[b, d] - D[a, b] - D[c, d]
+        best = np.argmin(delta)
+        if delta[best] < -EPS:
+            k = j[best]
+            tour[i + 1:k + 1] = tour[i + 1:k + 1][::-1].copy()
+            improved = True
+    return tour, improved
+
+
+def or_opt(D, tour, deadline = None, lengths = (1, 2, 3)):
+    '''
+    Or-opt local search: a segment of 1, 2 or 3 consecutive vertices is moved,
+    in either orientation, between two other consecutive vertices whenever it
+    shortens the tour. Returns the improved tour and whether any move was
+    applied.
+    '''
+    tour = np.array(tour)
+    n = len(tour)
+    improved = False
+    for L in lengths:
+        if n < L + 3:
+            continue
+        i = 0
+        while i < n:
+            if deadline is not None and time.perf_counter() > deadline:
+                return tour, improved
+            # Rotating the tour so the segment takes the first L positions
+            r = np.roll(tour, -i)
+            s0, sL, p, nx = r[0], r[L - 1], r[-1], r[L]
+            removal = D[p, s0] + D[sL, nx] - D[p, nx]
+            k = np.arange(L, n - 1)
+            c, d = r[k], r[k + 1]
+            forward = D[c, s0] + D[sL, d] - D[c, d]
+            backward = D[c, sL] + D[s0, d] - D[c, d]
+            insertion = np.minimum(forward, backward)
+            best = np.argmin(insertion)
+            if insertion[best] - removal < -EPS:
+                k = k[best]
+                segment = r[:L] if forward[best] <= backward[best] else r[:L][::-1]
+                tour = np.concatenate((r[L:k + 1], segment, r[k + 1:]))
+                improved = True
+            i += 1
+    return tour, improved
+
+#%% Heuristic
+
+def heuristic_tour(D, construction = 'nearest', time_limit = None, start = 0):
+    '''
+    Builds a tour with nearest_neighbour() ('nearest') or greedy_edge()
+    ('greedy') and improves it with two_opt() and or_opt() until neither
+    shortens it or <time_limit> seconds have passed.
+
+    Returns the tour (vertex positions) and its length.
+    '''
+    begin = time.perf_counter()
+    deadline = begin + time_limit if time_limit is not None else None
+    D = np.asarray(D, dtype = float)
+    if construction == 'nearest':
+        tour = nearest_neighbour(D, start)
+    elif construction == 'greedy':
+        tour = greedy_edge(D)
+    else:
+        raise ValueError(f'Unknown construction heuristic: {construction}')
+
+    improved = True
+    while improved and (deadline is None or time.perf_counter() < deadline):
+        tour, improved_2opt = two_opt(D, tour, deadline)
+        tour, improved_oropt = or_opt(D, tour, deadline)
+        improved = improved_2opt or improved_oropt
+    return tour, tour_length(D, tour)
+
+#%% End of file
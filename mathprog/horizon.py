@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Rolling Horizon for Food Manufacture
+*************************************
+
+Long planning horizons (36-60 months) make the Food Manufacture II MIP
+intractable as a single model. solve_rolling() solves it as a sequence of
+overlapping windows instead:
+
+    months      1  2  3  4  5  6  7  8  9 ...
+    window 1    [--fixed--][-------]
+    window 2             [--fixed--][-------]
+    window 3                      [--fixed--][-------]
+
+Each window of <window> months starts from the inventories left by the
+months fixed so far and ends with the FINAL inventory of every oil, like the
+whole horizon does. Only the first <step> months of its solution are fixed,
+the rest is planned again by the next window; the last window fixes all its
+months.
+
+The plan is evaluated with the objective of the whole horizon, so it can be
+compared with the monolithic model (food.build_fm1 / food.build_fm2 over all
+the months), e.g. on food.synthetic_parameters instances.
+"""
+
+#%% Importing libraries
+
+import time
+
+import gurobipy as gb
+
+from mathprog import food
+
+MODELS = {'fm1': food.build_fm1, 'fm2': food.build_fm2}
+
+#%% Windows
+
+def windows(n_months, window, step):
+    '''
+    (first, last + 1, fixed) month positions of every window. A window never
+    leaves a single month for the next one (the inventory constraints need at
+    least two), it takes it instead.
+    '''
+    if not 0 < step < window:
+        raise ValueError('The step must be positive and shorter than the window')
+    if window < 2:
+        raise ValueError('Windows need at least two months')
+    result, first = [], 0
+    while True:
+        last = first + window
+        if last >= n_months - 1:
+            result.append((first, n_months, n_months - first))
+            return result
+        result.append((first, last, step))
+        first += step
+
+
+def window_parameters(data, first, last, initial):
+    '''
+    Parameters of the months [first, last) with the given initial inventory of
+    every oil.
+    '''
+    months = data['months'][first:last]
+    kept = set(months)
+    oils_months = gb.tuplelist(k for k in data['oils_months'] if k[1] in kept)
+    return dict(data, months = months, oils_months = oils_months,
+                costs = {k: data['costs'][k] for k in oils_months}, initial = initial)
+
+#%% Solver
+
+def objective(data, refine, buy, inv):
+    '''
+    Objective of a plan (dictionaries by (oil, month)) over the whole horizon.
+    '''
+    scalars = data['scalars']
+    return sum(scalars['PRICE']*refine[k] + data['costs'][k]*buy[k] + scalars['STORECOST']*inv[k]
+               for k in data['oils_months'])
+
+
+def solve_rolling(model, data, window = 6, step = 3, env = None, time_limit = None, **options):
+    '''
+    Rolling horizon solution of <model> ('fm1' or 'fm2'). <time_limit> is the
+    limit of every window, <options> are passed to the model builder (e.g.
+    linking = 'type').
+
+    Returns the plan, a dictionary of dictionaries by (oil, month): 'refine',
+    'buy', 'inv' (and 'delta' for fm2), and the statistics: 'windows',
+    'objective' (whole horizon), 'runtime' (solver) and 'wall'.
+    '''
+    if model not in MODELS:
+        raise ValueError(f'Unknown model: {model}')
+    begin = time.perf_counter()
+    months, oils = data['months'], data['oils']
+    names = ('refine', 'buy', 'inv', 'delta')
+    plan = {name: {} for name in names[:4 if model == 'fm2' else 3]}
+    initial = data.get('initial') or dict.fromkeys(oils, data['scalars']['INITIAL'])
+    stats = {'windows': 0, 'runtime': 0.0}
+
+    for first, last, fixed in windows(len(months), window, step):
+        sub = window_parameters(data, first, last, initial)
+        m, *variables = MODELS[model](sub, env = env, **options)
+        try:
+            m.Params.OutputFlag = 0
+            if time_limit is not None:
+                m.Params.TimeLimit = time_limit
+            m.optimize()
+            if m.SolCount == 0:
+                raise RuntimeError(f'Window of months {first + 1}-{last} ended with status {m.Status} and no solution')
+            stats['runtime'] += m.Runtime
+            stats['windows'] += 1
+
+            # Fixing the first months of the window
+            kept = set(months[first:first + fixed])
+            for name, var in zip(plan, variables):
+                values = m.getAttr('X', var)
+                plan[name].update((k, v) for k, v in values.items() if k[1] in kept)
+        finally:
+            m.dispose()
+        initial = {o: plan['inv'][o, months[first + fixed - 1]] for o in oils}
+
+    stats['objective'] = objective(data, plan['refine'], plan['buy'], plan['inv'])
+    stats['wall'] = time.perf_counter() - begin
+    return plan, stats
+
+#%% End of file
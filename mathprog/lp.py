@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Array Form Linear Models
+*************************************
+
+Solver independent layer: a model is declared once in array form
+
+    min/max  c'x
+    s.t.     row_lb <= A x <= row_ub
+             lb <= x <= ub,  x_j integer for the integer columns
+
+with LinearModel, which collects the variables and the constraint
+coefficients (row, column, value triplets) in named blocks. The backends
+hand the arrays to a solver in bulk, without one call per coefficient:
+
+    'gurobi'                addMVar + addMConstr with the CSR matrix
+    'glop', 'cbc', 'scip'   OR-tools: ModelBuilder filled from the sparse data,
+                            exported to an MPModelProto and solved with
+                            pywraplp.Solver.SolveWithProto
+    'highs'                 highspy: HighsLp with the column-wise matrix,
+                            passed with passModel
+
+OR-tools and highspy bundle different builds of the HiGHS library, so they
+cannot be imported in the same process; run the 'highs' backend in a process
+that does not use OR-tools.
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+BACKENDS = ('gurobi', 'glop', 'cbc', 'scip', 'highs')
+SENSES = ('<', '>', '=')
+
+#%% Model
+
+class LinearModel:
+    '''
+    Linear or mixed integer model in array form. Variables and constraints
+    are added in named blocks; every block keeps its positions and the keys of
+    its elements so solutions can be read back by key (values()).
+    '''
+
+    def __init__(self, name = '', sense = 'min'):
+        if sense not in ('min', 'max'):
+            raise ValueError(f'Unknown objective sense: {sense}')
+        self.name = name
+        self.sense = sense
+        self.n_vars = 0
+        self.n_rows = 0
+        self.blocks = {}
+        self.row_blocks = {}
+        self._vars = []         # (lb, ub, obj, integer) arrays of every variable block
+        self._coefs = []        # (rows, cols, vals) arrays of every constraint block
+        self._bounds = []       # (row_lb, row_ub) arrays of every constraint block
+        self._arrays = None
+
+    def add_vars(self, name, index, lb = 0.0, ub = np.inf, obj = 0.0, integer = False):
+        '''
+        Block of variables, one per key of <index> (or <index> variables if it
+        is a number). <lb>, <ub> and <obj> are scalars or arrays in the order
+        of <index>. Returns the array of the positions of the variables.
+        '''
+        index = list(range(index)) if isinstance(index, (int, np.integer)) else list(index)
+        n = len(index)
+        positions = np.arange(self.n_vars, self.n_vars + n)
+        full = lambda value: np.broadcast_to(np.asarray(value, dtype = float), (n,)).copy()
+        self._vars.append((full(lb), full(ub), full(obj), np.full(n, bool(integer))))
+        self.blocks[name] = (positions, index)
+        self.n_vars += n
+        self._arrays = None
+        return positions
+
+    def add_constraints(self, name, rows, cols, vals, sense, rhs, index = None):
+        '''
+        Block of constraints given as coefficient triplets: <rows> are the row
+        numbers within the block (0, 1, ...), <cols> the variable positions and
+        <vals> the coefficients. Triplets of the same row and column are added
+        up. <sense> ('<', '>', '=') and <rhs> are scalars or arrays by row.
+
+        The number of rows is the length of <index>, or of <rhs> if it is an
+        array, or the largest row number plus one. Returns the array of the
+        positions of the rows.
+        '''
+        rows = np.asarray(rows, dtype = np.int64)
+        if index is not None:
+            n = len(index)
+        elif np.ndim(rhs) > 0:
+            n = len(rhs)
+        else:
+            n = int(rows.max()) + 1 if len(rows) else 0
+        index = list(index) if index is not None else list(range(n))
+
+        rhs = np.broadcast_to(np.asarray(rhs, dtype = float), (n,))
+        sense = np.broadcast_to(np.asarray(sense), (n,))
+        if not np.isin(sense, SENSES).all():
+            raise ValueError(f'Unknown constraint senses: {set(sense.tolist()) - set(SENSES)}')
+        lower = np.where(sense == '<', -np.inf, rhs)
+        upper = np.where(sense == '>', np.inf, rhs)
+
+        positions = np.arange(self.n_rows, self.n_rows + n)
+        self._coefs.append((rows + self.n_rows, np.asarray(cols, dtype = np.int64), np.asarray(vals, dtype = float)))
+        self._bounds.append((lower, upper))
+        self.row_blocks[name] = (positions, index)
+        self.n_rows += n
+        self._arrays = None
+        return positions
+
+    def arrays(self):
+        '''
+        The model as arrays: c, lb, ub, integer, A (CSR), row_lb, row_ub.
+        '''
+        if self._arrays is None:
+            import scipy.sparse as sp
+
+            stack = lambda k, items: np.concatenate([item[k] for item in items]) if items else np.empty(0)
+            c, lb, ub = (stack(k, self._vars) for k in (2, 0, 1))
+            integer = stack(3, self._vars).astype(bool)
+            rows, cols, vals = (stack(k, self._coefs) for k in range(3))
+            A = sp.csr_matrix((vals, (rows.astype(np.int64), cols.astype(np.int64))), shape = (self.n_rows, self.n_vars))
+            A.sum_duplicates()
+            A.eliminate_zeros()
+            row_lb, row_ub = stack(0, self._bounds), stack(1, self._bounds)
+            self._arrays = (c, lb, ub, integer, A, row_lb, row_ub)
+        return self._arrays
+
+    def values(self, x, name):
+        '''
+        Values of the variables of block <name> in the solution <x>, as a
+        dictionary by key.
+        '''
+        positions, index = self.blocks[name]
+        return dict(zip(index, np.asarray(x)[positions].tolist()))
+
+    def keyed(self, name, items):
+        '''
+        Elements of <items>, a sequence by variable (or constraint) position
+        such as the variables of a loaded solver, that belong to the variable
+        (or constraint) block <name>, as a dictionary by key.
+        '''
+        positions, index = self.blocks[name] if name in self.blocks else self.row_blocks[name]
+        return {k: items[j] for k, j in zip(index, positions.tolist())}
+
+    @property
+    def is_mip(self):
+        return any(block[3].any() for block in self._vars)
+
+#%% Backends
+
+def to_gurobi(model, env = None):
+    '''
+    Gurobi model with the variables as one MVar and one addMConstr call per
+    row type (=, <=, >=; ranged rows are split into <= and >= rows).
+    Returns the model and the MVar.
+    '''
+    import gurobipy as gb
+
+    c, lb, ub, integer, A, row_lb, row_ub = model.arrays()
+    m = gb.Model(model.name, env = env)
+    vtype = np.where(integer, gb.GRB.INTEGER, gb.GRB.CONTINUOUS)
+    x = m.addMVar(model.n_vars, lb = lb, ub = ub, obj = c, vtype = vtype)
+    m.ModelSense = gb.GRB.MAXIMIZE if model.sense == 'max' else gb.GRB.MINIMIZE
+
+    for rows, sense, rhs in row_types(row_lb, row_ub):
+        if rows.any():
+            m.addMConstr(A[rows], x, sense, rhs[rows])
+    return m, x
+
+
+def row_types(row_lb, row_ub):
+    '''
+    Rows of the sides <row_lb>, <row_ub> by type, in the order to_gurobi()
+    adds them: (mask of the rows, sense, right-hand sides) for the '=', '<'
+    and '>' rows. A ranged row is in both the '<' and the '>' masks.
+    '''
+    equal = row_lb == row_ub
+    return ((equal, '=', row_lb),
+            (~equal & np.isfinite(row_ub), '<', row_ub),
+            (~equal & np.isfinite(row_lb), '>', row_lb))
+
+
+def gurobi_rhs(model):
+    '''
+    Right-hand sides of the constraints of to_gurobi(<model>), in the order
+    of model.getConstrs(), so they can be set in one setAttr('RHS') call.
+    '''
+    row_lb, row_ub = model.arrays()[5:]
+    return np.concatenate([rhs[rows] for rows, sense, rhs in row_types(row_lb, row_ub)])
+
+
+def gurobi_rows(model):
+    '''
+    Position in getConstrs() of the Gurobi model of to_gurobi(<model>) of
+    every row of <model>, which to_gurobi groups by sense (the <= row of a
+    ranged row).
+    '''
+    row_lb, row_ub = model.arrays()[5:]
+    order = np.concatenate([np.flatnonzero(rows) for rows, sense, rhs in row_types(row_lb, row_ub)])
+    position = np.empty(model.n_rows, dtype = np.int64)
+    position[order[::-1]] = np.arange(len(order))[::-1]    # First Gurobi row of every row
+    return position
+
+
+def gurobi_blocks(model, m):
+    '''
+    Variables and constraints of <m>, the Gurobi model of to_gurobi(<model>),
+    by block: two dictionaries by block name of gb.tupledict by key, so a
+    model declared in array form is reported through the Gurobi API as one
+    built with addVars / addConstrs (results and sensitivity modules), the
+    constraints in the positions of gurobi_rows().
+    '''
+    import gurobipy as gb
+
+    m.update()
+    variables, constrs = m.getVars(), m.getConstrs()
+    position = gurobi_rows(model)
+    keyed = lambda blocks, items, at: {name: gb.tupledict(zip(index, (items[k] for k in at(positions).tolist())))
+                                       for name, (positions, index) in blocks.items()}
+    return (keyed(model.blocks, variables, lambda positions: positions),
+            keyed(model.row_blocks, constrs, lambda positions: position[positions]))
+
+
+def to_ortools(model):
+    '''
+    MPModelProto of the model, filled from the sparse data in a single
+    ModelBuilder call (plus one call per integer variable).
+    '''
+    from ortools.linear_solver.python import model_builder as mb
+
+    c, lb, ub, integer, A, row_lb, row_ub = model.arrays()
+    builder = mb.Model()
+    builder.helper.fill_model_from_sparse_data(lb, ub, c, row_lb, row_ub, A)
+    for j in np.flatnonzero(integer).tolist():
+        builder.helper.set_var_integrality(j, True)
+    builder.helper.set_maximize(model.sense == 'max')
+    builder.name = model.name
+    return builder.export_to_proto()
+
+
+def to_pywraplp(model, backend = 'glop'):
+    '''
+    pywraplp.Solver of the OR-tools <backend> ('glop', 'cbc' or 'scip') loaded
+    with LoadModelFromProto from the MPModelProto of the model, for the scripts
+    that report through the solver API (solution values, reduced costs, dual
+    values). The solver variables and constraints are in the order of the
+    model, see LinearModel.keyed().
+    '''
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver(backend.upper())
+    if solver is None:
+        raise ValueError(f'Unknown OR-tools backend: {backend}')
+    error = solver.LoadModelFromProto(to_ortools(model))
+    if error:
+        raise ValueError(f'{model.name} could not be loaded: {error}')
+    return solver
+
+
+def to_highs(model):
+    '''
+    highspy.Highs instance with the model passed as a column-wise HighsLp.
+    '''
+    import highspy
+
+    c, lb, ub, integer, A, row_lb, row_ub = model.arrays()
+    A = A.tocsc()
+    lp = highspy.HighsLp()
+    lp.num_col_ = model.n_vars
+    lp.num_row_ = model.n_rows
+    lp.col_cost_ = c
+    lp.col_lower_ = lb
+    lp.col_upper_ = ub
+    lp.row_lower_ = row_lb
+    lp.row_upper_ = row_ub
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_ = A.indptr
+    lp.a_matrix_.index_ = A.indices
+    lp.a_matrix_.value_ = A.data
+    if integer.any():
+        lp.integrality_ = [highspy.HighsVarType.kInteger if i else highspy.HighsVarType.kContinuous for i in integer]
+    lp.sense_ = highspy.ObjSense.kMaximize if model.sense == 'max' else highspy.ObjSense.kMinimize
+
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', False)
+    h.passModel(lp)
+    return h
+
+#%% Solve
+
+def _solve_gurobi(model, time_limit, env):
+    import gurobipy as gb
+
+    m, x = to_gurobi(model, env)
+    try:
+        m.Params.OutputFlag = 0
+        if time_limit is not None:
+            m.Params.TimeLimit = time_limit
+        m.optimize()
+        if m.Status != gb.GRB.OPTIMAL:
+            raise RuntimeError(f'{model.name} ended with Gurobi status {m.Status}')
+        return m.ObjVal, x.X
+    finally:
+        m.dispose()
+
+
+def _solve_ortools(model, backend, time_limit):
+    from ortools.linear_solver import linear_solver_pb2, pywraplp
+
+    types = {'glop': linear_solver_pb2.MPModelRequest.GLOP_LINEAR_PROGRAMMING,
+             'cbc': linear_solver_pb2.MPModelRequest.CBC_MIXED_INTEGER_PROGRAMMING,
+             'scip': linear_solver_pb2.MPModelRequest.SCIP_MIXED_INTEGER_PROGRAMMING}
+    if backend == 'glop' and model.is_mip:
+        raise ValueError(f'{model.name} has integer variables, GLOP only solves LPs')
+    request = linear_solver_pb2.MPModelRequest(model = to_ortools(model), solver_type = types[backend])
+    if time_limit is not None:
+        request.solver_time_limit_seconds = time_limit
+    response = linear_solver_pb2.MPSolutionResponse()
+    pywraplp.Solver.SolveWithProto(request, response)
+    if response.status != linear_solver_pb2.MPSOLVER_OPTIMAL:
+        raise RuntimeError(f'{model.name} ended with {backend} status {response.status}')
+    return response.objective_value, np.array(response.variable_value)
+
+
+def _solve_highs(model, time_limit):
+    import highspy
+
+    h = to_highs(model)
+    if time_limit is not None:
+        h.setOptionValue('time_limit', float(time_limit))
+    h.run()
+    if h.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        raise RuntimeError(f'{model.name} ended with HiGHS status {h.modelStatusToString(h.getModelStatus())}')
+    return h.getInfo().objective_function_value, np.array(h.getSolution().col_value)
+
+
+def solve(model, backend = 'gurobi', time_limit = None, env = None):
+    '''
+    Solves the model with one of the BACKENDS ('glop' for LPs only). <env> is
+    the Gurobi environment of the 'gurobi' backend.
+
+    Returns the objective value and the array of variable values.
+    '''
+    if backend == 'gurobi':
+        return _solve_gurobi(model, time_limit, env)
+    if backend in ('glop', 'cbc', 'scip'):
+        return _solve_ortools(model, backend, time_limit)
+    if backend == 'highs':
+        return _solve_highs(model, time_limit)
+    raise ValueError(f'Unknown backend: {backend}')
+
+#%% End of file
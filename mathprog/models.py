@@ -0,0 +1,515 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Solver Independent Model Declarations
+*************************************
+
+The models of the repository declared once in array form (lp.LinearModel),
+so each of them can be solved with any of the lp.BACKENDS:
+
+    fm1, fm2    Food Manufacture I / II (parameters of food.read_parameters or
+                read_food)
+    fp1, fp2    Factory Planning I / II
+    manpower    Manpower Planning
+    refinery    Refinery Optimisation
+    nft         Network Flow Template
+    tsp         Traveling Salesman Problem, degree constraints only; the subtour
+                elimination constraints are added by solve_tsp()
+
+Every problem has a reader of its workbook and a declaration function taking
+the parameters; PROBLEMS maps the problem names to the workbook of the
+repository, the reader and the declaration. The constraints are numbered as
+in the Gurobi implementation of each problem, whose formulation they follow
+(only the linking of fm2 differs: 'indicator' constraints are Gurobi
+specific, so fm2 takes the 'bigM' or 'type' linking of food.build_fm2).
+benchmarks/check_formulations.py checks that the Gurobi implementations and
+the declarations are the same models.
+"""
+
+#%% Importing libraries
+
+import os
+
+import numpy as np
+
+from mathprog import lp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#%% Helpers
+
+def _triplets(rows):
+    # Coefficient triplets of a block given as one list of (column, value) pairs per row
+    counts = [len(row) for row in rows]
+    pairs = [pair for row in rows for pair in row]
+    cols, vals = zip(*pairs) if pairs else ((), ())
+    return np.repeat(np.arange(len(rows)), counts), np.array(cols, dtype = np.int64), np.array(vals, dtype = float)
+
+
+def _pivot(df, index, columns, values, rows, cols):
+    # Sheet column as a dense rows × cols array
+    return df.pivot(index = index, columns = columns, values = values).loc[list(rows), list(cols)].to_numpy(dtype = float)
+
+#%% Food Manufacture
+
+def read_food(path):
+    '''
+    Parameters of the Food Manufacture workbooks, as food.read_parameters()
+    but with plain lists and dictionaries, so they are read without Gurobi.
+    '''
+    from mathprog import cache, params
+
+    data = cache.read_excel(path, ['Cost','Hardness','Scalars'])
+    df_cost, df_hardness = data['Cost'], data['Hardness']
+
+    types = {}
+    for o, t in zip(df_hardness['OIL'].tolist(), df_hardness['TYPE'].tolist()):
+        types.setdefault(t, []).append(o)
+
+    return {'oils_months': params.keys(df_cost, ['OIL','MONTH']),
+            'costs': params.to_dict(df_cost, ['OIL','MONTH'], 'COST'),
+            'oils': df_hardness['OIL'].tolist(),
+            'hardness': params.to_dict(df_hardness, 'OIL', 'HARDNESS'),
+            'types': types, 'months': df_cost.MONTH.unique(), 'scalars': params.scalars(data['Scalars'])}
+
+
+def _food(name, data):
+    # Variables and constraints 1-4 shared by both Food Manufacture models
+    oils, months, types, scalars = data['oils'], list(data['months']), data['types'], data['scalars']
+    keys = [(o, t) for o in oils for t in months]
+    nO, nT = len(oils), len(months)
+
+    model = lp.LinearModel(name, 'max')
+    R = model.add_vars('refine', keys, obj = scalars['PRICE']).reshape(nO, nT)
+    B = model.add_vars('buy', keys, obj = [data['costs'][k] for k in keys]).reshape(nO, nT)
+    I = model.add_vars('inventory', keys, obj = scalars['STORECOST'], ub = scalars['STORAGE']).reshape(nO, nT)
+
+    # 1. Inventory balance: inv(t) - inv(t-1) + refine(t) - buy(t) = 0, with the initial inventory before the first
+    #    month and the final inventory (a constant) in place of the inventory of the last one
+    row = np.arange(nO*nT).reshape(nO, nT)
+    initial = data.get('initial') or dict.fromkeys(oils, scalars['INITIAL'])
+    rhs = np.zeros((nO, nT))
+    rhs[:, 0] += [initial[o] for o in oils]
+    rhs[:, -1] -= scalars['FINAL']
+    model.add_constraints('balance',
+                          np.concatenate((row.ravel(), row.ravel(), row[:, :-1].ravel(), row[:, 1:].ravel())),
+                          np.concatenate((R.ravel(), B.ravel(), I[:, :-1].ravel(), I[:, :-1].ravel())),
+                          np.concatenate((np.ones(nO*nT), -np.ones(nO*nT), np.ones(nO*(nT - 1)), -np.ones(nO*(nT - 1)))),
+                          '=', rhs.ravel(), index = keys)
+
+    # 2. Refining capacity of every type of oil each month
+    position = {o: k for k, o in enumerate(oils)}
+    for key, t in types.items():
+        capacity = scalars['CAPACITY_V'] if key == 'V' else scalars['CAPACITY_N']
+        cols = R[[position[o] for o in t]]
+        model.add_constraints(f'capacity_{key}', np.tile(np.arange(nT), len(t)), cols.ravel(), np.ones(cols.size),
+                              '<', np.full(nT, capacity), index = months)
+
+    # 3. The storage capacity is the upper bound of the inventory variables
+
+    # 4. Hardness bounds of the final product
+    hardness = np.array([data['hardness'][o] for o in oils])
+    for bound, sense in (('HL', '>'), ('HU', '<')):
+        model.add_constraints(f'hardness_{bound}', np.tile(np.arange(nT), nO), R.ravel(),
+                              np.repeat(hardness - scalars[bound], nT), sense, np.zeros(nT), index = months)
+    return model, R
+
+
+def fm1(data):
+    '''
+    Food Manufacture I (LP).
+    '''
+    return _food('Food Manufacture I', data)[0]
+
+
+def fm2(data, linking = 'bigM'):
+    '''
+    Food Manufacture II (MIP): Food Manufacture I plus the binary <delta>
+    variables with the 'bigM' or 'type' linking of food.build_fm2 ('bigM' by
+    default, as food.build_fm2).
+    '''
+    if linking not in ('bigM', 'type'):
+        raise ValueError(f'Unknown linking formulation: {linking}')
+    oils, months, types, scalars = data['oils'], list(data['months']), data['types'], data['scalars']
+    model, R = _food('Food Manufacture II', data)
+    nO, nT = R.shape
+    keys = [(o, t) for o in oils for t in months]
+    D = model.add_vars('delta', keys, ub = 1, integer = True).reshape(nO, nT)
+    cells = np.arange(nO*nT)
+
+    # 5. refine <= M*delta
+    if linking == 'bigM':
+        M = np.full(nO, max(scalars['CAPACITY_N'], scalars['CAPACITY_V']))
+    else:
+        capacity = {o: scalars['CAPACITY_V'] if key == 'V' else scalars['CAPACITY_N'] for key, t in types.items() for o in t}
+        M = np.array([capacity[o] for o in oils], dtype = float)
+    model.add_constraints('linking', np.tile(cells, 2), np.concatenate((R.ravel(), D.ravel())),
+                          np.concatenate((np.ones(nO*nT), -np.repeat(M, nT))), '<', np.zeros(nO*nT), index = keys)
+
+    # 6. At most three oils each month
+    model.add_constraints('oils', np.tile(np.arange(nT), nO), D.ravel(), np.ones(nO*nT), '<', np.full(nT, 3.0),
+                          index = months)
+
+    # 7. refine >= 20*delta
+    model.add_constraints('minimum', np.tile(cells, 2), np.concatenate((R.ravel(), D.ravel())),
+                          np.concatenate((np.ones(nO*nT), np.full(nO*nT, -20.0))), '>', np.zeros(nO*nT), index = keys)
+
+    # 8. VEG 1 or VEG 2 used -> OIL 3 used
+    position = {o: k for k, o in enumerate(oils)}
+    for veg in ('VEG 1', 'VEG 2'):
+        model.add_constraints(f'oil3_{veg}', np.tile(np.arange(nT), 2),
+                              np.concatenate((D[position[veg]], D[position['OIL 3']])),
+                              np.concatenate((np.ones(nT), -np.ones(nT))), '<', np.zeros(nT), index = months)
+    return model
+
+#%% Factory Planning
+
+def read_factory(path):
+    '''
+    Parameters of the Factory Planning workbooks as arrays: 'products',
+    'machines', 'months', 'profit' (by product), 'hours' (product × machine),
+    'number' (machine × month for Factory Planning I, by machine for II),
+    'demand' (product × month) and 'scalars'.
+    '''
+    from mathprog import cache, params
+
+    data = cache.read_excel(path)
+    products = data['profit']['PRODUCT'].tolist()
+    machines = data['machinery']['MACHINE'].unique().tolist()
+    months = data['demand']['MONTH'].unique().tolist()
+    machinery = data['machinery']
+    if 'MONTH' in machinery.columns:
+        number = _pivot(machinery, 'MACHINE', 'MONTH', 'NUMBER', machines, months)
+    else:
+        number = machinery.set_index('MACHINE').loc[machines, 'NUMBER'].to_numpy(dtype = float)
+    return {'products': products, 'machines': machines, 'months': months,
+            'profit': data['profit']['PROFIT'].to_numpy(dtype = float),
+            'hours': _pivot(data['production'], 'PRODUCT', 'MACHINE', 'PRODUCTION', products, machines),
+            'number': number,
+            'demand': _pivot(data['demand'], 'PRODUCT', 'MONTH', 'DEMAND', products, months),
+            'scalars': params.scalars(data['scalars'])}
+
+
+def _factory(name, data):
+    # Variables and constraints 1-5 shared by both Factory Planning models, capacity left to the caller
+    products, months, scalars = data['products'], data['months'], data['scalars']
+    nP, nT = len(products), len(months)
+    keys = [(p, t) for p in products for t in months]
+
+    model = lp.LinearModel(name, 'max')
+    X = model.add_vars('produce', keys).reshape(nP, nT)
+    Y = model.add_vars('sell', keys, obj = np.repeat(data['profit'], nT), ub = data['demand'].ravel()).reshape(nP, nT)
+    Q = model.add_vars('store', keys, obj = -scalars['StorageCost'], ub = scalars['StorageCapacity']).reshape(nP, nT)
+
+    # 3. Inventory balance: q(t) - q(t-1) - x(t) + y(t) = 0
+    row = np.arange(nP*nT).reshape(nP, nT)
+    model.add_constraints('inventory', np.concatenate((row.ravel(), row.ravel(), row.ravel(), row[:, 1:].ravel())),
+                          np.concatenate((Q.ravel(), X.ravel(), Y.ravel(), Q[:, :-1].ravel())),
+                          np.concatenate((np.ones(nP*nT), -np.ones(nP*nT), np.ones(nP*nT), -np.ones(nP*(nT - 1)))),
+                          '=', np.zeros(nP*nT), index = keys)
+
+    # 5. Desired final storage
+    model.add_constraints('final', np.arange(nP), Q[:, -1], np.ones(nP), '=', np.full(nP, scalars['FinalStorage']),
+                          index = products)
+    return model, X
+
+
+def fp1(data):
+    '''
+    Factory Planning I (LP).
+    '''
+    machines, months, scalars = data['machines'], data['months'], data['scalars']
+    model, X = _factory('Factory Planning I', data)
+    nP, nT = X.shape
+    nM = len(machines)
+
+    # 1. Production hours of every machine each month: ∑p a[p,m]*x[p,t] <= hours*n[m,t]
+    row = np.arange(nM*nT).reshape(nM, nT)
+    model.add_constraints('prod_capacity', np.broadcast_to(row, (nP, nM, nT)).ravel(),
+                          np.broadcast_to(X[:, None, :], (nP, nM, nT)).ravel(),
+                          np.broadcast_to(data['hours'][:, :, None], (nP, nM, nT)).ravel(),
+                          '<', (scalars['ProductiveHours']*data['number']).ravel(),
+                          index = [(m, t) for m in machines for t in months])
+    return model
+
+
+def fp2(data):
+    '''
+    Factory Planning II (MIP): the machines in maintenance each month are
+    decided by the integer <z> variables.
+    '''
+    machines, months, scalars = data['machines'], data['months'], data['scalars']
+    model, X = _factory('Factory Planning II', data)
+    nP, nT = X.shape
+    nM = len(machines)
+    keys = [(m, t) for m in machines for t in months]
+    Z = model.add_vars('maintenance', keys, ub = 3, integer = True).reshape(nM, nT)
+    hours = scalars['ProductiveHours']
+
+    # 1. Production hours: ∑p a[p,m]*x[p,t] + hours*z[m,t] <= hours*n[m]
+    row = np.arange(nM*nT).reshape(nM, nT)
+    model.add_constraints('prod_capacity',
+                          np.concatenate((np.broadcast_to(row, (nP, nM, nT)).ravel(), row.ravel())),
+                          np.concatenate((np.broadcast_to(X[:, None, :], (nP, nM, nT)).ravel(), Z.ravel())),
+                          np.concatenate((np.broadcast_to(data['hours'][:, :, None], (nP, nM, nT)).ravel(),
+                                          np.full(nM*nT, hours))),
+                          '<', np.repeat(hours*data['number'], nT), index = keys)
+
+    # 5. Maintenance: every machine once (the two grinders at once in the six months)
+    periods = np.where(np.array(machines) == 'Grinding', 2, data['number'])
+    model.add_constraints('maintenance', np.repeat(np.arange(nM), nT), Z.ravel(), np.ones(nM*nT), '=', periods,
+                          index = machines)
+    return model
+
+#%% Manpower Planning
+
+TRANSFERS = ('US -> SS', 'SS -> SK', 'SK -> SS', 'SK -> US', 'SS -> US')
+
+
+def read_manpower(path):
+    from mathprog import cache, params
+
+    data = cache.read_excel(path)
+    skills = params.keys(data['skills'], 'SKILL')
+    initial, supply, redundancy, overmanning, short_time = (params.to_dict(data['skills'], 'SKILL', k) for k in range(1, 6))
+    return {'skills': skills, 'years': list(data['demand'].YEAR.unique()),
+            'initial': initial, 'supply': supply, 'redundancy': redundancy, 'overmanning': overmanning,
+            'short_time': short_time, 'demand': params.to_dict(data['demand'], ['SKILL','YEAR'], 'DEMAND')}
+
+
+def manpower(data):
+    '''
+    Manpower Planning (MIP, minimizes the costs).
+    '''
+    skills, years = data['skills'], data['years']
+    SK, SS, US = 'Skilled', 'Semi-skilled', 'Unskilled'
+    keys = [(s, i) for s in skills for i in years]
+    cost = lambda values: [values[s] for s, i in keys]
+
+    model = lp.LinearModel('Manpower Planning', 'min')
+    pos = {}
+    for name, options in (('t', {}),
+                          ('u', {'ub': cost(data['supply'])}),
+                          ('w', {'obj': cost(data['redundancy'])}),
+                          ('x', {'ub': 50, 'obj': cost(data['short_time'])}),
+                          ('y', {'obj': cost(data['overmanning'])})):
+        pos[name] = dict(zip(keys, model.add_vars(name, keys, integer = True, **options).tolist()))
+    transfers = [(k, i) for i in years for k in TRANSFERS]
+    v = dict(zip(transfers, model.add_vars('v', transfers, integer = True,
+                                           obj = [{'US -> SS': 400, 'SS -> SK': 500}.get(k, 0) for k, i in transfers],
+                                           ub = [200 if k == 'US -> SS' else np.inf for k, i in transfers]).tolist()))
+    t, u, w, x, y = (pos[k] for k in 'tuwxy')
+
+    # 1. Continuity of the workforce of every skill
+    rows, rhs, index = [], [], []
+    for k, i in enumerate(years):
+        flows = {SK: [(u[SK,i], 0.9), (v['SS -> SK',i], 0.95), (v['SK -> SS',i], -1), (v['SK -> US',i], -1)],
+                 SS: [(u[SS,i], 0.8), (v['US -> SS',i], 0.95), (v['SS -> SK',i], -1), (v['SK -> SS',i], 0.5),
+                      (v['SS -> US',i], -1)],
+                 US: [(u[US,i], 0.75), (v['US -> SS',i], -1), (v['SK -> US',i], 0.5), (v['SS -> US',i], 0.5)]}
+        for s, wastage in ((SK, 0.95), (SS, 0.95), (US, 0.9)):
+            row = [(t[s,i], 1)] + [(j, -a) for j, a in flows[s]] + [(w[s,i], 1)]
+            if k == 0:
+                rhs.append(wastage*data['initial'][s])
+            else:
+                row.append((t[s,years[k - 1]], -wastage))
+                rhs.append(0)
+            rows.append(row)
+            index.append((s, i))
+    model.add_constraints('continuity', *_triplets(rows), '=', rhs, index = index)
+
+    # 2. Retraining to skilled limited to a quarter of the skilled workforce
+    model.add_constraints('retraining', *_triplets([[(v['SS -> SK',i], 1), (t[SK,i], -0.25)] for i in years]),
+                          '<', np.zeros(len(years)), index = years)
+
+    # 3. Overmanning of at most 150 workers a year
+    model.add_constraints('overmanning', *_triplets([[(y[s,i], 1) for s in skills] for i in years]),
+                          '<', np.full(len(years), 150.0), index = years)
+
+    # 4. Requirements: t - y - 0.5*x = demand
+    model.add_constraints('requirements', *_triplets([[(t[j], 1), (y[j], -1), (x[j], -0.5)] for j in keys]),
+                          '=', [data['demand'][j] for j in keys], index = keys)
+    return model
+
+#%% Refinery Optimisation
+
+def read_refinery(path):
+    from mathprog import cache, params
+
+    data = cache.read_excel(path)
+    sheet = lambda name, *cols: params.to_dict(data[name], *cols)
+    return {'octane': sheet('octane'), 'fractions': sheet('fractions', ['CRUDE','NAPHTHA_STANDARD'], 'FRACTION'),
+            'reform_yield': sheet('yield_reform'), 'oil_yield': sheet('yield_crack_oil'),
+            'gas_yield': sheet('yield_crack_gas'), 'min_octane': sheet('octane_petrols'),
+            'pressure': sheet('vapor_fuel', 0, 1), 'fuel_ratio': sheet('vapor_fuel', 0, 2),
+            'available': sheet('availability'), 'profit': sheet('profit'),
+            'scalars': params.scalars(data['scalars'])}
+
+
+def refinery(data):
+    '''
+    Refinery Optimisation (LP).
+    '''
+    scalars, f, ratio = data['scalars'], data['fractions'], data['fuel_ratio']
+    crudes, naphthas, standard = list(data['available']), list(data['reform_yield']), list(data['oil_yield'])
+    petrols, oils, products = list(data['min_octane']), list(data['pressure']), list(data['profit'])
+    naphtha_gas = list(data['octane'])
+
+    model = lp.LinearModel('Refinery Optimisation', 'max')
+    block = lambda name, keys, **options: dict(zip(keys, model.add_vars(name, keys, **options).tolist()))
+    distille = block('distille', crudes, ub = [data['available'][c] for c in crudes])
+    reform = block('reform', naphthas)
+    crack = block('crack', standard)
+    blendp = block('blendp', [(j, p) for j in naphtha_gas for p in petrols])
+    blendj = block('blendj', oils)
+    sell = block('sell', products, obj = [data['profit'][p] for p in products],
+                 lb = [scalars['ll'] if p == 'Lube oil' else 0 for p in products],
+                 ub = [scalars['lu'] if p == 'Lube oil' else np.inf for p in products])
+    fuel = lambda o: (sell['Fuel oil'], ratio[o]/sum(ratio.values()))
+
+    rows, senses, rhs = [], [], []
+    def add(row, sense = '=', value = 0):
+        rows.append(row)
+        senses.append(sense)
+        rhs.append(value)
+
+    # 1. Naphthas available for reforming and blending petrol
+    for n in naphthas:
+        add([(reform[n], 1)] + [(blendp[n,p], 1) for p in petrols] + [(distille[c], -f[c,n]) for c in crudes])
+    # 2. Oils available for cracking and blending jet fuel and fuel oil
+    for o in standard:
+        add([(crack[o], 1), (blendj[o], 1), fuel(o)] + [(distille[c], -f[c,o]) for c in crudes])
+    # 3. Reformed gasoline
+    add([(blendp['Reformed Gasoline',p], 1) for p in petrols] + [(reform[n], -data['reform_yield'][n]) for n in naphthas])
+    # 4. Cracked oil
+    add([(blendj['Cracked Oil'], 1), fuel('Cracked Oil')] + [(crack[o], -data['oil_yield'][o]) for o in standard])
+    # 5. Cracked gasoline
+    add([(blendp['Cracked Gasoline',p], 1) for p in petrols] + [(crack[o], -data['gas_yield'][o]) for o in standard])
+    # 6. Lube oil
+    add([(sell['Lube oil'], 1), (crack['Residuum'], -scalars['l'])])
+    # 7. Petrols
+    for p in petrols:
+        add([(sell[p], 1)] + [(blendp[j,p], -1) for j in naphtha_gas])
+    # 8. Minimum octane of the petrols
+    for p in petrols:
+        add([(sell[p], data['min_octane'][p])] + [(blendp[j,p], -data['octane'][j]) for j in naphtha_gas], '<')
+    # 9. Jet fuel
+    add([(sell['Jet fuel'], 1)] + [(blendj[o], -1) for o in oils])
+    # 10. Maximum vapour pressure of the jet fuel
+    add([(blendj[o], data['pressure'][o]) for o in oils] + [(sell['Jet fuel'], -scalars['S'])], '<')
+    # 12. Capacities of distillation, reforming and cracking
+    add([(distille[c], 1) for c in crudes], '<', scalars['D'])
+    add([(reform[n], 1) for n in naphthas], '<', scalars['R'])
+    add([(crack[o], 1) for o in standard], '<', scalars['C'])
+    # 14. Premium and regular petrol relationship
+    add([(sell['Regular petrol'], 0.4), (sell['Premium petrol'], -1)], '<')
+
+    model.add_constraints('refinery', *_triplets(rows), senses, rhs)
+    return model
+
+#%% Network Flow Template
+
+def read_nft(path):
+    from mathprog import cache, network
+
+    return network.network_arrays(cache.read_excel(path, 'nodes'), cache.read_excel(path, 'edges'))
+
+
+def nft(data):
+    '''
+    Network Flow Template (LP): balance of every node with the node-arc
+    incidence matrix of network.incidence_matrix.
+    '''
+    from mathprog import network
+
+    nodes, b, tails, heads, c, l, u = data
+    model = lp.LinearModel('Network Flow', 'min')
+    arcs = model.add_vars('flow', list(zip(nodes[tails], nodes[heads])), lb = l, ub = u, obj = c)
+    A = network.incidence_matrix(tails, heads, len(nodes)).tocoo()
+    model.add_constraints('balance', A.row, arcs[A.col], A.data, '=', b, index = nodes)
+    return model
+
+#%% Traveling Salesman Problem
+
+def read_tsp(path):
+    '''
+    Vertices and complete graph of the distance matrix sheet
+    (tsp.matrix_edges).
+    '''
+    from mathprog import cache, tsp
+
+    return tsp.matrix_edges(cache.read_excel(path, 'distance'))
+
+
+def tsp(data):
+    '''
+    Traveling Salesman Problem without the subtour elimination constraints:
+    binary edge variables and degree 2 at every vertex.
+    '''
+    vertices, ei, ej, d = data
+    n, m = len(vertices), len(ei)
+    model = lp.LinearModel('Traveling Salesman Problem', 'min')
+    x = model.add_vars('x', list(zip(ei.tolist(), ej.tolist())), ub = 1, obj = d, integer = True)
+    model.add_constraints('degree', np.concatenate((ei, ej)), np.tile(x, 2), np.ones(2*m), '=', np.full(n, 2.0),
+                          index = vertices)
+    return model
+
+
+def subtour_cuts(model, data, values):
+    '''
+    Adds to the TSP model the subtour elimination constraints of the subtours
+    of the solution <values>: the sum of the edges inside every subtour S is
+    at most |S| - 1. Returns the number of subtours (1 if the solution is a
+    single tour, nothing is added then).
+    '''
+    from mathprog.tsp import components
+
+    vertices, ei, ej, d = data
+    x = model.blocks['x'][0]
+    selected = np.asarray(values)[x] > 0.5
+    k, labels = components(len(vertices), ei[selected], ej[selected])
+    if k > 1:
+        inside = np.flatnonzero(labels[ei] == labels[ej])
+        model.add_constraints(f'subtours_{len(model.row_blocks)}', labels[ei[inside]], x[inside], np.ones(len(inside)),
+                              '<', np.bincount(labels, minlength = k) - 1.0)
+    return k
+
+
+def solve_tsp(data, backend = 'gurobi', time_limit = None, env = None):
+    '''
+    Solves the TSP with any backend as the solve_loop() of the tsp module:
+    solve, add the subtour elimination constraints of the subtours of the
+    solution, and solve again until the solution is a single tour.
+
+    Returns the objective value, the edge values and the number of solves.
+    '''
+    model = tsp(data)
+    solves = 0
+    while True:
+        objval, values = lp.solve(model, backend, time_limit, env)
+        solves += 1
+        if subtour_cuts(model, data, values) == 1:
+            return objval, values[model.blocks['x'][0]], solves
+
+#%% Problems
+
+PROBLEMS = {
+    'fm1': ('1. Food Manufacture I/Parameters.xlsx', read_food, fm1),
+    'fm2': ('2. Food Manufacture II/Parameters.xlsx', read_food, fm2),
+    'fp1': ('3. Factory Planning I/Parameters.xlsx', read_factory, fp1),
+    'fp2': ('4 . Factory Planning II/Parameters.xlsx', read_factory, fp2),
+    'manpower': ('5. Manpower planning/Parameters.xlsx', read_manpower, manpower),
+    'refinery': ('6. Refinery optimisation/Parameters.xlsx', read_refinery, refinery),
+    'nft': ('Parameters NFT.xlsx', read_nft, nft),
+    'tsp': ('Parameters TSP.xlsx', read_tsp, tsp),
+}
+
+
+def load(problem):
+    '''
+    Parameters of <problem> read from its workbook in the repository.
+    '''
+    path, reader, _ = PROBLEMS[problem]
+    return reader(os.path.join(ROOT, path))
+
+#%% End of file
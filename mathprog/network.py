@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Network Flow Model Construction
+*************************************
+
+Builders for the Network Flow Template (NFT):
+
+    min  ∑(i,j)∈A c_ij*x_ij
+
+    subject to
+
+     ∑{j|(i,j)∈A} x_ij - ∑{j|(j,i)∈A} x_ji = b_i ∀i∈N
+
+    l_ij <= x_ij <= u_ij
+
+build_model() is the formulation of the template script, one tupledict.sum
+per node and direction, so every balance constraint scans the whole arc set,
+O(|N|·|A|). build_matrix_model() writes the same model in matrix form: the
+node-arc incidence matrix is assembled as a SciPy CSR matrix straight from
+the arc arrays and added with a single addMConstr call, O(|A|).
+
+Since the constraint matrix is a network matrix, the model can also be solved
+without a general LP solver: solve() dispatches the same arrays either to
+Gurobi or to the min-cost-flow engine of OR-tools (SimpleMinCostFlow, a
+cost-scaling push-relabel algorithm that needs integral data).
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+#%% Network data
+
+def network_arrays(df_nodes, df_edges):
+    '''
+    Converts the 'nodes' (NODES, B) and 'edges' (NODE I, NODE J, C, L, U)
+    sheets into arrays. Arc end points are returned as node positions.
+
+    Returns nodes, b, tails, heads, c, l, u
+    '''
+    import pandas as pd
+
+    nodes = pd.Index(df_nodes.iloc[:, 0])
+    b = df_nodes.iloc[:, 1].to_numpy(dtype = float)
+    tails = nodes.get_indexer(df_edges.iloc[:, 0])
+    heads = nodes.get_indexer(df_edges.iloc[:, 1])
+    if (tails < 0).any() or (heads < 0).any():
+        unknown = set(df_edges.iloc[:, 0][tails < 0]) | set(df_edges.iloc[:, 1][heads < 0])
+        raise ValueError(f'Edges reference undefined nodes: {sorted(map(str, unknown))}')
+    c, l, u = (df_edges.iloc[:, k].to_numpy(dtype = float) for k in (2, 3, 4))
+    return nodes, b, tails, heads, c, l, u
+
+
+def incidence_matrix(tails, heads, n_nodes):
+    '''
+    Node-arc incidence matrix in CSR format: +1 in the row of the tail of every
+    arc (flow leaving the node) and -1 in the row of its head (flow entering).
+    '''
+    import scipy.sparse as sp
+
+    n_arcs = len(tails)
+    rows = np.concatenate((tails, heads))
+    cols = np.tile(np.arange(n_arcs), 2)
+    vals = np.concatenate((np.ones(n_arcs), -np.ones(n_arcs)))
+    return sp.csr_matrix((vals, (rows, cols)), shape = (n_nodes, n_arcs))
+
+#%% Model builders
+
+def build_model(nodes, b, edges, c, l, u, env = None):
+    '''
+    Template formulation with tupledicts (as in 'Network Flow Template (NFT).py').
+    <b> is keyed by node and <c>, <l>, <u> by arc.
+
+    Returns the model and the <x> tupledict of flows.
+    '''
+    import gurobipy as gb
+
+    nf = gb.Model('Network Flow', env = env)
+    x = nf.addVars(edges, name = 'flow', obj = c, vtype = gb.GRB.CONTINUOUS, lb = l, ub = u)
+    nf.ModelSense = gb.GRB.MINIMIZE
+    nf.addConstrs((x.sum(i,'*') - x.sum('*',i) == b[i] for i in nodes), 'balance')
+    return nf, x
+
+
+def build_matrix_model(b, tails, heads, c, l, u, env = None):
+    '''
+    Matrix formulation: min c'x s.t. A x = b, l <= x <= u, with A the CSR
+    incidence matrix. Arrays are indexed by node / arc position.
+
+    Returns the model, the <x> MVar of flows and the balance MConstr.
+    '''
+    import gurobipy as gb
+
+    A = incidence_matrix(tails, heads, len(b))
+    nf = gb.Model('Network Flow', env = env)
+    x = nf.addMVar(len(tails), lb = l, ub = u, obj = c, vtype = gb.GRB.CONTINUOUS, name = 'flow')
+    nf.ModelSense = gb.GRB.MINIMIZE
+    balance = nf.addMConstr(A, x, '=', np.asarray(b, dtype = float), name = 'balance')
+    return nf, x, balance
+
+#%% Solvers
+
+def _integral(name, values):
+    values = np.asarray(values, dtype = float)
+    if not np.all(np.isfinite(values)) or not np.all(values == np.round(values)):
+        raise ValueError(f'The min cost flow backend requires integral {name}')
+    return values.astype(np.int64)
+
+
+def min_cost_flow(b, tails, heads, c, l, u):
+    '''
+    Solves the network flow problem with OR-tools' SimpleMinCostFlow.
+
+    The lower bounds are removed with the substitution x = l + y, 0 <= y <= u - l,
+    which moves l_ij out of the supply of i and into the supply of j. Infinite
+    upper bounds are replaced by the total supply, an upper bound of the flow
+    of any arc in an optimal solution.
+
+    Returns the objective value and the array of flows.
+    '''
+    from ortools.graph.python import min_cost_flow as mcf
+
+    tails = np.asarray(tails, dtype = np.int32)
+    heads = np.asarray(heads, dtype = np.int32)
+    b = _integral('supplies', b)
+    c = _integral('costs', c)
+    l = _integral('lower bounds', l)
+    u = np.asarray(u, dtype = float)
+
+    # Lower bound transformation
+    supply = b - np.bincount(tails, weights = l, minlength = len(b)).astype(np.int64) \
+               + np.bincount(heads, weights = l, minlength = len(b)).astype(np.int64)
+    total = int(supply[supply > 0].sum())
+    u = np.where(np.isinf(u), total + l, u)
+    capacity = _integral('upper bounds', u) - l
+    if (capacity < 0).any():
+        raise ValueError('Some arcs have an upper bound below their lower bound')
+
+    solver = mcf.SimpleMinCostFlow()
+    solver.add_arcs_with_capacity_and_unit_cost(tails, heads, capacity, c)
+    solver.set_nodes_supplies(np.arange(len(b), dtype = np.int32), supply)
+    status = solver.solve()
+    if status != solver.OPTIMAL:
+        raise RuntimeError(f'Min cost flow ended with status {status.name}')
+
+    flow = l + solver.flows(np.arange(len(tails), dtype = np.int32))
+    return float(solver.optimal_cost() + c @ l), flow.astype(float)
+
+
+def solve(b, tails, heads, c, l, u, backend = 'gurobi', env = None):
+    '''
+    Solves the network flow problem given as arrays with the chosen backend:
+
+        'gurobi'    LP of build_matrix_model()
+        'ortools'   min_cost_flow() (integral data only, no license needed)
+
+    Returns the objective value and the array of flows.
+    '''
+    if backend == 'ortools':
+        return min_cost_flow(b, tails, heads, c, l, u)
+    if backend != 'gurobi':
+        raise ValueError(f'Unknown network flow backend: {backend}')
+
+    import gurobipy as gb
+
+    nf, x, _ = build_matrix_model(b, tails, heads, c, l, u, env = env)
+    try:
+        nf.setParam('OutputFlag',0)
+        nf.optimize()
+        if nf.Status != gb.GRB.OPTIMAL:
+            raise RuntimeError(f'Network flow model ended with status {nf.Status}')
+        return nf.ObjVal, x.X
+    finally:
+        nf.dispose()
+
+#%% End of file
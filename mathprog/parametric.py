@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Parametric Right-Hand Side Analysis
+*************************************
+
+Optimal value of an LP as a function of the right-hand side of one of its
+constraints, z(b), over an interval [low, high]. z is piecewise linear and
+concave (maximization) or convex (minimization) in b, and its pieces are the
+right-hand side ranges of the optimal bases:
+
+    within a range      SARHSLow <= b <= SARHSUp the basis stays optimal and
+                        z changes at the rate of the dual (Pi), nothing is
+                        solved
+    at a breakpoint     the right-hand side is moved just past the end of the
+                        range and the model re-optimized in place, warm from
+                        the basis of the previous piece (a few dual simplex
+                        iterations), which gives the next dual and range
+
+so a curve costs one warm solve per breakpoint instead of one solve per
+value of b. The walks run on a copy of the model (model.copy()), every one
+warm started from the optimal basis of the model, which is left as it was:
+its solution, basis, duals and ranges are unchanged.
+
+    rhs_curve()     breakpoints (b, z) of one constraint
+    rhs_curves()    the curves of a group of constraints (tupledict,
+                    dictionary or sequence) as one DataFrame
+    evaluate()      z at any b of a curve (linear interpolation between the
+                    breakpoints, which is exact)
+    factory_capacity()
+                    the curves of the production capacity constraints of
+                    Factory Planning I ('prod_capacity', models.fp1) from no
+                    machine up to <extra> machines more than planned
+
+    df = parametric.rhs_curves(model, c1, ['MACHINE','MONTH'], low = 0, high = hours*(n + 1))
+
+A right-hand side that makes the model infeasible ends the curve at the last
+feasible breakpoint.
+
+Usage:
+    python -m mathprog.parametric [--extra 1]
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+RANGES = ('Pi', 'SARHSLow', 'SARHSUp')    # Dual and right-hand side range of a constraint
+
+#%% Curves
+
+def _walk(model, constr, b, z, pi, end, limit, direction, eps):
+    # Breakpoints from (b, z) towards <limit> (direction +1 or -1), <end> the end of the current range
+    import gurobipy as gb
+
+    points, solves = [], 0
+    while direction*(limit - end) > 0:
+        z, b = z + pi*(end - b), end
+        points.append((b, z))
+        step = end + direction*eps*max(1.0, abs(end))
+        constr.RHS = step
+        model.optimize()
+        solves += 1
+        if model.Status != gb.GRB.OPTIMAL:    # Infeasible beyond the breakpoint: the curve ends there
+            return points, solves
+        pi, low, up = (constr.getAttr(attr) for attr in RANGES)
+        b, z, end = step, model.ObjVal, (up if direction > 0 else low)
+    points.append((limit, z + pi*(limit - b)))
+    return points, solves
+
+
+class _Walker:
+    # Working copy of a solved LP for the walks, started again from the optimal basis of the model for every walk,
+    # so the model, its solution, duals and ranges are never changed
+
+    def __init__(self, model):
+        import gurobipy as gb
+
+        if model.IsMIP or model.Status != gb.GRB.OPTIMAL:
+            raise ValueError(f'{model.ModelName} must be an LP solved to optimality')
+        self.basis = model.getAttr('VBasis', model.getVars()), model.getAttr('CBasis', model.getConstrs())
+        self.objective = model.ObjVal
+        self.model = model.copy()
+        self.variables, self.constrs = self.model.getVars(), self.model.getConstrs()
+
+    def curve(self, k, start, low, high, eps):
+        # Breakpoints of the constraint in position <k>, <start> its (Pi, SARHSLow, SARHSUp) in the model
+        constr = self.constrs[k]
+        b0, z0 = constr.RHS, self.objective
+        pi, range_low, range_up = start
+        walks, solves = [], 0
+        try:
+            for end, limit, direction in ((range_up, high, 1), (range_low, low, -1)):
+                constr.RHS = b0
+                self.model.setAttr('VBasis', self.variables, self.basis[0])    # Warm start from the optimal basis
+                self.model.setAttr('CBasis', self.constrs, self.basis[1])
+                points, n = _walk(self.model, constr, b0, z0, pi, end, limit, direction, eps)
+                walks.append(points)
+                solves += n
+        finally:
+            constr.RHS = b0
+        up, down = walks
+
+        points = np.array(down[::-1] + ([(b0, z0)] if low < b0 < high else []) + up)
+        rhs, objective = points[:, 0], points[:, 1]
+        keep = np.r_[True, np.diff(rhs) > eps*np.maximum(1.0, np.abs(rhs[1:]))]    # The interval ends may repeat a breakpoint
+        return rhs[keep], objective[keep], solves
+
+    def close(self):
+        self.model.dispose()
+
+
+def rhs_curve(model, constr, low, high, eps = 1e-7):
+    '''
+    Breakpoints of the optimal value of the solved LP <model> as a function of
+    the right-hand side of <constr> between <low> and <high>: one warm
+    re-solve per breakpoint of a copy of the model (see the module
+    documentation), the model itself is not changed.
+
+    Returns the arrays of right-hand sides and objective values of the
+    breakpoints (including the ends of the interval, or the last feasible
+    right-hand side) and the number of solves.
+    '''
+    walker = _Walker(model)
+    try:
+        return walker.curve(constr.index, [constr.getAttr(attr) for attr in RANGES], low, high, eps)
+    finally:
+        walker.close()
+
+
+def rhs_curves(model, constrs, names = None, low = 0.0, high = None, eps = 1e-7):
+    '''
+    rhs_curve() of every constraint of the group <constrs> (tupledict or
+    dictionary by key, or sequence) of the solved LP <model>. <low> and
+    <high> are scalars or arrays in the order of the group (<high> None: twice
+    the right-hand side of each constraint).
+
+    Returns a DataFrame with the elements of the keys in the columns <names>
+    and one row per breakpoint: 'rhs', 'objective' and 'slope' (the rate of
+    change of the objective up to the next breakpoint, NaN on the last one),
+    and the total number of solves.
+    '''
+    import pandas as pd
+
+    keys, items = (list(constrs.keys()), list(constrs.values())) if isinstance(constrs, dict) else \
+                  (list(range(len(constrs))), list(constrs))
+    rhs = np.array(model.getAttr('RHS', items))
+    starts = list(zip(*(model.getAttr(attr, items) for attr in RANGES)))    # Ranges of the starting basis in bulk
+    low = np.broadcast_to(np.asarray(low, dtype = float), rhs.shape)
+    high = np.broadcast_to(np.asarray(2*rhs if high is None else high, dtype = float), rhs.shape)
+
+    frames, solves = [], 0
+    walker = _Walker(model)
+    try:
+        curves = [walker.curve(constr.index, starts[k], low[k], high[k], eps) for k, constr in enumerate(items)]
+    finally:
+        walker.close()
+    for key, (b, z, n) in zip(keys, curves):
+        solves += n
+        slope = np.append(np.diff(z)/np.diff(b), np.nan)
+        elements = key if isinstance(key, tuple) else (key,)
+        df = pd.DataFrame({'rhs': b, 'objective': z, 'slope': slope})
+        for position, element in enumerate(elements):
+            df.insert(position, names[position] if names else position, element)
+        frames.append(df)
+    return pd.concat(frames, ignore_index = True), solves
+
+
+def evaluate(curve, b):
+    '''
+    Objective values at the right-hand sides <b> of a curve: a DataFrame of the
+    breakpoints of one constraint (rows of rhs_curves()) or a (rhs, objective)
+    pair. NaN outside the curve.
+    '''
+    rhs, objective = (curve['rhs'], curve['objective']) if hasattr(curve, 'columns') else curve[:2]
+    return np.interp(b, rhs, objective, left = np.nan, right = np.nan)
+
+#%% Factory Planning I
+
+def factory_capacity(data = None, extra = 1, env = None):
+    '''
+    Curves of the production capacity constraints of Factory Planning I
+    (parameters of models.read_factory, by default the workbook of the
+    repository), from no machine to the planned number plus <extra> in every
+    machine-month, with the right-hand sides also in machines ('machines' =
+    rhs / productive hours).
+
+    Returns the DataFrame of rhs_curves() and the number of solves.
+    '''
+    from mathprog import lp, models
+
+    data = data if data is not None else models.load('fp1')
+    declared = models.fp1(data)
+    m, x = lp.to_gurobi(declared, env)
+    try:
+        m.Params.OutputFlag = 0
+        m.optimize()
+        hours = data['scalars']['ProductiveHours']
+        df, solves = rhs_curves(m, lp.gurobi_blocks(declared, m)[1]['prod_capacity'], ['MACHINE','MONTH'],
+                                low = 0.0, high = hours*(data['number'].ravel() + extra))
+        df['machines'] = df['rhs']/hours
+        return df, solves
+    finally:
+        m.dispose()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--extra', type = int, default = 1, help = 'machines beyond the plan in every curve')
+    args = parser.parse_args()
+    df, solves = factory_capacity(extra = args.extra)
+    print(df.to_string(index = False))
+    print(f'****************************************\n{len(df)} breakpoints, {solves} warm solves')
+
+#%% End of file
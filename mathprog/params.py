@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Parameter Loading
+*************************************
+
+The model scripts store their parameters as tables in 'Parameters.xlsx', one
+sheet per parameter, with the index columns first and the values last:
+
+    OIL    MONTH     COST
+    VEG 1  January   -110
+    ...
+
+These functions turn such a sheet into the keyed mappings consumed by
+gb.multidict / addVars(obj = ...) using whole-column operations, instead of
+the row by row loop:
+
+    for index, row in df.iterrows():
+        dic[row[0],row[1]] = row[2]
+
+Columns can be given either by position (as in row[0]) or by name.
+"""
+
+#%% Importing libraries
+
+import numpy as np
+import pandas as pd
+
+#%% Column helpers
+
+def _columns(df, cols):
+    # Normalizes a column position/name (or a list of them) into a list of positions
+    if cols is None:
+        return []
+    if not isinstance(cols, (list, tuple)):
+        cols = [cols]
+    return [c if isinstance(c, int) else df.columns.get_loc(c) for c in cols]
+
+
+def _arrays(df, positions):
+    # .tolist() converts NumPy scalars to Python objects, which is what Gurobi expects
+    return [df.iloc[:, i].tolist() for i in positions]
+
+
+def keys(df, cols):
+    '''
+    Returns the keys of the sheet: a list of scalars for a single key column
+    or a list of tuples for compound keys.
+    '''
+    arrays = _arrays(df, _columns(df, cols))
+    if len(arrays) == 1:
+        return arrays[0]
+    return list(zip(*arrays))
+
+#%% Dictionary builders
+
+def to_dict(df, key_cols = 0, value_cols = None):
+    '''
+    Maps the key column(s) of <df> to its value column(s).
+
+    key_cols:   column (or list of columns) used as key, default the first one.
+    value_cols: column (or list of columns) used as value, default every column
+                that is not a key. A single value column maps to scalars,
+                several value columns map to lists (as in dic_hardness).
+    '''
+    key_pos = _columns(df, key_cols)
+    if value_cols is None:
+        value_pos = [i for i in range(df.shape[1]) if i not in key_pos]
+    else:
+        value_pos = _columns(df, value_cols)
+
+    k = keys(df, key_pos)
+    values = _arrays(df, value_pos)
+    if len(values) == 1:
+        return dict(zip(k, values[0]))
+    return dict(zip(k, map(list, zip(*values))))
+
+
+def scalars(df, key_col = 0, value_col = 1):
+    '''
+    Returns the NAME -> VALUE dictionary of a scalars sheet.
+    '''
+    return to_dict(df, key_col, value_col)
+
+
+def multidict(df, key_cols = 0, value_cols = None):
+    '''
+    Columnar equivalent of gb.multidict(to_dict(df, key_cols, value_cols)).
+
+    Returns [keys, values_1, values_2, ...] where <keys> is a gb.tuplelist for
+    compound keys (a list otherwise) and every values_i is a gb.tupledict, so
+    the result can be unpacked exactly as the output of gb.multidict:
+
+        oils_months, costs = params.multidict(df_cost)
+
+    A key repeated in the sheet appears once, in the position of its first
+    row and with the values of its last row, as through the dictionary.
+    '''
+    import gurobipy as gb
+
+    key_pos = _columns(df, key_cols)
+    if value_cols is None:
+        value_pos = [i for i in range(df.shape[1]) if i not in key_pos]
+    else:
+        value_pos = _columns(df, value_cols)
+
+    k = keys(df, key_pos)
+    arrays = _arrays(df, value_pos)
+    last = dict(zip(k, range(len(k))))    # Row of the last occurrence of every key, in order of first occurrence
+    if len(last) < len(k):
+        k, rows = list(last), list(last.values())
+        arrays = [[values[i] for i in rows] for values in arrays]
+    result = [gb.tuplelist(k) if len(key_pos) > 1 else k]
+    for values in arrays:
+        result.append(gb.tupledict(zip(k, values)))
+    return result
+
+#%% Workbook reading
+
+def _dedup(columns):
+    # Duplicate headers renamed as pd.read_excel does: 'A', 'A.1', 'A.2', ..., skipping names already in the header
+    counts = {}
+    for i, col in enumerate(columns):
+        base, count = col, counts.get(col, 0)
+        while count > 0:
+            counts[base] = count + 1
+            col = f'{base}.{count}'
+            count = count + 1 if col in columns else counts.get(col, 0)
+        columns[i] = col
+        counts[col] = count + 1
+    return columns
+
+
+def _sheet_frame(ws):
+    rows = list(ws.iter_rows(values_only = True))
+    # Formatted but empty trailing rows and columns are dropped, as pandas does
+    while rows and all(v is None for v in rows[-1]):
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+    width = max(max((i + 1 for i, v in enumerate(row) if v is not None), default = 0) for row in rows)
+    header = rows[0][:width]
+    records = [row[:width] for row in rows[1:]]
+    columns = _dedup([f'Unnamed: {i}' if h is None else h for i, h in enumerate(header)])
+    df = pd.DataFrame.from_records(records, columns = columns)
+    # Empty cells as NaN (not None) in every column, and the dtypes pandas infers for the columns left numeric
+    return df.where(df.notna(), np.nan).infer_objects()
+
+
+def read_workbook(path, sheets = None):
+    '''
+    Reads the sheets of a parameters workbook into a dictionary of DataFrames
+    (sheet name -> DataFrame, header in the first row), opening the file once.
+
+    The workbook is opened by openpyxl in read-only mode, which streams the
+    rows of the requested sheets only. <sheets> is a list of sheet names,
+    by default every sheet is read.
+    '''
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only = True, data_only = True)
+    try:
+        names = wb.sheetnames if sheets is None else sheets
+        missing = [name for name in names if name not in wb.sheetnames]
+        if missing:
+            raise ValueError(f'Worksheet(s) {missing} not found in {path}')
+        return {name: _sheet_frame(wb[name]) for name in names}
+    finally:
+        wb.close()
+
+
+def _read_one(path, sheets, cached):
+    if cached:
+        from mathprog import cache
+        return cache.read_excel(path, sheets)
+    return read_workbook(path, sheets)
+
+
+def read_workbooks(paths, sheets = None, max_workers = None, processes = False, cached = False):
+    '''
+    Bulk mode of read_workbook for scenario sweeps: loads many workbooks
+    concurrently and returns a dictionary path -> {sheet name: DataFrame}.
+
+    By default a thread pool is used, which overlaps the file reads and the
+    zip inflation of the workbooks. The XML parsing itself holds the GIL, so
+    for large sweeps of big workbooks <processes> = True spreads the parsing
+    over a process pool instead. With <cached> the workbooks go through the
+    binary cache of mathprog.cache.
+    '''
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    paths = list(paths)
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers = max_workers) as pool:
+        results = pool.map(_read_one, paths, [sheets]*len(paths), [cached]*len(paths))
+        return dict(zip(paths, results))
+
+#%% End of file
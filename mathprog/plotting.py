@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Incremental Tour Plot
+*************************************
+
+Plot of the TSP solutions that is cheap to refresh: the figure, the cities
+and their labels are drawn once, and every new solution only replaces the
+segments of a single LineCollection, instead of closing the figure and
+issuing one plot() call per selected edge. In window mode the rendered
+cities and labels are kept as a background image, so a refresh only renders
+the edges on top of it (blitting).
+
+    TourPlot(df_coord, mode = 'window')     redraws the open window on every update
+    TourPlot(df_coord, mode = 'file',       draws nothing until finish(), which saves
+             path = 'tsp.png')              the last solution (works headless)
+    TourPlot(df_coord, mode = None)         every call is a no-op (batch runs)
+
+matplotlib is only imported when a plot is actually made.
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+MODES = ('window', 'file', None)
+
+#%% Plot
+
+class TourPlot:
+    '''
+    Cities of the coordinates sheet (cities as index, X and Y columns) and the
+    selected edges of the current solution.
+    '''
+
+    def __init__(self, df_coord, mode = 'window', path = 'tsp.png', labels = True,
+                 title = 'Travelling Salesman Problem'):
+        if mode not in MODES:
+            raise ValueError(f'Unknown plot mode: {mode}')
+        self.mode = mode
+        self.path = path
+        self.labels = labels
+        self.title = title
+        self.X = df_coord['X'].to_numpy(dtype = float)
+        self.Y = df_coord['Y'].to_numpy(dtype = float)
+        self.names = df_coord.index.tolist()
+        self.segments = np.empty((0, 2, 2))
+        self.figure = None
+
+    def _draw(self):
+        # Figure, cities and labels, drawn once
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+
+        if self.mode == 'window':
+            plt.ion()
+        self.figure, self.axes = plt.subplots()
+        self.axes.set_xlabel('X Coordinate')
+        self.axes.set_ylabel('Y Coordinate')
+        self.axes.set_title(self.title)
+        self.axes.scatter(self.X, self.Y, 50, 'Blue', marker = 'o')
+        if self.labels:
+            for name, X, Y in zip(self.names, self.X, self.Y):
+                self.axes.text(X - 5, Y + 4, name, fontsize = 10)
+        self.lines = LineCollection([], colors = 'red', alpha = 0.8, linestyles = '--', linewidths = 1)
+        self.axes.add_collection(self.lines)
+        if self.mode == 'window':
+            # The edges are left out of full draws, which only render the background kept for blitting
+            self.lines.set_animated(True)
+            self.figure.canvas.mpl_connect('draw_event', self._on_draw)
+            self.figure.canvas.draw()
+
+    def _on_draw(self, event):
+        # Full draw (first draw, resize): new background, then the edges on top of it
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self.axes.draw_artist(self.lines)
+
+    def _blit(self):
+        canvas = self.figure.canvas
+        canvas.restore_region(self.background)
+        self.axes.draw_artist(self.lines)
+        canvas.blit(self.figure.bbox)
+        canvas.flush_events()
+
+    def update(self, ei, ej):
+        '''
+        Replaces the drawn edges by the edges (ei, ej), given as arrays of city
+        positions.
+        '''
+        if self.mode is None:
+            return
+        ei, ej = np.asarray(ei, dtype = np.int64), np.asarray(ej, dtype = np.int64)
+        self.segments = np.stack((np.column_stack((self.X[ei], self.Y[ei])),
+                                  np.column_stack((self.X[ej], self.Y[ej]))), axis = 1)
+        if self.mode == 'window':
+            if self.figure is None:
+                self._draw()
+            self.lines.set_segments(self.segments)
+            self._blit()
+
+    def update_tour(self, tour):
+        '''
+        Replaces the drawn edges by those of a tour given as city positions.
+        '''
+        tour = np.asarray(tour)
+        self.update(tour, np.roll(tour, -1))
+
+    def finish(self):
+        '''
+        Shows the last solution (window mode, blocking until the window is
+        closed) or saves it to <path> (file mode).
+        '''
+        if self.mode is None:
+            return
+        import matplotlib.pyplot as plt
+
+        if self.figure is None:
+            self._draw()
+        self.lines.set_segments(self.segments)
+        if self.mode == 'file':
+            self.figure.savefig(self.path)
+            plt.close(self.figure)
+        else:
+            self.lines.set_animated(False)    # Part of the figure again, so it is kept on redraws of the window
+            plt.ioff()
+            plt.show()
+
+#%% End of file
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Environment and Model Template Pools
+*************************************
+
+Repeated solves of the same problem with different parameters (a service
+answering Factory Planning or Refinery requests) without paying for a
+Gurobi environment and a model build on every request:
+
+    EnvPool         pre-started Gurobi environments (license checked once),
+                    lent to one solve at a time
+    Template        the model of a problem (models.PROBLEMS) built once in its
+                    own environment. A request declares its model in array
+                    form (cheap, NumPy) and only the arrays that differ from
+                    the loaded ones are set, one batched setAttr call each
+                    (Obj, LB, UB of the MVar, RHS of the constraints), so LPs
+                    re-optimize from the basis of the previous request.
+                    Requests that change the constraint matrix or the
+                    integrality are built from scratch in the environment of
+                    the template. With copy = True the patched model is
+                    copied (model.copy()) and the copy solved, which leaves
+                    the template free for the next request while it solves.
+    TemplatePool    <size> templates of one problem, lent to one request at a
+                    time (thread safe)
+
+    pool = TemplatePool('fp1', size = 2)
+    result = pool.solve(data)    # data: parameters of models.PROBLEMS['fp1'] reader
+    pool.close()
+
+Only Gurobi keeps an environment: the OR-tools backends load every request
+in bulk from its MPModelProto (lp.to_pywraplp), which is all the reuse the
+pywraplp solvers allow.
+"""
+
+#%% Importing libraries
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from mathprog import lp, models
+
+#%% Environments
+
+def start_env(params = None):
+    '''
+    Started Gurobi environment without output, with the Gurobi <params>
+    (dictionary) set before the start.
+    '''
+    import gurobipy as gb
+
+    env = gb.Env(empty = True)
+    env.setParam('OutputFlag', 0)
+    for name, value in (params or {}).items():
+        env.setParam(name, value)
+    env.start()
+    return env
+
+
+class EnvPool:
+    '''
+    <size> started Gurobi environments (see start_env()), lent with acquire().
+    '''
+
+    def __init__(self, size = 1, params = None):
+        self.envs = [start_env(params) for _ in range(size)]
+        self._free = queue.Queue()
+        for env in self.envs:
+            self._free.put(env)
+
+    @contextmanager
+    def acquire(self, timeout = None):
+        '''
+        Environment free for the duration of the with block (waits up to
+        <timeout> seconds for one).
+        '''
+        env = self._free.get(timeout = timeout)
+        try:
+            yield env
+        finally:
+            self._free.put(env)
+
+    def close(self):
+        for env in self.envs:
+            env.dispose()
+        self.envs = []
+
+#%% Templates
+
+class Template:
+    '''
+    Model of <problem> built once from <data> (default: the workbook of the
+    repository) in its own environment, re-solved for the parameters of every
+    request (see the module documentation).
+    '''
+
+    def __init__(self, problem, data = None, params = None):
+        self.problem = problem
+        self.declare = models.PROBLEMS[problem][2]
+        self.env = start_env(params)
+        self.lock = threading.Lock()
+        self.model = None
+        self._load(self.declare(data if data is not None else models.load(problem)))
+
+    def _load(self, declared):
+        # Builds the Gurobi model of the declared model and keeps its arrays to compare the requests with
+        if self.model is not None:
+            self.model.dispose()
+        self.model, self.x = lp.to_gurobi(declared, self.env)
+        self.model.update()
+        self.constrs = self.model.getConstrs()
+        self.declared = declared
+        self.loaded = declared.arrays()
+        self.rhs = lp.gurobi_rhs(declared)
+
+    def patch(self, data):
+        '''
+        Sets the parameters of <data> in the template model: the objective,
+        bounds and right-hand sides that differ from the loaded ones. A model
+        with another constraint matrix, integrality or row types (=, <=, >=
+        and infinite sides, by which to_gurobi groups and drops rows) is
+        loaded from scratch.
+
+        Returns the declared model of <data> and whether it was patched (True)
+        or rebuilt (False).
+        '''
+        declared = self.declare(data)
+        c, lb, ub, integer, A, row_lb, row_ub = declared.arrays()
+        c0, lb0, ub0, integer0, A0, row_lb0, row_ub0 = self.loaded
+        types = lambda lower, upper: [rows for rows, sense, rhs in lp.row_types(lower, upper)]
+        if (A.shape != A0.shape or (A != A0).nnz or not np.array_equal(integer, integer0) or
+                not all(map(np.array_equal, types(row_lb, row_ub), types(row_lb0, row_ub0)))):
+            self._load(declared)
+            return declared, False
+
+        for attr, values, loaded in (('Obj', c, c0), ('LB', lb, lb0), ('UB', ub, ub0)):
+            if not np.array_equal(values, loaded):
+                self.x.setAttr(attr, values)
+        rhs = lp.gurobi_rhs(declared)
+        if not np.array_equal(rhs, self.rhs):
+            self.model.setAttr('RHS', self.constrs, rhs.tolist())
+        self.declared, self.loaded, self.rhs = declared, declared.arrays(), rhs
+        return declared, True
+
+    def solve(self, data = None, time_limit = None, copy = False):
+        '''
+        Solves the template for the parameters <data> (None: as loaded). With
+        <copy> the patched model is copied and the copy solved outside the
+        lock of the template.
+
+        Returns a dictionary with the status, objective value, variable values
+        (array in the order of the declared model), the declared model, and
+        the patch, build and solve times.
+        '''
+        import gurobipy as gb
+
+        begin = time.perf_counter()
+        with self.lock:
+            declared, patched = self.patch(data) if data is not None else (self.declared, True)
+            prepared = time.perf_counter()
+            if copy:
+                self.model.update()    # The patched attributes are pending until an update, and copy() leaves them out
+                m = self.model.copy()
+                m.update()
+                x = gb.MVar.fromlist(m.getVars())
+            else:
+                m, x = self.model, self.x
+                result = self._optimize(m, x, time_limit)
+        if copy:
+            try:
+                result = self._optimize(m, x, time_limit)
+            finally:
+                m.dispose()
+        result.update(model = declared, patched = patched, prepare = prepared - begin,
+                      solve = time.perf_counter() - prepared)
+        return result
+
+    @staticmethod
+    def _optimize(m, x, time_limit):
+        import gurobipy as gb
+
+        m.Params.TimeLimit = time_limit if time_limit is not None else gb.GRB.INFINITY
+        m.optimize()
+        solved = m.SolCount > 0
+        return {'status': m.Status, 'objective': m.ObjVal if solved else np.nan,
+                'x': x.X if solved else None, 'runtime': m.Runtime, 'iterations': m.IterCount}
+
+    def close(self):
+        self.model.dispose()
+        self.env.dispose()
+
+
+class TemplatePool:
+    '''
+    <size> templates of <problem> (see Template), each request solved by a
+    free one.
+    '''
+
+    def __init__(self, problem, size = 1, data = None, params = None):
+        self.problem = problem
+        self.templates = [Template(problem, data, params) for _ in range(size)]
+        self._free = queue.Queue()
+        for template in self.templates:
+            self._free.put(template)
+
+    def solve(self, data = None, time_limit = None, copy = False, timeout = None):
+        '''
+        Template.solve() on a free template (waits up to <timeout> seconds for
+        one).
+        '''
+        template = self._free.get(timeout = timeout)
+        try:
+            return template.solve(data, time_limit, copy)
+        finally:
+            self._free.put(template)
+
+    def close(self):
+        for template in self.templates:
+            template.close()
+        self.templates = []
+
+#%% End of file
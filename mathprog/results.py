@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Solution Extraction
+*************************************
+
+Reads the solution of a solved model in bulk instead of one attribute access
+per variable (refine[o,m].x, .solution_value()):
+
+    gurobipy    one model.getAttr('X', vars) call per group of variables, or
+                MVar.X for matrix variables
+    OR-tools    the whole solution of a pywraplp Solver in one solution
+                response (solution()), picked by variable index, or by the
+                positions of the blocks of the lp.LinearModel the solver was
+                loaded from (block_frame())
+
+values() returns the keys of a group and the array of its values (by_key()
+the same as a dictionary, for small reports looked up by key). frame()
+puts the groups sharing the same keys side by side in a DataFrame, one row
+per key with the key elements in columns, optionally keeping only the rows
+with some nonzero value (nonzero = True); table() builds the same DataFrame
+from keys and arrays already read:
+
+    df = results.frame(model, {'refine': refine, 'buy': buy}, ['OIL','MONTH'], nonzero = True)
+
+The 'model' argument is a gurobipy Model, a pywraplp Solver or the array of
+all the variable values of a solution (solution(), lp.solve()), which saves
+fetching the solution of an OR-tools solver once per group.
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+#%% Values
+
+def solution(solver):
+    '''
+    Values of all the variables of a solved pywraplp Solver, in variable
+    index order.
+    '''
+    from ortools.linear_solver import linear_solver_pb2
+
+    response = linear_solver_pb2.MPSolutionResponse()
+    solver.FillSolutionResponseProto(response)
+    return np.array(response.variable_value)
+
+
+def values(model, variables, attr = 'X'):
+    '''
+    Values of the group <variables> (tupledict or dictionary of variables,
+    sequence of variables or MVar) in <model>, fetched in one call. <attr> is
+    the Gurobi attribute read (any array of a pywraplp solution is read as
+    the values).
+
+    Returns the keys of the group (positions for a sequence or MVar) and the
+    array of values in the same order.
+    '''
+    if isinstance(variables, dict):
+        keys, items = list(variables.keys()), list(variables.values())
+    else:
+        keys, items = None, variables
+
+    if hasattr(items, 'shape'):    # MVar
+        array = np.asarray(items.getAttr(attr)).ravel()
+    elif hasattr(model, 'getAttr'):
+        array = np.array(model.getAttr(attr, list(items)), dtype = float)
+    else:
+        x = model if isinstance(model, np.ndarray) else solution(model)
+        array = x[np.fromiter((v.index() for v in items), dtype = np.int64, count = len(items))]
+    return (keys if keys is not None else list(range(len(array)))), array
+
+
+def by_key(model, variables, attr = 'X'):
+    '''
+    Values of the group <variables> fetched in one call (see values()), as a
+    dictionary by key.
+    '''
+    keys, array = values(model, variables, attr)
+    return dict(zip(keys, array.tolist()))
+
+
+def table(keys, columns, names = None, nonzero = False, tol = 1e-9):
+    '''
+    DataFrame of the <keys> of a group, with their elements in the columns
+    <names>, and the arrays of <columns> (dictionary column name -> array in
+    the order of the keys). With <nonzero> only the rows with some value
+    beyond <tol> in absolute value are kept.
+    '''
+    import pandas as pd
+
+    if keys and isinstance(keys[0], tuple):
+        df = pd.DataFrame.from_records(keys, columns = names)
+    else:
+        df = pd.DataFrame({names[0] if names else 'key': keys})
+    for column, array in columns.items():
+        df[column] = array
+
+    if nonzero:
+        keep = (np.abs(np.column_stack(list(columns.values()))) > tol).any(axis = 1)
+        df = df[keep].reset_index(drop = True)
+    return df
+
+
+def frame(model, variables, names = None, nonzero = False, tol = 1e-9, attr = 'X'):
+    '''
+    DataFrame of the values of <variables>: a dictionary column name ->
+    group of variables (see values()) of groups sharing the same keys, or a
+    single group (column 'value'). One row per key, in the order of the keys,
+    with the elements of the keys in the columns <names>.
+
+    With <nonzero> only the rows with some value beyond <tol> in absolute
+    value are kept.
+    '''
+    first = next(iter(variables.values()), None) if isinstance(variables, dict) else None
+    groups = variables if isinstance(first, (dict, list, tuple)) or hasattr(first, 'shape') else {'value': variables}
+
+    keys, columns = None, {}
+    for column, group in groups.items():
+        group_keys, columns[column] = values(model, group, attr)
+        if keys is None:
+            keys = group_keys
+        elif group_keys != keys:
+            raise ValueError(f'The variables of {column} do not have the keys of {next(iter(groups))}')
+    return table(keys, columns, names, nonzero, tol)
+
+
+def block_frame(model, x, blocks, names = None, nonzero = False, tol = 1e-9):
+    '''
+    frame() of the variable <blocks> of the lp.LinearModel <model> in the
+    solution <x> (solution(), lp.solve()): a dictionary column name -> block
+    name, or a sequence of block names, of blocks sharing the same keys. The
+    values are picked by position, without touching the solver variables.
+    '''
+    blocks = blocks if isinstance(blocks, dict) else {name: name for name in blocks}
+    x = np.asarray(x)
+    keys, columns = None, {}
+    for column, name in blocks.items():
+        positions, index = model.blocks[name]
+        if keys is None:
+            keys = index
+        elif index != keys:
+            raise ValueError(f'The block {name} does not have the keys of {next(iter(blocks.values()))}')
+        columns[column] = x[positions]
+    return table(keys, columns, names, nonzero, tol)
+
+#%% End of file
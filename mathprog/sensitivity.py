@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Sensitivity Analysis
+*************************************
+
+Reduced costs, duals and ranging of a solved LP read in bulk, one
+model.getAttr call per attribute for a whole group of variables or
+constraints, instead of y[p,t].rc, y[p,t].SAObjLow, ... per element:
+
+    variable_frame()    value ('X'), reduced cost ('RC'), objective
+                        coefficient and its range ('Obj', 'SAObjLow',
+                        'SAObjUp') and bounds of a group of variables
+    constraint_frame()  right-hand side, slack, dual ('Pi') and right-hand
+                        side range ('SARHSLow', 'SARHSUp') of a group of
+                        constraints
+    analyse()           both for every block of a model of the repository
+                        (api.Model or lp.LinearModel), solved with Gurobi
+
+The groups are those of results.values(): tupledicts, dictionaries or
+sequences of variables or constraints, or MVar / MConstr. The frames have one
+row per key, with the elements of the keys in the columns <names>:
+
+    df = sensitivity.constraint_frame(model, c1, ['MACHINE','MONTH'])
+
+The ranging attributes only exist for LPs; analyse() raises ValueError for a
+MIP unless fixed = True, which analyses the LP of the MIP with its integer
+variables fixed at their solution values (model.fixed()). to_arrow() turns
+the frames into pyarrow Tables for the dashboards.
+
+Usage:
+    python -m mathprog.sensitivity fp1 [--fixed]
+"""
+
+#%% Importing libraries
+
+import numpy as np
+
+from mathprog import results
+
+VARIABLE_ATTRS = {'value': 'X', 'reduced_cost': 'RC', 'obj': 'Obj', 'obj_low': 'SAObjLow', 'obj_up': 'SAObjUp',
+                  'lb': 'LB', 'ub': 'UB'}
+CONSTRAINT_ATTRS = {'rhs': 'RHS', 'slack': 'Slack', 'dual': 'Pi', 'rhs_low': 'SARHSLow', 'rhs_up': 'SARHSUp'}
+
+#%% Frames
+
+def _frame(model, group, attrs, names, everything, name_attr):
+    # One getAttr call per attribute of the group (all the variables or constraints of the model when None)
+    if group is None:
+        items = everything()
+        group = dict(zip(model.getAttr(name_attr, items), items))
+    keys, columns = None, {}
+    for column, attr in attrs.items():
+        keys, columns[column] = results.values(model, group, attr)
+    return results.table(keys, columns, names)
+
+
+def variable_frame(model, variables = None, names = None):
+    '''
+    DataFrame of the values, reduced costs, objective coefficients with their
+    ranges and bounds (columns of VARIABLE_ATTRS) of the group <variables>
+    of the solved LP <model>, by default all its variables (keyed by name).
+    '''
+    return _frame(model, variables, VARIABLE_ATTRS, names, model.getVars, 'VarName')
+
+
+def constraint_frame(model, constrs = None, names = None):
+    '''
+    DataFrame of the right-hand sides, slacks, duals and right-hand side
+    ranges (columns of CONSTRAINT_ATTRS) of the group <constrs> of the solved
+    LP <model>, by default all its linear constraints (keyed by name).
+    '''
+    return _frame(model, constrs, CONSTRAINT_ATTRS, names, model.getConstrs, 'ConstrName')
+
+#%% Models of the repository
+
+def analyse(model, fixed = False, env = None):
+    '''
+    Sensitivity analysis of a model of the repository (api.Model or
+    lp.LinearModel) solved with Gurobi in <env>: the columns of
+    variable_frame() for every variable block and of constraint_frame() for
+    every constraint block, keyed as the blocks (one getAttr call per
+    attribute for the whole model).
+
+    Returns a dictionary with the 'objective' value and the dictionaries of
+    DataFrames by block name 'variables' and 'constraints'.
+    '''
+    import gurobipy as gb
+    from mathprog import lp
+
+    linear = getattr(model, 'linear', model)
+    if linear.is_mip and not fixed:
+        raise ValueError(f'{linear.name} has integer variables: ranging needs an LP (fixed = True analyses the '
+                         f'LP with the integer variables fixed)')
+    m, _ = lp.to_gurobi(linear, env)
+    try:
+        m.Params.OutputFlag = 0
+        m.optimize()
+        if fixed and m.IsMIP and m.SolCount:
+            mip, m = m, m.fixed()
+            mip.dispose()
+            m.Params.OutputFlag = 0
+            m.optimize()
+        if m.Status != gb.GRB.OPTIMAL:
+            raise RuntimeError(f'{linear.name} ended with Gurobi status {m.Status}')
+
+        variables, constrs = m.getVars(), m.getConstrs()
+        arrays = {c: np.array(m.getAttr(a, variables)) for c, a in VARIABLE_ATTRS.items()}
+        row_arrays = {c: np.array(m.getAttr(a, constrs)) for c, a in CONSTRAINT_ATTRS.items()}
+        rows = lp.gurobi_rows(linear)    # to_gurobi groups the rows by sense
+        frames = {'objective': m.ObjVal, 'variables': {}, 'constraints': {}}
+        for kind, blocks, columns, at in (('variables', linear.blocks, arrays, lambda positions: positions),
+                                          ('constraints', linear.row_blocks, row_arrays, lambda positions: rows[positions])):
+            for name, (positions, index) in blocks.items():
+                frames[kind][name] = results.table(index, {c: a[at(positions)] for c, a in columns.items()})
+        return frames
+    finally:
+        m.dispose()
+
+
+def to_arrow(frames):
+    '''
+    pyarrow Table of a DataFrame, or dictionary of Tables of a dictionary of
+    DataFrames (as those of analyse()).
+    '''
+    import pyarrow as pa
+
+    if isinstance(frames, dict):
+        return {k: to_arrow(v) if not np.isscalar(v) else v for k, v in frames.items()}
+    return pa.Table.from_pandas(frames, preserve_index = False)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from mathprog import api
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('problem')
+    parser.add_argument('--fixed', action = 'store_true', help = 'analyse a MIP with its integer variables fixed')
+    args = parser.parse_args()
+    frames = analyse(api.build(args.problem), args.fixed)
+    for kind in ('variables', 'constraints'):
+        for name, df in frames[kind].items():
+            print(f'----------------------------------------\n{name}:\n----------------------------------------')
+            print(df.to_string(index = False))
+    print(f'****************************************\nObjective: {frames["objective"]:.6g}')
+
+#%% End of file
@@ -0,0 +1,477 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Solve Service
+*************************************
+
+Local JSON-RPC 2.0 service (HTTP POST on localhost, asyncio, standard library
+only) solving the models of the repository (models.PROBLEMS) for parameter
+payloads sent by the clients:
+
+    - The requests wait in a bounded queue (a full queue rejects new ones)
+      and are dispatched to <workers> long-lived worker processes, each with
+      its own Gurobi environment and workbook parameters kept between solves.
+    - Every request has a time limit, handed to the solver. A worker that
+      goes past the time limit by more than <grace> seconds is terminated and
+      replaced, and the request fails.
+    - A queued request is cancelled by dropping it (it no longer counts
+      toward the queue size). A running one is cancelled by replacing its
+      worker.
+    - A worker process that dies (killed, crashed) fails its request, if any,
+      and is replaced; the service keeps serving with all its workers.
+
+Methods (params as a JSON object):
+
+    problems                            names of the problems
+    solve    {problem, parameters, backend, time_limit}
+                                        submits a request and waits for its result
+    submit   {same as solve}            submits a request, returns {"job": id}
+    status   {job}                      'queued', 'running', 'done', 'failed' or 'cancelled'
+    result   {job, wait}                result of a finished request (waits for it with wait = true)
+    cancel   {job}                      cancels a queued or running request
+    stats                               queue length, jobs by state, workers
+
+<parameters> overrides the parameters read from the workbook of the problem
+(models.load): arrays as (nested) lists, dictionaries as objects, or for
+tuple keys as lists of [key..., value] rows. The Network Flow Template and
+TSP parameters are given by the names of FIELDS. <backend> is one of
+lp.BACKENDS (default 'gurobi'). The result holds the status, the objective
+value, the solve time and the nonzero values of every block of variables as
+[key..., value] rows.
+
+OR-tools and highspy cannot be loaded in the same worker (lp module), so the
+service takes the 'highs' backend only if started without the OR-tools ones.
+
+Usage:
+    python -m mathprog.service [--port 8765] [--workers 2] [--queue 100] [--time-limit 60]
+                               [--backends gurobi glop cbc scip]
+
+    from mathprog import service
+    service.call('solve', {'problem': 'fp1', 'parameters': {'profit': [10, 6, 8, 4, 11, 9, 3]}})
+"""
+
+#%% Importing libraries
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import time
+
+FIELDS = {'nft': ('nodes', 'b', 'tails', 'heads', 'c', 'l', 'u'), 'tsp': ('vertices', 'ei', 'ej', 'd')}
+ORTOOLS = {'glop', 'cbc', 'scip'}
+
+#%% Worker processes
+
+_env = None
+_loaded = {}
+
+
+def read_parameters(problem, payload = None):
+    '''
+    Parameters of <problem> read from its workbook, with the overrides of the
+    JSON <payload> (see the module documentation).
+    '''
+    import numpy as np
+    from mathprog import models
+
+    if problem not in models.PROBLEMS:
+        raise ValueError(f'Unknown problem: {problem}')
+    if problem not in _loaded:
+        _loaded[problem] = models.load(problem)
+    base = _loaded[problem]
+    if not payload:
+        return base
+
+    fields = FIELDS.get(problem)
+    data = dict(zip(fields, base)) if fields else dict(base)
+    for key, value in payload.items():
+        if key not in data:
+            raise ValueError(f'Unknown parameter of {problem}: {key}')
+        current = data[key]
+        if isinstance(current, np.ndarray):
+            value = np.asarray(value, dtype = current.dtype)
+            if value.ndim != current.ndim:
+                raise ValueError(f'{key} must have {current.ndim} dimensions')
+        elif isinstance(current, dict):
+            rows = value.items() if isinstance(value, dict) else ((tuple(r[:-1]) if len(r) > 2 else r[0], r[-1]) for r in value)
+            value = {**current, **dict(rows)}
+        elif hasattr(current, 'to_numpy'):    # pandas Index of the network nodes
+            value = type(current)(value)
+        data[key] = value
+    return tuple(data[f] for f in fields) if fields else data
+
+
+def solve_request(problem, parameters = None, backend = 'gurobi', time_limit = None):
+    '''
+    Solves <problem> for the <parameters> payload with <backend>. Returns the
+    result as a JSON serializable dictionary.
+    '''
+    global _env
+    import numpy as np
+    from mathprog import lp, models
+
+    data = read_parameters(problem, parameters)
+    if backend == 'gurobi' and _env is None:
+        from mathprog import pool
+        _env = pool.start_env({'Threads': 1})
+    env = _env if backend == 'gurobi' else None
+
+    begin = time.perf_counter()
+    if problem == 'tsp':
+        objective, x, solves = models.solve_tsp(data, backend, time_limit, env)
+        declared = models.tsp(data)
+    else:
+        declared = models.PROBLEMS[problem][2](data)
+        objective, x = lp.solve(declared, backend, time_limit, env)
+    elapsed = time.perf_counter() - begin
+
+    values = {}
+    for name, (positions, index) in declared.blocks.items():
+        block = np.asarray(x)[positions]    # The TSP returns the values of its only block, the edges
+        rows = []
+        for j in np.flatnonzero(np.abs(block) > 1e-9).tolist():
+            key = index[j]
+            rows.append([*key, block[j].item()] if isinstance(key, tuple) else [key, block[j].item()])
+        values[name] = rows
+    return {'problem': problem, 'backend': backend, 'status': 'optimal', 'objective': float(objective),
+            'solve_time': elapsed, 'values': values}
+
+
+def _serve(conn):
+    # Worker process: solves the requests received through the pipe until it receives None. The model layer is
+    # imported up front, so the first request does not pay for it
+    import scipy.sparse
+    from mathprog import lp, models
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:    # The service ended without stopping its workers
+            break
+        if request is None:
+            break
+        try:
+            conn.send(('ok', solve_request(**request)))
+        except Exception as e:
+            conn.send(('error', f'{type(e).__name__}: {e}'))
+
+
+class _Worker:
+    # Worker process and the parent end of its pipe
+
+    def __init__(self):
+        self.start()
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target = _serve, args = (child,), daemon = True)
+        self.process.start()
+        child.close()
+
+    def restart(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+        self.start()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout = 5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+#%% Service
+
+class RPCError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, INTERNAL_ERROR = -32700, -32600, -32601, -32602, -32603
+JOB_FAILED, QUEUE_FULL, CANCELLED, UNKNOWN_JOB = -32000, -32001, -32002, -32003
+
+
+class Job:
+    '''
+    Request of a solve: its parameters, state and (when finished) result.
+    '''
+
+    def __init__(self, id, request):
+        self.id = id
+        self.request = request
+        self.state = 'queued'
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.done = asyncio.Event()
+
+    def finish(self, state, result = None, error = None):
+        self.state, self.result, self.error = state, result, error
+        self.done.set()
+
+
+class Service:
+    '''
+    The solve service (see the module documentation). start() opens the HTTP
+    server and the workers; close() stops them.
+    '''
+
+    def __init__(self, workers = 2, queue_size = 100, time_limit = 60.0, grace = 5.0,
+                 backends = ('gurobi', 'glop', 'cbc', 'scip'), keep = 1000):
+        if 'highs' in backends and ORTOOLS & set(backends):
+            raise ValueError('The highs backend cannot be served with the OR-tools backends')
+        self.n_workers = workers
+        self.queue_size = queue_size
+        self.time_limit = time_limit
+        self.grace = grace
+        self.backends = tuple(backends)
+        self.keep = keep    # Finished jobs kept for status/result calls
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self.server = None
+
+    async def start(self, host = '127.0.0.1', port = 8765):
+        self.queue = asyncio.Queue()    # Bounded by <queue_size> queued jobs, the cancelled ones not counted
+        self.queued = 0
+        self.workers = [_Worker() for _ in range(self.n_workers)]
+        self._tasks = [asyncio.create_task(self._dispatch(worker)) for worker in self.workers]
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions = True)
+        for worker in self.workers:
+            worker.stop()
+
+    #-------------- Jobs
+
+    def submit(self, problem, parameters = None, backend = 'gurobi', time_limit = None):
+        if backend not in self.backends:
+            raise RPCError(INVALID_PARAMS, f'Backend not served: {backend} (served: {", ".join(self.backends)})')
+        if not isinstance(problem, str):
+            raise RPCError(INVALID_PARAMS, 'problem must be a string')
+        try:
+            limit = self.time_limit if time_limit is None else min(float(time_limit), self.time_limit)
+        except (TypeError, ValueError):
+            raise RPCError(INVALID_PARAMS, f'time_limit must be a number of seconds: {time_limit!r}')
+        if not limit > 0:
+            raise RPCError(INVALID_PARAMS, f'time_limit must be positive: {time_limit!r}')
+        job = Job(next(self._ids), {'problem': problem, 'parameters': parameters, 'backend': backend,
+                                    'time_limit': limit})
+        if self.queued >= self.queue_size:
+            raise RPCError(QUEUE_FULL, f'Queue full ({self.queue_size} requests)')
+        self.queue.put_nowait(job)
+        self.queued += 1
+        self.jobs[job.id] = job
+        self._forget()
+        return job
+
+    def _forget(self):
+        # Drops the oldest finished jobs beyond <keep>
+        finished = [k for k, job in self.jobs.items() if job.done.is_set()]
+        for k in finished[:max(0, len(finished) - self.keep)]:
+            del self.jobs[k]
+
+    def cancel(self, job):
+        if job.done.is_set():
+            return False
+        job.cancelled = True
+        if job.state == 'queued':
+            self.queued -= 1
+            job.finish('cancelled', error = 'Cancelled')
+        return True
+
+    async def _dispatch(self, worker):
+        # Runs the queued jobs on <worker> one at a time. A worker that died while idle is replaced before it is
+        # sent a job. One that dies solving closes its pipe: poll() then reports data and recv() raises, the job
+        # fails and the worker is replaced
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.cancelled:    # Already taken out of the count by cancel()
+                continue
+            self.queued -= 1
+            job.state = 'running'
+            deadline = time.monotonic() + job.request['time_limit'] + self.grace
+            try:
+                if not worker.process.is_alive():
+                    await loop.run_in_executor(None, worker.restart)
+                try:
+                    worker.conn.send(job.request)
+                except OSError:    # Died since the check: the job never reached it
+                    await loop.run_in_executor(None, worker.restart)
+                    worker.conn.send(job.request)
+                while not await loop.run_in_executor(None, worker.conn.poll, 0.05):
+                    if job.cancelled or time.monotonic() > deadline:
+                        await loop.run_in_executor(None, worker.restart)
+                        job.finish('cancelled' if job.cancelled else 'failed',
+                                   error = 'Cancelled' if job.cancelled else 'Time limit exceeded')
+                        break
+                else:
+                    kind, value = worker.conn.recv()
+                    job.finish('done' if kind == 'ok' else 'failed', result = value if kind == 'ok' else None,
+                               error = None if kind == 'ok' else value)
+            except (OSError, EOFError):
+                await loop.run_in_executor(None, worker.restart)
+                job.finish('failed', error = 'Worker process died')
+            except Exception as e:    # Keeps the worker slot serving whatever went wrong with this job
+                await loop.run_in_executor(None, worker.restart)
+                job.finish('failed', error = f'{type(e).__name__}: {e}')
+
+    #-------------- JSON-RPC
+
+    def _job(self, params):
+        try:
+            return self.jobs[int(params['job'])]
+        except (KeyError, TypeError, ValueError):
+            raise RPCError(UNKNOWN_JOB, f'Unknown job: {params.get("job")}')
+
+    @staticmethod
+    def _outcome(job):
+        if job.state == 'done':
+            return job.result
+        raise RPCError(CANCELLED if job.state == 'cancelled' else JOB_FAILED, job.error)
+
+    async def call(self, method, params):
+        '''
+        Result of the JSON-RPC <method> with <params>.
+        '''
+        from mathprog import models
+
+        if method == 'problems':
+            return list(models.PROBLEMS)
+        if method in ('solve', 'submit'):
+            try:
+                job = self.submit(**params)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+            if method == 'submit':
+                return {'job': job.id}
+            await job.done.wait()
+            return self._outcome(job)
+        if method == 'status':
+            return self._job(params).state
+        if method == 'result':
+            job = self._job(params)
+            if params.get('wait', True):
+                await job.done.wait()
+            elif not job.done.is_set():
+                return None
+            return self._outcome(job)
+        if method == 'cancel':
+            return self.cancel(self._job(params))
+        if method == 'stats':
+            states = [job.state for job in self.jobs.values()]
+            return {'queued': self.queued, 'workers': self.n_workers,
+                    'jobs': {state: states.count(state) for state in set(states)}}
+        raise RPCError(METHOD_NOT_FOUND, f'Method not found: {method}')
+
+    async def _respond(self, body):
+        # JSON-RPC response of the request <body>
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return {'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': 'Parse error'}}
+        id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise RPCError(INVALID_REQUEST, 'Invalid request')
+            params = request.get('params') or {}
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, 'params must be an object')
+            return {'jsonrpc': '2.0', 'id': id, 'result': await self.call(request['method'], params)}
+        except RPCError as e:
+            return {'jsonrpc': '2.0', 'id': id, 'error': {'code': e.code, 'message': str(e)}}
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': id, 'error': {'code': INTERNAL_ERROR, 'message': f'Internal error: '
+                                                          f'{type(e).__name__}: {e}'}}
+
+    async def _handle(self, reader, writer):
+        # One HTTP request per connection: POST with a JSON-RPC body
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            if not request_line.startswith(b'POST'):
+                status, response = '405 Method Not Allowed', {'error': 'POST a JSON-RPC request'}
+            else:
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, response = '200 OK', await self._respond(body)
+            payload = json.dumps(response, default = _json_default).encode()
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode() + payload)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json_default(value):
+    # NumPy scalars (keys of the network and TSP models) as Python numbers
+    return value.item() if hasattr(value, 'item') else str(value)
+
+#%% Client
+
+def call(method, params = None, url = 'http://127.0.0.1:8765', timeout = None):
+    '''
+    Calls <method> of a running service. Returns the result, or raises
+    RuntimeError with the message of the JSON-RPC error.
+    '''
+    import urllib.request
+
+    body = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or {}}).encode()
+    request = urllib.request.Request(url, body, {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout = timeout) as response:
+        answer = json.loads(response.read())
+    if 'error' in answer:
+        raise RuntimeError(f'{answer["error"]["message"]} (code {answer["error"]["code"]})')
+    return answer['result']
+
+#%% Command line
+
+async def serve(host, port, **options):
+    '''
+    Runs the service until interrupted.
+    '''
+    service = Service(**options)
+    address = await service.start(host, port)
+    print(f'Serving {", ".join(service.backends)} on http://{address[0]}:{address[1]} with {service.n_workers} workers',
+          flush = True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--workers', type = int, default = 2)
+    parser.add_argument('--queue', type = int, default = 100, help = 'largest number of queued requests')
+    parser.add_argument('--time-limit', type = float, default = 60, help = 'largest time limit of a request (s)')
+    parser.add_argument('--backends', nargs = '+', default = ['gurobi', 'glop', 'cbc', 'scip'])
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, workers = args.workers, queue_size = args.queue,
+                          time_limit = args.time_limit, backends = args.backends))
+    except KeyboardInterrupt:
+        pass
+
+#%% End of file
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Food Manufacture Scenario Sweep
+*************************************
+
+Solves the Food Manufacture models (food.build_fm1 / food.build_fm2) for
+many parameter sets across a process pool:
+
+    - The scenarios are either the workbooks of a directory (one parameter
+      set per workbook) or a grid of overrides of a base workbook, e.g.
+      PRICE = 140..160 × COST_SCALE = 0.9, 1.0, 1.1 (scenario_grid).
+    - Every worker process opens its own Gurobi environment once, with the
+      Threads parameter set to its share of the <threads> available, so the
+      workers do not oversubscribe the cores.
+    - The results (one row per scenario) are written to a Parquet or CSV
+      file in batches while the sweep runs.
+
+Overrides: any scalar of the Scalars sheet (PRICE, HL, HU, ...), COST_SCALE
+(multiplies every cost) and HARDNESS_SCALE (multiplies every hardness).
+Scenarios that only override PRICE and COST_SCALE change nothing but the
+objective, so each worker keeps one built model per workbook for them and
+re-solves it in place (food.set_objective) from the previous basis. Only the
+LIVE_MODELS most recently used workbooks keep their model (and parameters),
+so a sweep over a directory of workbooks does not hold a model per file.
+
+Usage:
+    python -m mathprog.sweep fm1 --workbook "1. Food Manufacture I/Parameters.xlsx"
+                             --grid PRICE=140:160:5 COST_SCALE=0.9,1,1.1
+                             [--workers 4] [--threads 8] [--output sweep.parquet]
+    python -m mathprog.sweep fm2 --directory scenarios/ [--output sweep.csv]
+"""
+
+#%% Importing libraries
+
+import collections
+import itertools
+import os
+import time
+
+import numpy as np
+
+from mathprog import food
+
+MODELS = {'fm1': food.build_fm1, 'fm2': food.build_fm2}
+SCALES = {'COST_SCALE': 'costs', 'HARDNESS_SCALE': 'hardness'}
+OBJECTIVE = {'PRICE', 'COST_SCALE'}    # Overrides that only change objective coefficients
+LIVE_MODELS = 4    # Workbooks whose built model and parameters every worker keeps
+
+#%% Scenarios
+
+def scenario_grid(workbook, **values):
+    '''
+    Scenarios of the cartesian product of the override <values> (lists by
+    override name) applied to the parameters of <workbook>.
+    '''
+    names = list(values)
+    return [dict(zip(names, combination), name = f'scenario_{k}', workbook = workbook)
+            for k, combination in enumerate(itertools.product(*(values[n] for n in names)))]
+
+
+def directory_scenarios(directory):
+    '''
+    One scenario per workbook (*.xlsx) of <directory>, named after the file.
+    '''
+    files = sorted(f for f in os.listdir(directory) if f.endswith('.xlsx') and not f.startswith('~$'))
+    return [{'name': os.path.splitext(f)[0], 'workbook': os.path.join(directory, f)} for f in files]
+
+
+def apply_scenario(data, scenario):
+    '''
+    Copy of the model parameters <data> with the overrides of the scenario.
+    The entries that are not overridden are shared with <data>.
+    '''
+    data = dict(data)
+    for key, value in scenario.items():
+        if key in ('name', 'workbook'):
+            continue
+        if key in SCALES:
+            entry = SCALES[key]
+            data[entry] = {k: v*value for k, v in data[entry].items()}
+        elif key in data['scalars']:
+            data['scalars'] = dict(data['scalars'], **{key: value})
+        else:
+            raise ValueError(f'Unknown scenario parameter: {key}')
+    return data
+
+#%% Worker
+
+_env = None
+_workbooks = collections.OrderedDict()    # workbook -> parameters, least recently used first
+_live = collections.OrderedDict()    # (model, workbook) -> built model, refine and buy variables, least recently used first
+
+
+def _recent(cache, key, make, dispose = None):
+    # Entry <key> of the LRU <cache>, made when missing; the least recently used entries beyond LIVE_MODELS are dropped
+    if key in cache:
+        cache.move_to_end(key)
+    else:
+        cache[key] = make()
+        while len(cache) > LIVE_MODELS:
+            _, value = cache.popitem(last = False)
+            if dispose is not None:
+                dispose(value)
+    return cache[key]
+
+
+def _close_worker():
+    # Disposes the kept models and the environment of the worker
+    global _env
+    for m, _, _ in _live.values():
+        m.dispose()
+    _live.clear()
+    _workbooks.clear()
+    if _env is not None:
+        _env.dispose()
+        _env = None
+
+
+def _init_worker(threads):
+    # One Gurobi environment per worker process, reused by all its scenarios
+    global _env
+    import gurobipy as gb
+
+    _close_worker()
+    _env = gb.Env(empty = True)
+    _env.setParam('OutputFlag', 0)
+    if threads:
+        _env.setParam('Threads', threads)
+    _env.start()
+
+
+def solve_scenario(model, scenario, env = None, incremental = True):
+    '''
+    Builds and solves <model> ('fm1' or 'fm2') for the scenario. With
+    <incremental>, scenarios that only change the objective re-solve the
+    model kept for their workbook instead.
+
+    Returns the row of the results table: name, overrides, status, objective
+    value, tons refined and bought, and solver / wall time.
+    '''
+    begin = time.perf_counter()
+    env = env if env is not None else _env
+    workbook = scenario['workbook']
+    base = _recent(_workbooks, workbook, lambda: food.read_parameters(workbook))
+    data = apply_scenario(base, scenario)
+
+    overrides = set(scenario) - {'name', 'workbook'}
+    reuse = incremental and overrides <= OBJECTIVE
+    if reuse:
+        m, refine, buy = _recent(_live, (model, workbook), lambda: MODELS[model](base, env = env)[:3],
+                                 lambda live: live[0].dispose())
+        food.set_objective(m, refine, buy, data['scalars']['PRICE'], data['costs'])
+    else:
+        m, refine, buy = MODELS[model](data, env = env)[:3]
+    try:
+        m.optimize()
+        solved = m.SolCount > 0
+        row = dict(scenario, model = model, status = m.Status,
+                   objval = m.ObjVal if solved else np.nan,
+                   refined = sum(m.getAttr('X', refine.values())) if solved else np.nan,
+                   bought = sum(m.getAttr('X', buy.values())) if solved else np.nan,
+                   runtime = m.Runtime)
+    finally:
+        if not reuse:
+            m.dispose()
+    row['wall'] = time.perf_counter() - begin
+    return row
+
+
+def _solve_chunk(model, scenarios, incremental = True):
+    return [solve_scenario(model, scenario, incremental = incremental) for scenario in scenarios]
+
+#%% Output
+
+class _Writer:
+    # Appends batches of rows to a Parquet (pyarrow) or CSV file, with the columns of the first batch
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.columns = None
+        self.writer = None
+
+    def write(self, rows):
+        import pandas as pd
+
+        df = pd.DataFrame(rows)
+        if self.columns is None:
+            self.columns = list(df.columns)
+        df = df.reindex(columns = self.columns)
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index = False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            df.to_csv(self.path, mode = 'a' if self.writer else 'w', header = not self.writer, index = False)
+            self.writer = True
+
+    def close(self):
+        if self.parquet and self.writer is not None:
+            self.writer.close()
+
+#%% Sweep
+
+def run(model, scenarios, workers = None, threads = None, output = None, chunk_size = 8, batch_size = 256,
+        incremental = True):
+    '''
+    Solves <model> ('fm1' or 'fm2') for every scenario on <workers> processes
+    (os.cpu_count() by default, 1 solves in this process) sharing <threads>
+    Gurobi threads (os.cpu_count() by default).
+
+    With <output> (a .parquet or .csv path) the rows are written in batches of
+    <batch_size> as the scenarios are solved and the returned table is None;
+    otherwise the whole table is returned as a DataFrame.
+
+    <incremental> re-solves the objective-only scenarios in place
+    (solve_scenario).
+
+    Returns the table and the statistics 'scenarios', 'wall' and 'throughput'
+    (scenarios per second).
+    '''
+    import pandas as pd
+
+    if model not in MODELS:
+        raise ValueError(f'Unknown model: {model}')
+    workers = workers or os.cpu_count()
+    threads = threads or os.cpu_count()
+    per_worker = max(1, threads//workers)
+    chunks = [scenarios[k:k + chunk_size] for k in range(0, len(scenarios), chunk_size)]
+
+    writer = _Writer(output) if output else None
+    rows, batch = [], []
+    begin = time.perf_counter()
+
+    def collect(chunk_rows):
+        batch.extend(chunk_rows)
+        if writer is None:
+            rows.extend(chunk_rows)
+        elif len(batch) >= batch_size:
+            writer.write(batch)
+            batch.clear()
+
+    try:
+        if workers == 1:
+            _init_worker(per_worker)
+            try:
+                for chunk in chunks:
+                    collect(_solve_chunk(model, chunk, incremental))
+            finally:
+                _close_worker()
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(workers, initializer = _init_worker, initargs = (per_worker,)) as pool:
+                for chunk_rows in pool.map(_solve_chunk, itertools.repeat(model), chunks, itertools.repeat(incremental)):
+                    collect(chunk_rows)
+        if writer is not None and batch:
+            writer.write(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    wall = time.perf_counter() - begin
+    stats = {'scenarios': len(scenarios), 'wall': wall, 'throughput': len(scenarios)/wall if wall > 0 else np.inf}
+    return (pd.DataFrame(rows) if writer is None else None), stats
+
+#%% Command line
+
+def _values(spec):
+    # 'start:stop:step' (stop included) or comma separated values
+    if ':' in spec:
+        start, stop, step = (float(v) for v in spec.split(':'))
+        return np.arange(start, stop + step/2, step).tolist()
+    return [float(v) for v in spec.split(',')]
+
+
+def main(argv = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description = __doc__, formatter_class = argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('model', choices = sorted(MODELS))
+    parser.add_argument('--workbook', default = 'Parameters.xlsx', help = 'base workbook of the --grid scenarios')
+    parser.add_argument('--grid', nargs = '+', default = [], metavar = 'NAME=VALUES')
+    parser.add_argument('--directory', help = 'directory with one workbook per scenario')
+    parser.add_argument('--workers', type = int)
+    parser.add_argument('--threads', type = int)
+    parser.add_argument('--output', default = 'sweep.parquet')
+    args = parser.parse_args(argv)
+
+    if args.directory:
+        scenarios = directory_scenarios(args.directory)
+    else:
+        grid = dict(spec.split('=', 1) for spec in args.grid)
+        scenarios = scenario_grid(args.workbook, **{k: _values(v) for k, v in grid.items()})
+    _, stats = run(args.model, scenarios, args.workers, args.threads, args.output)
+    print(f"{stats['scenarios']} scenarios in {stats['wall']:.2f} s ({stats['throughput']:.1f} scenarios/s) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
+
+#%% End of file
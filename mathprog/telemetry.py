@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Solve Telemetry
+*************************************
+
+Phase timers and solver statistics of the model scripts, emitted as one JSON
+line per run. A script marks where each phase starts; a phase ends where the
+next one starts (or at finish()), so the cells of a script are timed without
+re-indenting them:
+
+    run = telemetry.start('Factory Planning I')
+    run.phase('read')           # Excel read
+    ...
+    run.phase('parameters')     # dictionaries / arrays of the parameters
+    ...
+    run.phase('variables')
+    ...
+    run.phase('constraints')
+    ...
+    run.phase('optimize')
+    run.optimize(model)         # model.optimize(), recording presolve reductions
+    run.phase('report')
+    ...
+    run.finish(model)
+
+The record holds the seconds of every phase, the solver statistics of the
+model given to finish() (Gurobi: Status, ObjVal, Runtime, IterCount,
+BarIterCount, NodeCount, MIPGap, sizes and presolved sizes; OR-tools: wall
+time, iterations, nodes and sizes) and the peak resident memory of the
+process (MB).
+
+Telemetry is off unless the MATHPROG_TELEMETRY environment variable is set
+(or enable() is called): '1' or '-' writes the records to stderr, any other
+value is the path of a file the records are appended to. When off, start()
+returns a run whose methods do nothing, so the scripts pay one attribute
+lookup per mark.
+"""
+
+#%% Importing libraries
+
+import json
+import os
+import sys
+import time
+
+_target = os.environ.get('MATHPROG_TELEMETRY') or None
+
+#%% Switch
+
+def enable(target = '-'):
+    '''
+    Turns telemetry on: '-' writes the records to stderr, anything else is the
+    path of the file they are appended to. None turns it off.
+    '''
+    global _target
+    _target = target
+
+
+def enabled():
+    return _target is not None
+
+
+def _emit(record):
+    line = json.dumps(record, default = str)
+    if _target in ('-', '1'):
+        print(line, file = sys.stderr, flush = True)
+    else:
+        with open(_target, 'a') as f:
+            f.write(line + '\n')
+
+#%% Measurements
+
+def peak_rss():
+    '''
+    Peak resident memory of the process in MB (None where it cannot be read).
+    '''
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)/2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak/2**20 if sys.platform == 'darwin' else peak/2**10    # Bytes on macOS, KB on Linux
+
+
+GUROBI_ATTRS = ('Status', 'ObjVal', 'ObjBound', 'Runtime', 'IterCount', 'BarIterCount', 'NodeCount', 'MIPGap',
+                'NumVars', 'NumConstrs', 'NumNZs', 'NumIntVars', 'SolCount')
+
+
+def solver_stats(model):
+    '''
+    Statistics of a solved gurobipy Model or pywraplp Solver. Attributes that
+    do not apply (NodeCount of an LP, ObjVal without a solution) are left out.
+    '''
+    stats = {}
+    if hasattr(model, 'getAttr'):
+        stats['solver'] = 'gurobi'
+        for attr in GUROBI_ATTRS:
+            try:
+                stats[attr] = model.getAttr(attr)
+            except Exception:
+                pass
+    elif hasattr(model, 'wall_time'):
+        stats['solver'] = model.SolverVersion()
+        stats.update(wall_time = model.wall_time()/1000, variables = model.NumVariables(),
+                     constraints = model.NumConstraints(), iterations = model.iterations())
+        if model.NumVariables() and any(v.integer() for v in model.variables()):    # Nodes of MIP solvers only
+            stats['nodes'] = model.nodes()
+        try:
+            stats['objective'] = model.Objective().Value()
+        except Exception:
+            pass
+    return stats
+
+#%% Runs
+
+class Run:
+    '''
+    Telemetry of one run of a script (see the module documentation).
+    '''
+
+    def __init__(self, name, **tags):
+        self.name = name
+        self.tags = tags
+        self.phases = {}
+        self.presolve = {}
+        self.begin = time.perf_counter()
+        self.current, self.since = None, self.begin
+
+    def phase(self, name):
+        '''
+        Ends the current phase and starts <name>. A phase entered more than
+        once adds up its times.
+        '''
+        now = time.perf_counter()
+        if self.current is not None:
+            self.phases[self.current] = self.phases.get(self.current, 0.0) + now - self.since
+        self.current, self.since = name, now
+
+    def optimize(self, model, callback = None):
+        '''
+        model.optimize(), with a callback that records the rows and columns
+        removed by presolve (chained with <callback>, if any).
+        '''
+        import gurobipy as gb
+
+        def record(model, where):
+            if where == gb.GRB.Callback.PRESOLVE:
+                self.presolve['rows_removed'] = model.cbGet(gb.GRB.Callback.PRE_ROWDEL)
+                self.presolve['cols_removed'] = model.cbGet(gb.GRB.Callback.PRE_COLDEL)
+            if callback is not None:
+                callback(model, where)
+        model.optimize(record)
+
+    def finish(self, model = None, **values):
+        '''
+        Ends the current phase and emits the record, with the statistics of
+        <model> (gurobipy Model or pywraplp Solver) and any other <values>.
+        '''
+        self.phase(None)
+        record = {'run': self.name, 'script': os.path.basename(sys.argv[0]) or None,
+                  'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **self.tags,
+                  'phases': {k: round(v, 6) for k, v in self.phases.items()},
+                  'total': round(time.perf_counter() - self.begin, 6)}
+        if model is not None:
+            record['stats'] = solver_stats(model)
+            if self.presolve:
+                record['stats'].update(self.presolve)
+                if 'NumVars' in record['stats']:
+                    record['stats']['presolved_rows'] = record['stats']['NumConstrs'] - self.presolve['rows_removed']
+                    record['stats']['presolved_cols'] = record['stats']['NumVars'] - self.presolve['cols_removed']
+        record.update(values)
+        record['peak_rss_mb'] = peak_rss()
+        _emit(record)
+        return record
+
+
+class _NullRun:
+    # Run of disabled telemetry: every mark is a no-op, optimize() only optimizes
+
+    def phase(self, name):
+        pass
+
+    def optimize(self, model, callback = None):
+        if callback is None:
+            model.optimize()
+        else:
+            model.optimize(callback)
+
+    def finish(self, model = None, **values):
+        return None
+
+
+_NULL = _NullRun()
+
+
+def start(name, **tags):
+    '''
+    Run of the script <name> (with optional <tags> in its record), or a run
+    that does nothing if telemetry is off.
+    '''
+    return Run(name, **tags) if _target is not None else _NULL
+
+#%% End of file
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+"""
+*************************************
+ Traveling Salesman Problem (TSP)
+*************************************
+
+Model and solution procedures of 'Problem - Traveling Salesman (TSP).py':
+
+    minimize    ∑(i,j)∈E c_ij*x_ij
+
+    subject to
+
+    ∑j∈V x_ij = 2,  ∀i∈V
+
+    ∑i,j∈S,i≠j x_ij ≤ |S| − 1,  ∀ S⊂V, S ≠ {}
+
+    x_ij∈{0,1}
+
+The subtour elimination constraints are too many to be written up front, two
+procedures add them as needed:
+
+    solve_loop()    The procedure of the script: optimize, look for subtours in
+                    the solution, add their constraints and optimize again from
+                    scratch until the solution is a single tour.
+    solve_lazy()    The constraints are added as lazy constraints from a MIPSOL
+                    callback, so a single branch and bound tree is explored.
+
+Both return a dictionary with the statistics of the solve: 'iterations'
+(optimizations or callbacks that found subtours), 'cuts', 'runtime' and
+'nodes' (as reported by Gurobi) and 'wall' (seconds).
+
+For large instances the complete graph, n(n-1)/2 variables, is the bottleneck.
+solve_sparse() solves the model over the k-nearest-neighbour graph instead and
+prices the missing edges back in with the reduced costs of the LP relaxation,
+so the tour it returns is still optimal over the complete graph.
+
+A heuristic tour (heuristics module) can be given to either model as MIP
+start with set_start(), or to solve_sparse() in <tours>, where
+nearest_tour() builds one without the n×n distance matrix.
+"""
+
+#%% Importing libraries
+
+import time
+
+import numpy as np
+
+#%% Data
+
+def _triangle(n):
+    # Positions (i,j), i < j, ordered by j and then by i
+    counts = np.arange(n)
+    ej = np.repeat(counts, counts)
+    ei = np.arange(len(ej)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return ei, ej
+
+
+def _by_column(n, column):
+    # Fills the distances of the triangle one column j (pairs i < j) at a time
+    d = np.empty(n*(n - 1)//2)
+    start = 0
+    for j in range(1, n):
+        d[start:start + j] = column(j)
+        start += j
+    return d
+
+
+def matrix_edges(df_matrix):
+    '''
+    Edges of the complete graph from a distance matrix sheet (first column with
+    the city names, then one column per city). Only the upper triangle is used,
+    i.e. the edges (i,j) with i before j, ordered as the rows of
+    melt(df_matrix) after dropping the (i,i) and duplicate (j,i) edges.
+
+    Returns the list of vertices, the end point positions ei, ej and the
+    distances, as arrays.
+    '''
+    vertices = df_matrix.iloc[:, 0].tolist()
+    matrix = np.asfortranarray(df_matrix.set_index(df_matrix.columns[0])[vertices].to_numpy(dtype = float))
+    n = len(vertices)
+    ei, ej = _triangle(n)
+    return vertices, ei, ej, _by_column(n, lambda j: matrix[:j, j])
+
+
+def _pair_distance(X, Y, metric = 'euclidean', radius = 6371.0):
+    # Function returning the distances between the vertices at positions i and j (arrays or scalars)
+    X = np.asarray(X, dtype = float)
+    Y = np.asarray(Y, dtype = float)
+    if metric == 'euclidean':
+        return lambda i, j: np.hypot(X[i] - X[j], Y[i] - Y[j])
+    if metric == 'haversine':
+        lon, lat = np.radians(X), np.radians(Y)
+        cos_lat = np.cos(lat)
+        def distance(i, j):
+            h = np.sin((lat[j] - lat[i])/2)**2 + cos_lat[i]*cos_lat[j]*np.sin((lon[j] - lon[i])/2)**2
+            return 2*radius*np.arcsin(np.sqrt(h))
+        return distance
+    raise ValueError(f'Unknown distance metric: {metric}')
+
+
+def coordinate_edges(df_coord, metric = 'euclidean', radius = 6371.0):
+    '''
+    Edges of the complete graph with the distances computed from the coordinates
+    sheet (cities as index, X and Y columns), without the n×n matrix.
+
+    metric: 'euclidean' or 'haversine' (X longitude and Y latitude in degrees,
+            great-circle distance on a sphere of the given <radius>, km).
+
+    Returns the same as matrix_edges().
+    '''
+    vertices = df_coord.index.tolist()
+    distance = _pair_distance(df_coord['X'], df_coord['Y'], metric, radius)
+    n = len(vertices)
+    ei, ej = _triangle(n)
+    return vertices, ei, ej, _by_column(n, lambda j: distance(slice(0, j), j))
+
+
+def distance_matrix(df_coord, metric = 'euclidean', radius = 6371.0):
+    '''
+    n×n distance matrix computed from the coordinates sheet, for the
+    heuristics module.
+    '''
+    distance = _pair_distance(df_coord['X'], df_coord['Y'], metric, radius)
+    positions = np.arange(len(df_coord))
+    return distance(positions[:, None], positions[None, :])
+
+
+def _unique_edges(n, ei, ej):
+    # Edges as (min, max) position pairs without duplicates, ordered as _triangle()
+    ei, ej = np.minimum(ei, ej), np.maximum(ei, ej)
+    keys = np.unique(ej.astype(np.int64)*n + ei)
+    return keys % n, keys // n
+
+
+def tour_edges(tour):
+    '''
+    Edges (ei, ej) of the closed tour visiting the vertex positions in <tour>.
+    '''
+    tour = np.asarray(tour)
+    return tour, np.roll(tour, -1)
+
+
+def _points(X, Y, metric):
+    # Points of the KD-trees: the coordinates, or points on the unit sphere for the 'haversine' metric, whose chord
+    # distances rank the neighbours as the great circle
+    X = np.asarray(X, dtype = float)
+    Y = np.asarray(Y, dtype = float)
+    if metric == 'haversine':
+        lon, lat = np.radians(X), np.radians(Y)
+        return np.column_stack((np.cos(lat)*np.cos(lon), np.cos(lat)*np.sin(lon), np.sin(lat)))
+    return np.column_stack((X, Y))
+
+
+def knn_edges(X, Y, k = 10, metric = 'euclidean', tours = ()):
+    '''
+    Sparse candidate graph: every vertex joined to its <k> nearest neighbours,
+    found with a KD-tree over the coordinates, plus the edges of the given
+    <tours> (sequences of vertex positions), so that the graph has at least
+    one Hamiltonian cycle. If no tour is given, the tour visiting the vertices
+    in order is used. O(n·k) edges.
+
+    For the 'haversine' metric the tree is built over points on the unit
+    sphere, whose chord distances rank the neighbours as the great circle.
+    '''
+    from scipy.spatial import cKDTree
+
+    points = _points(X, Y, metric)
+    n = len(points)
+    k = min(k, n - 1)
+    _, neighbours = cKDTree(points).query(points, k + 1)
+
+    ei = [np.repeat(np.arange(n), k)]
+    ej = [neighbours[:, 1:].ravel()]
+    for tour in (tours or [np.arange(n)]):
+        ti, tj = tour_edges(tour)
+        ei.append(ti)
+        ej.append(tj)
+    ei, ej = np.concatenate(ei), np.concatenate(ej)
+    keep = ei != ej    # Points sharing coordinates can be returned as their own neighbours
+    return _unique_edges(n, ei[keep], ej[keep])
+
+
+def nearest_tour(X, Y, k = 10, metric = 'euclidean', start = 0):
+    '''
+    Nearest neighbour tour (vertex positions) from the coordinates, without
+    the n×n matrix of heuristics.nearest_neighbour(): the next vertex is the
+    closest one not yet visited among the <k> nearest neighbours of the last
+    one (KD-tree as knn_edges), asking the tree for more neighbours when
+    they have all been visited. O(n) memory, for the MIP start of
+    solve_sparse().
+    '''
+    from scipy.spatial import cKDTree
+
+    points = _points(X, Y, metric)
+    n = len(points)
+    tree = cKDTree(points)
+    tour = np.empty(n, dtype = np.int64)
+    visited = np.zeros(n, dtype = bool)
+    tour[0] = start
+    visited[start] = True
+    for t in range(1, n):
+        m = min(k, n - 1)
+        while True:
+            _, near = tree.query(points[tour[t - 1]], m + 1)
+            near = np.atleast_1d(near)
+            near = near[~visited[near]]
+            if len(near) or m == n - 1:
+                break
+            m = min(4*m, n - 1)
+        tour[t] = near[0]
+        visited[tour[t]] = True
+    return tour
+
+
+def edge_dicts(vertices, ei, ej, d):
+    '''
+    Model parameters from the edge arrays: the tuplelist of edges (pairs of
+    vertices) and the distance dictionary, as gb.multidict would return them.
+    '''
+    import gurobipy as gb
+
+    names = np.asarray(vertices, dtype = object)
+    edges = gb.tuplelist(zip(names[ei].tolist(), names[ej].tolist()))
+    return edges, dict(zip(edges, d.tolist()))
+
+#%% Model
+
+def build_model(vertices, edges, distance, env = None):
+    '''
+    Degree constrained model, without subtour elimination constraints.
+
+    Returns the model and the <x> tupledict of edge variables.
+    '''
+    import gurobipy as gb
+
+    tsp = gb.Model('Traveling Salesman Problem', env = env)
+    x = tsp.addVars(edges, name = 'include', obj = distance, vtype = gb.GRB.BINARY)
+    tsp.ModelSense = gb.GRB.MINIMIZE
+
+    # 1. Each vertex must be visited twice, once entering and one leaving
+    tsp.addConstrs((x.sum(i,'*') + x.sum('*',i) == 2 for i in vertices), 'visited')
+    return tsp, x
+
+
+def set_start(tsp, x, vertices, tour):
+    '''
+    MIP start from a tour given as vertex positions (e.g. heuristics.heuristic_tour):
+    Start is 1 for the edges of the tour and 0 for every other edge.
+    '''
+    names = np.asarray(vertices, dtype = object)[np.asarray(tour)]
+    selected = set(zip(names.tolist(), np.roll(names, -1).tolist()))
+    selected |= set((j, i) for i, j in selected)
+    missing = len(names) - sum(1 for e in x.keys() if e in selected)
+    if missing:
+        raise ValueError(f'{missing} edges of the start tour are not in the model')
+    tsp.setAttr('Start', list(x.values()), [1.0 if e in selected else 0.0 for e in x.keys()])
+
+#%% Subtours
+
+def edge_arrays(vertices, edges):
+    '''
+    End points of the <edges> as arrays of vertex positions in <vertices>.
+    '''
+    index = {v: k for k, v in enumerate(vertices)}
+    ei = np.fromiter((index[i] for i, j in edges), dtype = np.int64, count = len(edges))
+    ej = np.fromiter((index[j] for i, j in edges), dtype = np.int64, count = len(edges))
+    return ei, ej
+
+
+def components(n, ei, ej):
+    '''
+    Connected components of the graph with <n> vertices and edges (ei, ej), in
+    O(n + |edges|). Returns the number of components and the component label
+    of every vertex.
+    '''
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    graph = coo_matrix((np.ones(len(ei)), (ei, ej)), shape = (n, n))
+    return connected_components(graph, directed = False)
+
+
+def subtour_cuts(variables, ei, ej, n, values, threshold = 0.5):
+    '''
+    Subtour elimination constraints violated by a solution: for every subtour S
+    of the selected edges (values > threshold), the sum of the variables of the
+    edges with both end points in S must be at most |S| - 1.
+
+    <variables> are the edge variables in the order of the (ei, ej) arrays.
+    Returns a list of (expression, rhs, S) with S the vertex positions of the
+    subtour, empty if the solution is a tour.
+    '''
+    import gurobipy as gb
+
+    selected = np.asarray(values) > threshold
+    k, labels = components(n, ei[selected], ej[selected])
+    if k == 1:
+        return []
+
+    # Vertices and edges inside a subtour grouped by subtour
+    sizes = np.bincount(labels, minlength = k)
+    members = np.split(np.argsort(labels, kind = 'stable'), np.cumsum(sizes)[:-1])
+    inside = np.flatnonzero(labels[ei] == labels[ej])
+    comp = labels[ei[inside]]
+    order = np.argsort(comp, kind = 'stable')
+    inside, comp = inside[order], comp[order]
+
+    cuts = []
+    for group in np.split(inside, np.flatnonzero(np.diff(comp)) + 1):
+        if len(group) == 0:
+            continue
+        c = labels[ei[group[0]]]
+        expr = gb.LinExpr([1.0]*len(group), [variables[e] for e in group.tolist()])
+        cuts.append((expr, int(sizes[c]) - 1, members[c]))
+    return cuts
+
+
+def tour_order(n, ei, ej):
+    '''
+    Vertex positions in visiting order of the tour made of the (ei, ej) edges,
+    starting from vertex 0.
+    '''
+    ends = np.concatenate((ei, ej))
+    order = np.argsort(ends, kind = 'stable')
+    others = np.concatenate((ej, ei))[order].reshape(n, 2)    # The two neighbours of every vertex
+    tour = np.empty(n, dtype = np.int64)
+    tour[0], previous = 0, -1
+    for k in range(1, n):
+        current = tour[k - 1]
+        a, b = others[current]
+        tour[k] = b if a == previous else a
+        previous = current
+    return tour
+
+#%% Solution procedures
+
+def solve_loop(tsp, x, vertices, on_iteration = None):
+    '''
+    Re-solve loop: the model is optimized, the subtour elimination constraints of
+    the subtours found are added and the model is optimized again, until the
+    solution is a single tour. <on_iteration> is called after every optimization
+    (e.g. to plot the solution).
+    '''
+    import gurobipy as gb
+
+    stats = {'iterations': 0, 'cuts': 0, 'runtime': 0.0, 'nodes': 0.0}
+    variables = list(x.values())
+    ei, ej = edge_arrays(vertices, x.keys())
+    begin = time.perf_counter()
+    while True:
+        tsp.optimize()
+        stats['iterations'] += 1
+        stats['runtime'] += tsp.Runtime
+        stats['nodes'] += tsp.NodeCount
+        if on_iteration is not None:
+            on_iteration()
+
+        cuts = subtour_cuts(variables, ei, ej, len(vertices), tsp.getAttr('X', variables))
+        if not cuts:
+            break
+        for expr, rhs, _ in cuts:
+            # 2. Lazy Constraints Addition
+            tsp.addLConstr(expr, gb.GRB.LESS_EQUAL, rhs, 'subtour')
+        stats['cuts'] += len(cuts)
+    stats['wall'] = time.perf_counter() - begin
+    return stats
+
+
+def solve_lazy(tsp, x, vertices):
+    '''
+    Single optimization with the subtour elimination constraints added as lazy
+    constraints whenever the solver finds an integer solution with subtours.
+    '''
+    import gurobipy as gb
+
+    stats = {'iterations': 0, 'cuts': 0, 'runtime': 0.0, 'nodes': 0.0}
+    variables = list(x.values())
+    ei, ej = edge_arrays(vertices, x.keys())
+
+    def callback(model, where):
+        if where != gb.GRB.Callback.MIPSOL:
+            return
+        cuts = subtour_cuts(variables, ei, ej, len(vertices), model.cbGetSolution(variables))
+        if cuts:
+            stats['iterations'] += 1
+            for expr, rhs, _ in cuts:
+                model.cbLazy(expr <= rhs)
+            stats['cuts'] += len(cuts)
+
+    begin = time.perf_counter()
+    tsp.Params.LazyConstraints = 1
+    tsp.optimize(callback)
+    stats['runtime'] = tsp.Runtime
+    stats['nodes'] = tsp.NodeCount
+    stats['wall'] = time.perf_counter() - begin
+    return stats
+
+
+def _lp_bound(tsp, n, ei, ej):
+    # LP relaxation of the degree model with the subtour constraints of the components of the support graph,
+    # added until the support is connected. Returns the bound, the duals of the degree constraints and the
+    # (dual, vertex positions) of the subtour constraints.
+    import gurobipy as gb
+
+    lp = tsp.relax()
+    lp.Params.OutputFlag = 0
+    variables = lp.getVars()
+    visited = lp.getConstrs()[:n]
+    subtour = []
+    while True:
+        lp.optimize()
+        cuts = subtour_cuts(variables, ei, ej, n, lp.getAttr('X', variables), threshold = 1e-6)
+        if not cuts:
+            break
+        for expr, rhs, members in cuts:
+            subtour.append((lp.addLConstr(expr, gb.GRB.LESS_EQUAL, rhs), members))
+    bound = lp.ObjVal
+    y = np.array(lp.getAttr('Pi', visited))
+    pi = [(c.Pi, members) for c, members in subtour if abs(c.Pi) > 1e-9]
+    lp.dispose()
+    return bound, y, pi
+
+
+def _price(n, distance, y, pi, bound, incumbent, in_graph, max_new):
+    # Missing edges (i,j) that could be part of a tour shorter than the incumbent: bound + reduced cost < incumbent.
+    # The edges are priced one column j at a time, so memory stays O(n).
+    M = np.zeros((len(pi), n))
+    for r, (dual, members) in enumerate(pi):
+        M[r, members] = 1.0
+    duals = np.array([dual for dual, _ in pi])
+    new_i, new_j, new_rc = [], [], []
+    for j in range(1, n):
+        i = np.arange(j)
+        rc = distance(i, j) - y[:j] - y[j]
+        if len(pi):
+            rc -= (duals*M[:, j]) @ M[:, :j]
+        candidates = np.flatnonzero(bound + rc < incumbent - 1e-6)
+        candidates = candidates[~in_graph(candidates, j)]
+        new_i.append(candidates)
+        new_j.append(np.full(len(candidates), j))
+        new_rc.append(rc[candidates])
+    new_i, new_j, new_rc = np.concatenate(new_i), np.concatenate(new_j), np.concatenate(new_rc)
+    best = np.argsort(new_rc, kind = 'stable')[:max_new]
+    return new_i[best], new_j[best]
+
+
+def solve_sparse(df_coord, k = 10, metric = 'euclidean', tours = (), max_new = None, max_rounds = 50, env = None):
+    '''
+    Solves the TSP over a sparse candidate graph instead of the complete graph:
+
+    1. The candidate graph holds the <k> nearest neighbours of every city plus
+       the edges of the given <tours> (knn_edges), O(n·k) variables.
+    2. The model over the candidate graph is solved with lazy subtour
+       constraints (solve_lazy), the best tour so far (at first the shortest
+       of the given <tours>) as MIP start.
+    3. Pricing: the LP relaxation of the candidate model gives a lower bound
+       and duals. Any tour using a missing edge (i,j) is at least as long as
+       the bound plus the reduced cost of (i,j), so the missing edges with
+       bound + reduced cost < tour length are added (at most <max_new>, the
+       most negative first) and the model is solved again. When there are
+       none, the tour is optimal over the complete graph (within the MIPGap
+       the candidate model was solved to).
+
+    Returns the model and <x> of the last round (edges keyed by city names)
+    and the statistics: 'rounds', 'edges' (final candidate edges), 'added'
+    (priced in edges), 'bound' (last LP bound), 'proven' (optimality over the
+    complete graph proven) and 'wall'.
+    '''
+    vertices = df_coord.index.tolist()
+    n = len(vertices)
+    X = df_coord['X'].to_numpy(dtype = float)
+    Y = df_coord['Y'].to_numpy(dtype = float)
+    distance = _pair_distance(X, Y, metric)
+    max_new = max_new or n
+    ei, ej = knn_edges(X, Y, k, metric, tours)
+
+    stats = {'rounds': 0, 'edges': 0, 'added': 0, 'bound': None, 'proven': False}
+    begin = time.perf_counter()
+    start = min(tours, key = lambda tour: distance(*tour_edges(tour)).sum()) if len(tours) else None
+    while True:
+        stats['rounds'] += 1
+        edges, dist = edge_dicts(vertices, ei, ej, distance(ei, ej))
+        tsp, x = build_model(vertices, edges, dist, env = env)
+        tsp.Params.OutputFlag = 0
+        if start is not None:
+            set_start(tsp, x, vertices, start)
+        solve_lazy(tsp, x, vertices)
+        selected = np.array(tsp.getAttr('X', list(x.values()))) > 0.5
+        start = tour_order(n, ei[selected], ej[selected])
+
+        bound, y, pi = _lp_bound(tsp, n, ei, ej)
+        stats['bound'] = bound
+        keys = ej.astype(np.int64)*n + ei    # Sorted, see _unique_edges
+        in_graph = lambda i, j: np.isin(j*n + i, keys, assume_unique = True)
+        new_i, new_j = _price(n, distance, y, pi, bound, tsp.ObjVal, in_graph, max_new)
+        if len(new_i) == 0:
+            stats['proven'] = True
+            break
+        if stats['rounds'] == max_rounds:
+            break
+        stats['added'] += len(new_i)
+        ei, ej = _unique_edges(n, np.concatenate((ei, new_i)), np.concatenate((ej, new_j)))
+        tsp.dispose()
+
+    stats['edges'] = len(ei)
+    stats['wall'] = time.perf_counter() - begin
+    return tsp, x, stats
+
+#%% End of file